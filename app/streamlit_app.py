@@ -1,8 +1,10 @@
 import streamlit as st
 from src.video_processor import VideoProcessor
 from src.chunk_processor import ChunkProcessor, ChunkConfig
-from src.vector_store import PineconeManager
+from src.vector_store import create_vector_store
 from src.rag_engine import RAGEngine
+from src.pipeline import StreamingIngestPipeline
+from src.query_cache import default_query_cache
 from src.utils import extract_video_id
 import logging
 import os
@@ -21,7 +23,7 @@ load_dotenv()
 def init_processors():
     video_processor = VideoProcessor()
     chunk_processor = ChunkProcessor()
-    pinecone_manager = PineconeManager()
+    pinecone_manager = create_vector_store()  # backend from config/config.yaml
     return video_processor, chunk_processor, pinecone_manager
 
 
@@ -109,22 +111,20 @@ def process_video(url, video_processor, chunk_processor, pinecone_manager):
         # Check if video is already indexed
         if not pinecone_manager.check_video_exists(video_id):
             with st.status("Processing video...", expanded=True) as status:
-                # Process video
+                # Transcription, chunking, embedding and indexing overlap,
+                # so the start of the video is searchable early
                 status.write("Downloading and transcribing video...")
-                transcription, video_info, transcript_path = video_processor.process_video(url)
-
-                # Create chunks
-                status.write("Creating chunks...")
-                segments = chunk_processor.read_transcript(transcript_path)
-                chunks = chunk_processor.create_chunks(segments, video_id)
-
-                # Generate embeddings
-                status.write("Generating embeddings...")
-                chunks_with_embeddings = chunk_processor.generate_embeddings(chunks)
-
-                # Index chunks
-                status.write("Indexing chunks...")
-                pinecone_manager.index_video_chunks(chunks_with_embeddings, video_id)
+                progress = status.empty()
+                pipeline = StreamingIngestPipeline(video_processor, chunk_processor, pinecone_manager)
+                pipeline.run(
+                    url,
+                    video_id,
+                    on_batch_indexed=lambda stats: progress.write(f"Indexed {stats['chunks']} chunks...")
+                )
+                # Results cached while the video was partly indexed are stale now
+                query_cache = default_query_cache()
+                if query_cache:
+                    query_cache.invalidate_video(video_id)
                 status.update(label="Video processed successfully!", state="complete")
 
         return True
@@ -155,7 +155,10 @@ def main():
 
         if video_url:
             if process_video(video_url, video_processor, chunk_processor, pinecone_manager):
-                st.session_state.rag_engine = RAGEngine(video_url)
+                # Keep the engine (and its conversation) across reruns for the same video
+                engine = st.session_state.rag_engine
+                if engine is None or engine.video_url != video_url:
+                    st.session_state.rag_engine = RAGEngine(video_url, vector_store=pinecone_manager)
                 st.success("Video ready for chat and search!")
 
     # Main area
@@ -212,7 +215,7 @@ def main():
                 if chunks:
                     st.write("🎯 Found these relevant moments:")
                     for chunk in chunks:
-                        with st.expander(f"{chunk['start_time']}s - {chunk['end_time']}s"):
+                        with st.expander(f"{chunk['start_time']:.0f}s - {chunk['end_time']:.0f}s"):
                             st.write(chunk['text'])
                             st.markdown(f'<a href="{chunk["youtube_url"]}" target="_blank">Watch this segment</a>',
                                         unsafe_allow_html=True)
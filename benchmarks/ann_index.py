@@ -0,0 +1,113 @@
+"""
+Recall, build time and memory of the HNSW library index against exact search.
+
+Builds an AnnIndex over clustered synthetic embeddings (or the vectors of an
+existing local vector store with --store), then reports recall@k of ANN
+queries against brute-force cosine search, query latency of both, build
+throughput, resident memory added by the build and the size on disk.
+Needs hnswlib.
+
+Usage:
+    python benchmarks/ann_index.py [--vectors 200000] [--dimension 384] [-k 10] [--ef 32 64 128]
+    python benchmarks/ann_index.py --store vector_store
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.ann_index import AnnIndex
+
+
+def clustered_vectors(count: int, dimension: int, clusters: int = 1000, seed: int = 0) -> np.ndarray:
+    """Unit vectors around random topic centres, like embeddings of many videos."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dimension)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, count)] + rng.normal(scale=0.6, size=(count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def store_vectors(root: str) -> np.ndarray:
+    from src.local_vector_store import LocalVectorStore
+    store = LocalVectorStore(root)
+    matrices = []
+    for video_id in sorted(os.listdir(root)):
+        loaded = None if video_id.startswith(".") else store._load(video_id)
+        if loaded is not None and len(loaded[1]):
+            matrices.append(np.asarray(loaded[0]))
+    return np.concatenate(matrices)
+
+
+def rss_mb() -> float:
+    """Peak resident memory of this process in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HNSW library index")
+    parser.add_argument("--vectors", type=int, default=200000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--store", help="use the vectors of this local vector store instead")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--M", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    args = parser.parse_args()
+
+    vectors = store_vectors(args.store) if args.store else clustered_vectors(args.vectors, args.dimension)
+    dimension = vectors.shape[1]
+    queries = vectors[np.random.default_rng(1).choice(len(vectors), args.queries, replace=False)]
+    queries = queries + np.random.default_rng(2).normal(scale=0.05, size=queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    started = time.perf_counter()
+    exact = [np.argpartition(-(vectors @ q), args.k)[:args.k] for q in queries]
+    exact_ms = (time.perf_counter() - started) / len(queries) * 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rss_before = rss_mb()
+        started = time.perf_counter()
+        index = AnnIndex(tmp, dimension=dimension, M=args.M, ef_construction=args.ef_construction,
+                         initial_capacity=len(vectors))
+        ids = [f"chunk{i}" for i in range(len(vectors))]
+        for start in range(0, len(vectors), 10000):
+            stop = min(start + 10000, len(vectors))
+            index.add(ids[start:stop], vectors[start:stop], [
+                {"video_id": f"video{i // 300}", "start_time": float(i % 300 * 25),
+                 "end_time": float(i % 300 * 25 + 30), "text": "", "youtube_url": ""}
+                for i in range(start, stop)
+            ])
+        build_seconds = time.perf_counter() - started
+        rss_after = rss_mb()
+        index.save()
+        disk_mb = sum(f.stat().st_size for f in Path(tmp).iterdir()) / 1e6
+
+        print(f"{len(vectors)} vectors x {dimension} dims: built in {build_seconds:.1f}s "
+              f"({len(vectors) / build_seconds:.0f} vectors/s), "
+              f"+{rss_after - rss_before:.0f} MB peak RSS, {disk_mb:.0f} MB on disk "
+              f"(raw float32: {vectors.nbytes / 1e6:.0f} MB)")
+        print(f"exact search: {exact_ms:.2f} ms/query")
+        print(f"{'ef':>6} {'recall@' + str(args.k):>10} {'ms/query':>9}")
+        for ef in args.ef:
+            index.ef_search = ef
+            hits = 0
+            started = time.perf_counter()
+            for query, truth in zip(queries, exact):
+                found = index._graph_search(query.reshape(1, -1), args.k)[0]
+                hits += len(set(found) & set(truth.tolist()))
+            per_query = (time.perf_counter() - started) / len(queries) * 1000
+            print(f"{ef:>6} {hits / (args.k * len(queries)):>10.3f} {per_query:>9.2f}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Throughput of CPU embedding: one process vs an EmbeddingPool of worker processes.
+
+Without --model the benchmark uses the offline hashing encoder, which needs
+no model download; pass a SentenceTransformer name to measure a real model.
+
+Usage:
+    python benchmarks/embedding_pool.py [--texts 20000] [--processes 8] [--batch-size 64]
+    python benchmarks/embedding_pool.py --model sentence-transformers/all-MiniLM-L6-v2
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.embedding_pool import EmbeddingPool, local_encoder, sentence_transformer_encoder
+
+
+def make_texts(count: int, seed: int = 0):
+    """Chunk-like texts of varied length (roughly 5 to 120 words)."""
+    rng = random.Random(seed)
+    words = [f"word{i}" for i in range(5000)]
+    return [" ".join(rng.choices(words, k=rng.randint(5, 120))) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the multi-process embedding pool")
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--model", help="SentenceTransformer model name (default: offline hashing encoder)")
+    args = parser.parse_args()
+
+    if args.model:
+        factory = partial(sentence_transformer_encoder, args.model, args.batch_size)
+    else:
+        factory = partial(local_encoder, 384)
+    texts = make_texts(args.texts)
+
+    encode = factory()
+    started = time.perf_counter()
+    single = np.asarray(encode(texts), dtype=np.float32)
+    single_seconds = time.perf_counter() - started
+    print(f"1 process:   {single_seconds:7.2f}s  {len(texts) / single_seconds:9.0f} texts/s")
+
+    with EmbeddingPool(factory, processes=args.processes, batch_size=args.batch_size) as pool:
+        pool.encode(texts[:args.processes])  # start the workers and load the model
+        started = time.perf_counter()
+        pooled = pool.encode(texts)
+        pool_seconds = time.perf_counter() - started
+    print(f"{args.processes} processes: {pool_seconds:7.2f}s  {len(texts) / pool_seconds:9.0f} texts/s  "
+          f"({single_seconds / pool_seconds:.1f}x)")
+
+    # Padding differs between batchings, so allow for float noise
+    print(f"max abs difference: {np.abs(single - pooled).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Startup-time benchmark: how long common entry points take to import.
+
+Each target runs in a fresh interpreter several times; the median wall time
+is reported together with the heavy dependencies the import dragged in.
+With --importtime the slowest modules (from `python -X importtime`) are
+listed for every target.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--importtime]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("torch", "sentence_transformers", "openai", "pinecone", "yt_dlp", "numpy", "dotenv")
+
+TARGETS = {
+    "python": "pass",
+    "src": "import src",
+    "src.extract_video_id": "from src import extract_video_id",
+    "src.utils": "from src.utils import extract_video_id",
+    "src.vector_store": "from src.vector_store import PineconeManager",
+    "src.chunk_processor": "from src.chunk_processor import ChunkProcessor",
+    "src.pipeline": "from src.pipeline import StreamingIngestPipeline",
+    "src.ingest": "from src.ingest import BulkIngestor",
+    "src.video_processor": "from src.video_processor import VideoProcessor",
+    "src.rag_engine": "from src.rag_engine import RAGEngine",
+}
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(f"{{elapsed}} {{','.join(heavy)}}")
+"""
+
+
+def run_target(statement: str, runs: int):
+    """Median import time in ms and the heavy modules loaded, or the error output."""
+    times = []
+    heavy = ""
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        elapsed, _, heavy = result.stdout.strip().partition(" ")
+        times.append(float(elapsed) * 1000)
+    return statistics.median(times), heavy or "-"
+
+
+def slowest_imports(statement: str, top: int = 8):
+    """Modules with the largest cumulative import time, from `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time of the package entry points")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--importtime", action="store_true", help="list the slowest modules per target")
+    args = parser.parse_args()
+
+    print(f"{'target':<24} {'median ms':>10}  heavy modules loaded")
+    for name, statement in TARGETS.items():
+        median, heavy = run_target(statement, args.runs)
+        if median is None:
+            print(f"{name:<24} {'failed':>10}  {heavy}")
+            continue
+        print(f"{name:<24} {median:>10.1f}  {heavy}")
+        if args.importtime:
+            for cumulative, module in slowest_imports(statement):
+                print(f"{'':<24} {cumulative / 1000:>10.1f}    {module}")
+
+
+if __name__ == "__main__":
+    main()
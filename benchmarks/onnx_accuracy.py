@@ -0,0 +1,87 @@
+"""
+Accuracy and speed of the int8 ONNX embedding backend against PyTorch.
+
+Embeds the same texts with the full-precision SentenceTransformer and with
+the quantized ONNX export, reports per-text cosine similarity and
+nearest-neighbour agreement, and times single-query latency (the chat path)
+and batch throughput (ingestion). Exits non-zero when the mean cosine falls
+below --min-cosine. Needs sentence-transformers, onnxruntime, transformers
+and torch.
+
+Usage:
+    python benchmarks/onnx_accuracy.py [--texts 2000] [--min-cosine 0.98]
+    python benchmarks/onnx_accuracy.py --transcript data/<video_id>/transcript.vrt
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.chunk_processor import ChunkConfig
+from src.model_registry import get_onnx_embedder, get_sentence_transformer
+from src.onnx_embedder import compare_with_pytorch
+
+
+def make_texts(count: int, seed: int = 0):
+    """Sentence-like texts of varied length built from a small English vocabulary."""
+    rng = random.Random(seed)
+    words = ("the model video transcript speaker explains how neural networks learn from data "
+             "gradient descent training loss layer attention query answer question time chunk "
+             "search vector embedding similarity python code example result memory fast slow").split()
+    return [" ".join(rng.choices(words, k=rng.randint(5, 80))) for _ in range(count)]
+
+
+def transcript_texts(path: str):
+    from src.chunk_processor import ChunkProcessor
+    processor = ChunkProcessor(ChunkConfig(embedding_cache_path=None))
+    return [c['metadata']['text'] for c in processor.chunk_transcript_file(path, "benchmark")]
+
+
+def query_latency_ms(model, queries, **kwargs):
+    times = []
+    for query in queries:
+        started = time.perf_counter()
+        model.encode([query], **kwargs)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare int8 ONNX embeddings with PyTorch")
+    parser.add_argument("--model", default=ChunkConfig.hf_model_name)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--transcript", help="take the texts from the chunks of this transcript file")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    args = parser.parse_args()
+
+    texts = transcript_texts(args.transcript) if args.transcript else make_texts(args.texts)
+    torch_model = get_sentence_transformer(args.model)
+    onnx_model = get_onnx_embedder(args.model)
+
+    report = compare_with_pytorch(texts, args.model, onnx_model=onnx_model, torch_model=torch_model)
+    print(f"{report['texts']} texts: mean cosine {report['mean_cosine']:.4f}, "
+          f"min cosine {report['min_cosine']:.4f}, "
+          f"nearest-neighbour agreement {report['nearest_neighbour_agreement']:.1%}")
+
+    queries = make_texts(50, seed=1)
+    for name, model, kwargs in (("pytorch", torch_model, {"show_progress_bar": False}),
+                                ("onnx-int8", onnx_model, {})):
+        latency = query_latency_ms(model, queries, **kwargs)
+        started = time.perf_counter()
+        model.encode(texts, batch_size=args.batch_size, **kwargs)
+        throughput = len(texts) / (time.perf_counter() - started)
+        print(f"{name:<10} query latency {latency:6.1f} ms   batch throughput {throughput:8.0f} texts/s")
+
+    if report['mean_cosine'] < args.min_cosine:
+        print(f"FAIL: mean cosine below {args.min_cosine}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
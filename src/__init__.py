@@ -1,15 +1,37 @@
-from .video_processor import VideoProcessor
-from .chunk_processor import ChunkProcessor, ChunkConfig, EmbeddingType
-from .vector_store import PineconeManager
-from .utils import extract_video_id
-from .rag_engine import RAGEngine
-
-__all__ = [
-    'VideoProcessor',
-    'ChunkProcessor',
-    'ChunkConfig',
-    'EmbeddingType',
-    'PineconeManager',
-    'extract_video_id',
-    'RAGEngine'
-]
+# Public names are imported lazily: `from src import extract_video_id` must not
+# pull in openai, pinecone, yt_dlp or torch. Each name maps to its submodule.
+import importlib
+
+_EXPORTS = {
+    'VideoProcessor': '.video_processor',
+    'VideoProcessorConfig': '.video_processor',
+    'TranscriptionBackend': '.transcription',
+    'ChunkProcessor': '.chunk_processor',
+    'ChunkConfig': '.chunk_processor',
+    'EmbeddingType': '.chunk_processor',
+    'EmbeddingClient': '.embeddings',
+    'LocalEmbeddingClient': '.embeddings',
+    'PineconeManager': '.vector_store',
+    'LocalVectorStore': '.local_vector_store',
+    'create_vector_store': '.vector_store',
+    'VideoRegistry': '.video_registry',
+    'DocumentStore': '.document_store',
+    'LexicalIndex': '.lexical_index',
+    'QueryCache': '.query_cache',
+    'extract_video_id': '.utils',
+    'RAGEngine': '.rag_engine',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
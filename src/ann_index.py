@@ -0,0 +1,323 @@
+# src/ann_index.py
+#
+# Optional dependency: hnswlib (pip install -r requirements-ann.txt)
+
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .chunk_batch import ChunkBatch
+
+INDEX_FILE = "index.bin"
+CHUNKS_DB = "chunks.db"
+
+# Filters matching at most this many chunks are answered by exact search
+EXACT_SEARCH_LIMIT = 20000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    label INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    video_id TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    text TEXT NOT NULL,
+    youtube_url TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_video ON chunks (video_id);
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def _hnswlib():
+    try:
+        import hnswlib
+    except ImportError as e:
+        raise ImportError("AnnIndex needs 'hnswlib': pip install -r requirements-ann.txt") from e
+    return hnswlib
+
+
+class AnnIndex:
+    def __init__(self, path: str, dimension: Optional[int] = None, M: int = 16,
+                 ef_construction: int = 200, ef_search: int = 64, initial_capacity: int = 100000):
+        """
+        HNSW index over the chunk embeddings of the whole library.
+
+        Vectors live in an hnswlib graph (cosine space) and chunk metadata in
+        SQLite, both under `path`. The columns needed for filtering (video,
+        start and end time) are also kept as arrays indexed by label, so
+        filters are evaluated without touching SQLite. Filters that leave only
+        a few thousand chunks, like a single video, are answered by exact
+        search over those chunks; wider filters are applied during the graph
+        search. Changes are written to disk by `save()`, which stores the
+        graph and commits the metadata together.
+
+        Args:
+            path: Directory of the index, created if missing
+            dimension: Embedding dimension; required for a new index, read from disk otherwise
+            M: Graph degree; higher improves recall at the cost of memory
+            ef_construction: Candidate list size while inserting
+            ef_search: Candidate list size while searching (raised to top_k when smaller)
+            initial_capacity: Elements allocated for a new index; it grows as needed
+        """
+        hnswlib = _hnswlib()
+        self.logger = logging.getLogger('AnnIndex')
+        self.path = path
+        self.ef_search = ef_search
+        os.makedirs(path, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self.db = sqlite3.connect(os.path.join(path, CHUNKS_DB), check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        settings = dict(self.db.execute("SELECT key, value FROM settings"))
+
+        stored_dimension = int(settings["dimension"]) if "dimension" in settings else None
+        if dimension is not None and stored_dimension is not None and dimension != stored_dimension:
+            raise ValueError(f"Index at {path} has dimension {stored_dimension}, not {dimension}")
+        self.dimension = dimension or stored_dimension
+        if self.dimension is None:
+            raise ValueError("dimension is required to create a new index")
+
+        self.index = hnswlib.Index(space="cosine", dim=self.dimension)
+        index_path = os.path.join(path, INDEX_FILE)
+        if os.path.exists(index_path):
+            self.index.load_index(index_path, allow_replace_deleted=True)
+        else:
+            self.index.init_index(max_elements=initial_capacity, M=M, ef_construction=ef_construction,
+                                  allow_replace_deleted=True)
+            self.db.execute("INSERT OR REPLACE INTO settings VALUES ('dimension', ?)", (str(self.dimension),))
+        self._load_columns(int(settings.get("next_label", 0)))
+
+    def _load_columns(self, next_label: int = 0):
+        """Rebuild the in-memory filter columns from SQLite."""
+        rows = self.db.execute("SELECT label, video_id, start_time, end_time FROM chunks").fetchall()
+        # Deleted chunks keep their labels in the graph until a new chunk takes over the slot, so labels
+        # are never reused: continue after every label ever handed out, not just the live ones
+        graph_labels = self.index.get_ids_list()
+        self._next_label = max(
+            next_label,
+            int(self.db.execute("SELECT COALESCE(MAX(label) + 1, 0) FROM chunks").fetchone()[0]),
+            max(graph_labels) + 1 if graph_labels else 0
+        )
+        capacity = max(1024, self._next_label)
+        self._video_codes: Dict[str, int] = {}
+        self._videos = np.full(capacity, -1, dtype=np.int32)  # -1 marks a free or deleted label
+        self._starts = np.zeros(capacity, dtype=np.float32)
+        self._ends = np.zeros(capacity, dtype=np.float32)
+        self._count = len(rows)
+        for label, video_id, start, end in rows:
+            self._videos[label] = self._video_codes.setdefault(video_id, len(self._video_codes))
+            self._starts[label] = start
+            self._ends[label] = end
+
+    def _reserve(self, new_items: int):
+        """Grow the filter columns and the graph, doubling, to fit `new_items` more chunks."""
+        if self._next_label > len(self._videos):
+            size = max(self._next_label, 2 * len(self._videos))
+            self._videos = np.concatenate([self._videos, np.full(size - len(self._videos), -1, np.int32)])
+            self._starts = np.resize(self._starts, size)
+            self._ends = np.resize(self._ends, size)
+        # Deleted slots are reused by replace_deleted, so only live chunks need room
+        needed = len(self) + new_items
+        if needed > self.index.get_max_elements():
+            self.index.resize_index(max(needed, 2 * self.index.get_max_elements()))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray, metadata: Sequence[Dict]):
+        """Insert chunks, or update the vector and metadata of ids already in the index."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(ids), self.dimension):
+            raise ValueError(f"Expected {len(ids)} vectors of dimension {self.dimension}, got {vectors.shape}")
+        if not len(ids):
+            return
+
+        with self._lock:
+            existing = dict(self._select("SELECT id, label FROM chunks WHERE id IN ({})", list(ids)))
+            labels = []
+            new_items = 0
+            for chunk_id in ids:
+                if chunk_id not in existing:
+                    existing[chunk_id] = self._next_label
+                    self._next_label += 1
+                    new_items += 1
+                labels.append(existing[chunk_id])
+            self._reserve(new_items)
+
+            labels = np.asarray(labels, dtype=np.int64)
+            # Existing labels are updated in place; only new labels may take over deleted slots
+            is_new = labels >= self._next_label - new_items
+            if (~is_new).any():
+                self.index.add_items(vectors[~is_new], labels[~is_new])
+            if is_new.any():
+                self.index.add_items(vectors[is_new], labels[is_new], replace_deleted=True)
+            self._count += new_items
+            labels = labels.tolist()
+            self.db.executemany(
+                "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(label, chunk_id, m["video_id"], m["start_time"], m["end_time"], m["text"], m["youtube_url"])
+                 for label, chunk_id, m in zip(labels, ids, metadata)]
+            )
+            for label, m in zip(labels, metadata):
+                self._videos[label] = self._video_codes.setdefault(m["video_id"], len(self._video_codes))
+                self._starts[label] = m["start_time"]
+                self._ends[label] = m["end_time"]
+
+    def add_chunk_batch(self, batch: ChunkBatch):
+        if batch.embeddings is None:
+            raise ValueError("ChunkBatch has no embeddings")
+        self.add(batch.ids(), batch.embeddings, [batch.metadata_at(i) for i in range(len(batch))])
+
+    def delete(self, ids: Iterable[str]) -> int:
+        """Remove chunks by id; returns how many were in the index."""
+        with self._lock:
+            labels = [label for (label,) in self._select("SELECT label FROM chunks WHERE id IN ({})", list(ids))]
+            return self._delete_labels(labels)
+
+    def delete_video(self, video_id: str) -> int:
+        """Remove every chunk of a video; returns how many were removed."""
+        with self._lock:
+            labels = [label for (label,) in self.db.execute(
+                "SELECT label FROM chunks WHERE video_id = ?", (video_id,))]
+            return self._delete_labels(labels)
+
+    def _delete_labels(self, labels: List[int]) -> int:
+        for label in labels:
+            self.index.mark_deleted(label)
+        self._videos[labels] = -1
+        self._count -= len(labels)
+        for start in range(0, len(labels), 500):
+            part = labels[start:start + 500]
+            self.db.execute(f"DELETE FROM chunks WHERE label IN ({','.join('?' * len(part))})", part)
+        return len(labels)
+
+    def _select(self, query: str, keys: List) -> List[tuple]:
+        rows = []
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            rows.extend(self.db.execute(query.format(",".join("?" * len(part))), part))
+        return rows
+
+    def _filter_mask(self, filter: Optional[Dict]) -> np.ndarray:
+        """
+        Labels matching a Pinecone-style filter on video_id, start_time or end_time.
+
+        Supported forms: {"video_id": "abc"}, {"video_id": {"$in": [...]}} and
+        {"start_time": {"$gte": 60, "$lt": 120}} (also $gt, $lte, $eq).
+        """
+        size = self._next_label
+        mask = self._videos[:size] >= 0
+        for field, condition in (filter or {}).items():
+            if field == "video_id":
+                if isinstance(condition, dict):
+                    wanted = condition["$in"] if "$in" in condition else [condition["$eq"]]
+                else:
+                    wanted = [condition]
+                codes = [self._video_codes[v] for v in wanted if v in self._video_codes]
+                mask &= np.isin(self._videos[:size], codes)
+            elif field in ("start_time", "end_time"):
+                column = (self._starts if field == "start_time" else self._ends)[:size]
+                if not isinstance(condition, dict):
+                    condition = {"$eq": condition}
+                for op, value in condition.items():
+                    mask &= {"$eq": np.equal, "$gt": np.greater, "$gte": np.greater_equal,
+                             "$lt": np.less, "$lte": np.less_equal}[op](column, value)
+            else:
+                raise ValueError(f"Unsupported filter field: {field}")
+        return mask
+
+    def search(self, query_embedding, top_k: int = 10, filter: Optional[Dict] = None) -> List[Dict]:
+        """
+        Find the chunks closest to the query across the library.
+
+        Args:
+            query_embedding: Embedding of the query text
+            top_k: Number of results to return
+            filter: Optional metadata filter, see `_filter_mask`
+
+        Returns:
+            List of chunks with id, video_id, score (cosine similarity) and metadata
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        with self._lock:
+            if filter:
+                mask = self._filter_mask(filter)
+                matches = int(mask.sum())
+                if matches <= EXACT_SEARCH_LIMIT:
+                    labels, scores = self._exact_search(query[0], np.flatnonzero(mask), top_k)
+                else:
+                    labels, scores = self._graph_search(query, min(top_k, matches), mask)
+            else:
+                labels, scores = self._graph_search(query, min(top_k, len(self)))
+            return self._results(labels, scores)
+
+    def _exact_search(self, query: np.ndarray, candidates: np.ndarray, top_k: int):
+        if not len(candidates) or top_k <= 0:
+            return [], []
+        vectors = np.asarray(self.index.get_items(candidates), dtype=np.float32)
+        vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        scores = vectors @ (query / max(float(np.linalg.norm(query)), 1e-12))
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return candidates[top].tolist(), scores[top].tolist()
+
+    def _graph_search(self, query: np.ndarray, top_k: int, mask: Optional[np.ndarray] = None):
+        if top_k <= 0:
+            return [], []
+        self.index.set_ef(max(self.ef_search, top_k))
+        try:
+            if mask is None:
+                labels, distances = self.index.knn_query(query, k=top_k)
+            else:
+                # Python filter callbacks need a single search thread
+                labels, distances = self.index.knn_query(
+                    query, k=top_k, num_threads=1, filter=lambda label: bool(mask[label]))
+        except RuntimeError:
+            # Too few reachable matches for top_k at this ef; fall back to exact search
+            if mask is None:
+                mask = self._videos[:self._next_label] >= 0
+            return self._exact_search(query[0], np.flatnonzero(mask), top_k)
+        return labels[0].tolist(), (1.0 - distances[0]).tolist()
+
+    def _results(self, labels: List[int], scores: List[float]) -> List[Dict]:
+        rows = {row[0]: row for row in self._select(
+            "SELECT label, id, video_id, start_time, end_time, text, youtube_url FROM chunks WHERE label IN ({})",
+            labels)}
+        return [
+            {
+                "id": rows[label][1],
+                "video_id": rows[label][2],
+                "score": float(score),
+                "start_time": rows[label][3],
+                "end_time": rows[label][4],
+                "text": rows[label][5],
+                "youtube_url": rows[label][6]
+            }
+            for label, score in zip(labels, scores) if label in rows
+        ]
+
+    def save(self):
+        """Write the graph to disk and commit the metadata."""
+        with self._lock:
+            index_path = os.path.join(self.path, INDEX_FILE)
+            self.index.save_index(index_path + ".tmp")
+            os.replace(index_path + ".tmp", index_path)
+            self.db.execute("INSERT OR REPLACE INTO settings VALUES ('next_label', ?)", (str(self._next_label),))
+            self.db.commit()
+            self.logger.info(f"Saved ANN index with {len(self)} chunks to {self.path}")
+
+    def close(self):
+        self.save()
+        self.db.close()
+
+    def __enter__(self) -> "AnnIndex":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
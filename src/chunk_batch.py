@@ -0,0 +1,195 @@
+# src/chunk_batch.py
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# Metadata the vector index needs for filtering when texts live in a DocumentStore
+FILTER_FIELDS = ("video_id", "start_time", "end_time")
+
+
+def start_millis(start_time: float) -> int:
+    """Millisecond a chunk starting at `start_time` seconds is identified by."""
+    return int(round(start_time * 1000))
+
+
+def chunk_id(video_id: str, start_ms: int) -> str:
+    """
+    Vector id of the chunk of `video_id` starting `start_ms` milliseconds in.
+
+    Milliseconds keep chunks that start within the same second apart.
+
+    Example:
+        >>> chunk_id("dQw4w9WgXcQ", start_millis(12.34))
+        'dQw4w9WgXcQ_000012340'
+    """
+    return f"{video_id}_{start_ms:09d}"
+
+
+def chunk_metadata(video_id: str, start_time: float, end_time: float, text: str,
+                   start_second: Optional[int] = None) -> Dict:
+    """Metadata stored with each chunk; links use whole seconds, times keep sub-second precision."""
+    start_second = start_millis(start_time) // 1000 if start_second is None else start_second
+    return {
+        "video_id": video_id,
+        "start_time": round(start_time, 2),
+        "end_time": round(end_time, 2),
+        "text": text,
+        "youtube_url": f"https://youtube.com/watch?v={video_id}&t={start_second}"
+    }
+
+
+@dataclass
+class ChunkBatch:
+    """
+    Chunks of one video stored as arrays instead of one dict per chunk.
+
+    Times are float64 arrays and `start_ms` holds the millisecond used in
+    each chunk's id, whose whole second is used in its link (taken before
+    times are rounded). All texts live in one string indexed by
+    `text_offsets` (len + 1 entries), and embeddings, once computed, are a
+    single C-contiguous float32 matrix with one row per chunk. Ids, metadata
+    and upsert payloads are built only when a consumer asks for them, and
+    slicing a batch returns views over the same arrays.
+    """
+    video_id: str
+    starts: np.ndarray
+    ends: np.ndarray
+    start_ms: np.ndarray
+    text_offsets: np.ndarray
+    text: str
+    embeddings: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_texts(cls, video_id: str, starts, ends, texts: List[str],
+                   start_ms=None) -> "ChunkBatch":
+        starts = np.asarray(starts, dtype=np.float64)
+        text_offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        if texts:
+            np.cumsum([len(t) for t in texts], out=text_offsets[1:])
+        return cls(
+            video_id=video_id,
+            starts=starts,
+            ends=np.asarray(ends, dtype=np.float64),
+            start_ms=np.rint(starts * 1000).astype(np.int64) if start_ms is None
+            else np.asarray(start_ms, dtype=np.int64),
+            text_offsets=text_offsets,
+            text="".join(texts)
+        )
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Dict], video_id: str) -> "ChunkBatch":
+        """Pack chunk dicts (as produced by ChunkProcessor.create_chunks) into a batch."""
+        batch = cls.from_texts(
+            video_id,
+            [c['metadata']['start_time'] for c in chunks],
+            [c['metadata']['end_time'] for c in chunks],
+            [c['metadata']['text'] for c in chunks],
+            start_ms=[int(c['id'].rsplit('_', 1)[1]) for c in chunks]
+        )
+        if chunks and all('values' in c for c in chunks):
+            batch.embeddings = np.ascontiguousarray([c['values'] for c in chunks], dtype=np.float32)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text_at(self, index: int) -> str:
+        return self.text[self.text_offsets[index]:self.text_offsets[index + 1]]
+
+    def texts(self) -> List[str]:
+        return [self.text_at(i) for i in range(len(self))]
+
+    def id_at(self, index: int) -> str:
+        return chunk_id(self.video_id, int(self.start_ms[index]))
+
+    def ids(self) -> List[str]:
+        return [self.id_at(i) for i in range(len(self))]
+
+    def metadata_at(self, index: int) -> Dict:
+        return chunk_metadata(self.video_id, float(self.starts[index]), float(self.ends[index]),
+                              self.text_at(index), int(self.start_ms[index]) // 1000)
+
+    def with_embeddings(self, embeddings: np.ndarray) -> "ChunkBatch":
+        """Attach one embedding row per chunk, stored as a contiguous float32 matrix."""
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if embeddings.shape[0] != len(self):
+            raise ValueError(f"Expected {len(self)} embeddings, got {embeddings.shape[0]}")
+        self.embeddings = embeddings
+        return self
+
+    def slice(self, start: int, stop: int) -> "ChunkBatch":
+        """Chunks `start` to `stop` (exclusive), sharing this batch's arrays and text."""
+        return ChunkBatch(
+            video_id=self.video_id,
+            starts=self.starts[start:stop],
+            ends=self.ends[start:stop],
+            start_ms=self.start_ms[start:stop],
+            text_offsets=self.text_offsets[start:stop + 1],
+            text=self.text,
+            embeddings=None if self.embeddings is None else self.embeddings[start:stop]
+        )
+
+    def take(self, indices: Sequence[int]) -> "ChunkBatch":
+        """Copy of the chunks at `indices`, in that order."""
+        indices = np.asarray(indices, dtype=np.int64)
+        batch = ChunkBatch.from_texts(self.video_id, self.starts[indices], self.ends[indices],
+                                      [self.text_at(i) for i in indices.tolist()],
+                                      start_ms=self.start_ms[indices])
+        if self.embeddings is not None:
+            batch.embeddings = np.ascontiguousarray(self.embeddings[indices])
+        return batch
+
+    def content_hashes(self, salt: str = "") -> List[str]:
+        """
+        Hex digest per chunk of its stored content: times, text and `salt`.
+
+        Pass the embedding model (and anything else that changes the vectors)
+        as `salt`, so a chunk hashes differently whenever it needs re-embedding.
+        """
+        hashes = []
+        for i in range(len(self)):
+            content = f"{salt}\0{self.starts[i]:.2f}\0{self.ends[i]:.2f}\0{self.text_at(i)}"
+            hashes.append(hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest())
+        return hashes
+
+    def upsert_payloads(self, metadata_fields: Optional[Sequence[str]] = None) -> Iterator[Dict]:
+        """
+        Yield vector store payloads one chunk at a time; rows become lists only here.
+
+        Args:
+            metadata_fields: Metadata keys to include, e.g. FILTER_FIELDS; defaults to all
+        """
+        if self.embeddings is None:
+            raise ValueError("ChunkBatch has no embeddings")
+        for i in range(len(self)):
+            metadata = self.metadata_at(i)
+            if metadata_fields is not None:
+                metadata = {key: metadata[key] for key in metadata_fields}
+            yield {
+                "id": self.id_at(i),
+                "values": self.embeddings[i].tolist(),
+                "metadata": metadata
+            }
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Yield chunks as dicts in the layout used by ChunkProcessor.create_chunks."""
+        for i in range(len(self)):
+            chunk = {"id": self.id_at(i), "metadata": self.metadata_at(i)}
+            if self.embeddings is not None:
+                chunk["values"] = self.embeddings[i].tolist()
+            yield chunk
+
+    def to_chunks(self) -> List[Dict]:
+        return list(self)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the batch."""
+        total = (self.starts.nbytes + self.ends.nbytes + self.start_ms.nbytes
+                 + self.text_offsets.nbytes + len(self.text))
+        if self.embeddings is not None:
+            total += self.embeddings.nbytes
+        return total
@@ -1,23 +1,85 @@
 # src/chunk_processor.py
 
-from typing import List, Dict, Optional
-from sentence_transformers import SentenceTransformer
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import partial
 import logging
 from enum import Enum
 import os
-from dotenv import load_dotenv
-import openai
 
-
-# Load environment variables
-load_dotenv()
+from .chunk_batch import ChunkBatch, chunk_id, chunk_metadata, start_millis
+from .embedding_cache import EmbeddingCache
+from .embedding_pool import EmbeddingPool, onnx_encoder, sentence_transformer_encoder
+from .model_registry import get_onnx_embedder, get_sentence_transformer
+from .projection import EmbeddingProjection
+from .embeddings import BatchedEmbedder, EmbeddingBatchConfig, EmbeddingClient, OpenAIEmbeddingClient
+from .transcript_format import Transcript, is_binary_transcript
+from .utils import load_config, load_env
+
+_TIMESTAMP_RE = re.compile(r'\[(\d{2}):(\d{2}):(\d{2})\]')
+_LINE_RE = re.compile(r'\[(\d{2}):(\d{2}):(\d{2})\](.*)')
+LEGACY_SEGMENT_SECONDS = 5  # end time of a legacy segment with no timestamped line after it
+
+
+def chunk_windows(starts: np.ndarray, ends: np.ndarray, chunk_size: float,
+                  overlap: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Segment index ranges [first, stop) of every chunk, for sorted segment start times.
+
+    A chunk starting at segment `f` takes segments until the next start is
+    `chunk_size` seconds past `starts[f]`; the next chunk starts at the
+    earliest of those segments that begins after `chunk_end - overlap`, but
+    always on a later segment. Both boundaries are found for every possible
+    `f` at once with searchsorted, then the chain of chunk starts is followed
+    from segment 0. A chunk that runs to the last segment ends at that
+    segment's end time.
+
+    Example:
+        >>> starts = np.array([0., 10., 20., 30., 40.])
+        >>> chunk_windows(starts, starts + 10, 30, 5)
+        (array([0, 3]), array([3, 5]))
+    """
+    n = len(starts)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    index = np.arange(n)
+    # stop: first segment j > f with starts[j] - starts[f] >= chunk_size
+    stops = np.maximum(index + 1, np.searchsorted(starts, starts + chunk_size, side='left'))
+    # searchsorted compares against the rounded sum; settle boundary cases with the exact test
+    while True:
+        grow = (stops < n) & (starts[np.minimum(stops, n - 1)] - starts < chunk_size)
+        shrink = (stops > index + 1) & (starts[stops - 1] - starts >= chunk_size)
+        if not grow.any() and not shrink.any():
+            break
+        stops = stops + grow - shrink
+
+    next_time = np.where(stops < n, starts[np.minimum(stops, n - 1)], ends[n - 1])
+    chunk_ends = np.minimum(starts + chunk_size, next_time)
+    # Overlap: earliest segment in (f, stop] whose start is past chunk_end - overlap
+    reach = np.searchsorted(starts, chunk_ends - overlap, side='right')
+    following = np.maximum(index + 1, np.minimum(stops, reach))
+
+    firsts = []
+    f = 0
+    while f < n:
+        firsts.append(f)
+        f = following[f]
+    firsts = np.array(firsts, dtype=np.int64)
+    return firsts, stops[firsts]
 
 
 class EmbeddingType(Enum):
     HUGGINGFACE = "huggingface"
     OPENAI = "openai"
+    ONNX = "onnx"  # hf_model_name exported to ONNX with int8 weights, CPU only
+
+
+def configured_embedding_cache_path() -> Optional[str]:
+    """`vector_store.embedding_cache_path` from config/config.yaml; None (null) disables the cache."""
+    return load_config().get("vector_store", {}).get("embedding_cache_path")
 
 
 @dataclass
@@ -26,129 +88,301 @@ class ChunkConfig:
     overlap: int = 5  # seconds
     embedding_type: EmbeddingType = EmbeddingType.HUGGINGFACE
     hf_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_batch_size: int = 64  # texts per HuggingFace encode batch
+    embedding_processes: int = 0  # HuggingFace/ONNX worker processes, 0 encodes in the calling thread
+    onnx_model_dir: str = "models/onnx"  # exported ONNX models, created on first use
+    openai_model: str = "text-embedding-ada-002"
+    openai_max_batch_tokens: int = 8000  # tokens per embeddings request
+    openai_max_in_flight: int = 4  # concurrent embeddings requests
+    # Defaults to config/config.yaml; None disables the embedding cache
+    embedding_cache_path: Optional[str] = field(default_factory=configured_embedding_cache_path)
+    embedding_cache_max_bytes: int = 1024 ** 3
+    projection_path: Optional[str] = None  # saved EmbeddingProjection; None stores full-width vectors
 
 
 class ChunkProcessor:
-    def __init__(self, config: Optional[ChunkConfig] = None):
-        """Initialize the chunk processor with configuration."""
+    def __init__(self, config: Optional[ChunkConfig] = None,
+                 embedding_client: Optional[EmbeddingClient] = None):
+        """
+        Initialize the chunk processor with configuration.
+
+        Args:
+            config: Chunking and embedding configuration
+            embedding_client: Client for the OpenAI embedding type, defaults to the
+                              OpenAI API using OPENAI_API_KEY from the environment
+        """
         self.config = config or ChunkConfig()
         self.logger = logging.getLogger('ChunkProcessor')
 
-        # Initialize embedding model
+        # Initialize embedding model; HuggingFace models are loaded on first use and shared
         if self.config.embedding_type == EmbeddingType.HUGGINGFACE:
-            self.logger.info(f"Initializing HuggingFace model: {self.config.hf_model_name}")
-            self.model = SentenceTransformer(self.config.hf_model_name)
+            self.embedding_model_name = f"huggingface/{self.config.hf_model_name}"
+        elif self.config.embedding_type == EmbeddingType.ONNX:
+            # Quantized vectors differ slightly, so they are cached separately
+            self.embedding_model_name = f"onnx-int8/{self.config.hf_model_name}"
         else:
-            openai.api_key = os.getenv("OPENAI_API_KEY")
-            if not openai.api_key:
-                raise ValueError("OpenAI API key not found in environment variables")
+            if embedding_client is None:
+                import openai
+                load_env()
+                openai.api_key = os.getenv("OPENAI_API_KEY")
+                if not openai.api_key:
+                    raise ValueError("OpenAI API key not found in environment variables")
+                embedding_client = OpenAIEmbeddingClient(self.config.openai_model)
+            self.embedder = BatchedEmbedder(embedding_client, EmbeddingBatchConfig(
+                max_batch_tokens=self.config.openai_max_batch_tokens,
+                max_in_flight=self.config.openai_max_in_flight
+            ))
+            self.embedding_model_name = embedding_client.name
+
+        self._embedding_pool: Optional[EmbeddingPool] = None
+
+        # Optional reduction of the stored dimension; RAGEngine applies the same projection to queries
+        self.projection = (
+            EmbeddingProjection.load(self.config.projection_path)
+            if self.config.projection_path else None
+        )
+
+        # Identical chunk texts are only ever embedded once per model
+        self.embedding_cache = (
+            EmbeddingCache(self.config.embedding_cache_path, self.config.embedding_cache_max_bytes)
+            if self.config.embedding_cache_path else None
+        )
+
+    @property
+    def model(self):
+        """Shared SentenceTransformer (or ONNX embedder) for `hf_model_name`, loaded on first access."""
+        if self.config.embedding_type == EmbeddingType.ONNX:
+            return get_onnx_embedder(self.config.hf_model_name, self.config.onnx_model_dir)
+        return get_sentence_transformer(self.config.hf_model_name)
+
+    @property
+    def embedding_pool(self) -> EmbeddingPool:
+        """Process pool for HuggingFace or ONNX embeddings, started on first use."""
+        if self._embedding_pool is None:
+            if self.config.embedding_type == EmbeddingType.ONNX:
+                encoder_factory = partial(onnx_encoder, self.config.hf_model_name, self.config.embedding_batch_size,
+                                          model_dir=self.config.onnx_model_dir)
+            else:
+                encoder_factory = partial(sentence_transformer_encoder, self.config.hf_model_name,
+                                          self.config.embedding_batch_size)
+            self._embedding_pool = EmbeddingPool(
+                encoder_factory,
+                processes=self.config.embedding_processes,
+                batch_size=self.config.embedding_batch_size
+            )
+        return self._embedding_pool
+
+    def index_settings(self) -> Dict:
+        """Chunking settings recorded with each indexed video, see VideoRegistry."""
+        return {
+            "chunk_size": self.config.chunk_size,
+            "overlap": self.config.overlap,
+            "projection_path": self.config.projection_path,
+        }
+
+    def content_hashes(self, batch: ChunkBatch) -> List[str]:
+        """Content hash per chunk, changing with its text, times, embedding model and projection."""
+        return batch.content_hashes(f"{self.embedding_model_name}\0{self.config.projection_path or ''}")
+
+    def close(self):
+        """Stop the embedding worker processes, if any were started."""
+        if self._embedding_pool is not None:
+            self._embedding_pool.close()
+            self._embedding_pool = None
 
     def parse_timestamp(self, timestamp: str) -> int:
         """Convert [HH:MM:SS] format to seconds."""
-        match = re.match(r'\[(\d{2}):(\d{2}):(\d{2})\]', timestamp)
+        match = _TIMESTAMP_RE.match(timestamp)
         if match:
             hours, minutes, seconds = map(int, match.groups())
             return hours * 3600 + minutes * 60 + seconds
         return 0
 
     def read_transcript(self, transcript_path: str) -> List[Dict]:
-        """Read and parse transcript file with timestamps."""
-        segments = []
-
+        """Read and parse a transcript file into a list of segments."""
+        return list(self.iter_transcript(transcript_path))
+
+    def iter_transcript(self, transcript_path: str) -> Iterator[Dict]:
+        """
+        Yield the segments of a transcript file one at a time.
+
+        Binary transcripts keep Whisper's float start/end times and are read
+        through a memory map. Legacy `[HH:MM:SS] text` files are parsed in a
+        single pass with one line of lookahead: a segment ends where the next
+        line's timestamp starts, or LEGACY_SEGMENT_SECONDS after its own start
+        when the next line has no timestamp.
+        """
+        if is_binary_transcript(transcript_path):
+            with Transcript(transcript_path) as transcript:
+                yield from transcript
+            return
+
+        pending = None
         with open(transcript_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-            for i, line in enumerate(lines):
-                # Find timestamp and text
-                timestamp_match = re.match(r'(\[\d{2}:\d{2}:\d{2}\])(.*)', line.strip())
-                if timestamp_match:
-                    timestamp, text = timestamp_match.groups()
-                    start_time = self.parse_timestamp(timestamp)
-
-                    # Calculate end time (use next segment's start time or add a fixed duration for the last segment)
-                    if i < len(lines) - 1:
-                        next_timestamp_match = re.match(r'(\[\d{2}:\d{2}:\d{2}\])', lines[i + 1].strip())
-                        if next_timestamp_match:
-                            end_time = self.parse_timestamp(next_timestamp_match.group(1))
-                        else:
-                            end_time = start_time + 5  # Default 5 seconds if can't determine
-                    else:
-                        end_time = start_time + 5  # Last segment
-
-                    segments.append({
-                        'start': start_time,
-                        'end': end_time,
-                        'text': text.strip()
-                    })
-
-        return segments
-
-    def create_chunks(self, segments: List[Dict], video_id: str) -> List[Dict]:
-        """Create chunks from transcript segments."""
+            for line in f:
+                match = _LINE_RE.match(line.strip())
+                start_time = None
+                if match:
+                    hours, minutes, seconds, text = match.groups()
+                    start_time = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+                if pending is not None:
+                    pending['end'] = start_time if start_time is not None else pending['start'] + LEGACY_SEGMENT_SECONDS
+                    yield pending
+                    pending = None
+
+                if match:
+                    pending = {'start': start_time, 'end': None, 'text': text.strip()}
+
+        if pending is not None:
+            pending['end'] = pending['start'] + LEGACY_SEGMENT_SECONDS
+            yield pending
+
+    def create_chunks(self, segments: Iterable[Dict], video_id: str) -> List[Dict]:
+        """
+        Create chunks from transcript segments.
+
+        Lists of segments sorted by start time are chunked with `chunk_windows`;
+        other iterables (e.g. `iter_transcript`) are chunked as a stream.
+        """
+        if not isinstance(segments, Sequence):
+            return list(self.iter_chunks(segments, video_id))
+
+        starts = np.fromiter((s['start'] for s in segments), dtype=np.float64, count=len(segments))
+        if len(starts) > 1 and np.any(starts[1:] < starts[:-1]):
+            return list(self.iter_chunks(segments, video_id))
+        ends = np.fromiter((s['end'] for s in segments), dtype=np.float64, count=len(segments))
+
+        return self._chunks_from_windows(
+            starts,
+            ends,
+            lambda i: segments[i]['start'],
+            lambda i: segments[i]['end'],
+            lambda first, stop: " ".join(s['text'] for s in segments[first:stop]),
+            video_id
+        )
+
+    def create_transcript_chunks(self, transcript: Transcript, video_id: str) -> List[Dict]:
+        """Create chunks straight from the memory-mapped arrays of a binary transcript."""
+        starts, ends = transcript.starts, transcript.ends
+        if len(starts) > 1 and np.any(starts[1:] < starts[:-1]):
+            return list(self.iter_chunks(transcript, video_id))
+
+        return self._chunks_from_windows(
+            starts,
+            ends,
+            lambda i: float(starts[i]),
+            lambda i: float(ends[i]),
+            lambda first, stop: " ".join(transcript.texts(first, stop)),
+            video_id
+        )
+
+    def _chunks_from_windows(self, starts: np.ndarray, ends: np.ndarray, start_at: Callable[[int], float],
+                             end_at: Callable[[int], float], text_of: Callable[[int, int], str],
+                             video_id: str) -> List[Dict]:
+        """Build chunk dicts from `chunk_windows` index ranges, reading times and text only per chunk."""
+        n = len(starts)
         chunks = []
-        i = 0
-        total_segments = len(segments)
+        firsts, stops = chunk_windows(starts, ends, self.config.chunk_size, self.config.overlap)
+        for first, stop in zip(firsts.tolist(), stops.tolist()):
+            chunk_start = start_at(first)
+            current_time = start_at(stop) if stop < n else end_at(n - 1)
+            chunk_end = min(chunk_start + self.config.chunk_size, current_time)
+            chunks.append(self._create_chunk_dict(text_of(first, stop), chunk_start, chunk_end, video_id))
+        return chunks
+
+    def iter_chunks(self, segments: Iterable[Dict], video_id: str) -> Iterator[Dict]:
+        """
+        Create chunks from a stream of transcript segments.
+
+        Produces the same chunks as `create_chunks`, but only holds the
+        segments of the current chunk and yields each chunk as soon as the
+        segment after it has arrived.
+        """
+        stream = iter(segments)
+        buffer = []  # segments[base:] that may still be part of a chunk
+        base = 0
+
+        def available(index: int) -> bool:
+            while index - base >= len(buffer):
+                segment = next(stream, None)
+                if segment is None:
+                    return False
+                buffer.append(segment)
+            return True
+
+        def segment_at(index: int) -> Dict:
+            return buffer[index - base]
 
-        while i < total_segments:
+        i = 0
+        while available(i):
+            first = i
             chunk_texts = []
-            chunk_start = segments[i]['start']
+            chunk_start = segment_at(i)['start']
             current_time = chunk_start
 
             # Collect segments for current chunk
-            while i < total_segments and (current_time - chunk_start) < self.config.chunk_size:
-                chunk_texts.append(segments[i]['text'])
-                if i < total_segments - 1:
-                    current_time = segments[i + 1]['start']
+            while available(i) and (current_time - chunk_start) < self.config.chunk_size:
+                chunk_texts.append(segment_at(i)['text'])
+                if available(i + 1):
+                    current_time = segment_at(i + 1)['start']
                 else:
-                    current_time = segments[i]['end']
+                    current_time = segment_at(i)['end']
                 i += 1
 
-            # Create chunk
             chunk_end = min(chunk_start + self.config.chunk_size, current_time)
-            chunk = self._create_chunk_dict(
-                " ".join(chunk_texts),
-                chunk_start,
-                chunk_end,
-                video_id
-            )
-            chunks.append(chunk)
+            yield self._create_chunk_dict(" ".join(chunk_texts), chunk_start, chunk_end, video_id)
 
-            # Move back for overlap
-            while i > 0 and segments[i - 1]['start'] > (chunk_end - self.config.overlap):
+            # Move back for overlap, but always start the next chunk on a later segment
+            while i > first + 1 and segment_at(i - 1)['start'] > (chunk_end - self.config.overlap):
                 i -= 1
 
-        return chunks
+            # Forget segments that no later chunk can reach
+            if i - 1 > base:
+                del buffer[:i - 1 - base]
+                base = i - 1
 
-    def _create_chunk_dict(self, text: str, start_time: int, end_time: int, video_id: str) -> Dict:
+    def _create_chunk_dict(self, text: str, start_time: float, end_time: float, video_id: str) -> Dict:
         """Create a chunk dictionary with metadata."""
         return {
-            "id": f"{video_id}_{start_time:06d}",
-            "metadata": {
-                "video_id": video_id,
-                "start_time": start_time,
-                "end_time": end_time,
-                "text": text,
-                "youtube_url": f"https://youtube.com/watch?v={video_id}&t={start_time}"
-            }
+            "id": chunk_id(video_id, start_millis(start_time)),
+            "metadata": chunk_metadata(video_id, start_time, end_time, text)
         }
 
+    def create_chunk_batch(self, segments, video_id: str) -> ChunkBatch:
+        """
+        Chunk segments (a list of dicts or a binary Transcript) into a ChunkBatch.
+
+        Same chunks as `create_chunks`, but built straight from the window
+        index ranges into arrays, without a dict per chunk.
+        """
+        if isinstance(segments, Transcript):
+            starts, ends = segments.starts, segments.ends
+            text_of = lambda first, stop: " ".join(segments.texts(first, stop))
+        elif isinstance(segments, Sequence):
+            starts = np.fromiter((s['start'] for s in segments), dtype=np.float64, count=len(segments))
+            ends = np.fromiter((s['end'] for s in segments), dtype=np.float64, count=len(segments))
+            text_of = lambda first, stop: " ".join(s['text'] for s in segments[first:stop])
+        else:
+            return ChunkBatch.from_chunks(list(self.iter_chunks(segments, video_id)), video_id)
+
+        if len(starts) > 1 and np.any(starts[1:] < starts[:-1]):
+            return ChunkBatch.from_chunks(list(self.iter_chunks(segments, video_id)), video_id)
+
+        n = len(starts)
+        firsts, stops = chunk_windows(starts, ends, self.config.chunk_size, self.config.overlap)
+        chunk_starts = starts[firsts]
+        next_times = np.where(stops < n, starts[np.minimum(stops, n - 1)], ends[n - 1] if n else 0.0)
+        chunk_ends = np.minimum(chunk_starts + self.config.chunk_size, next_times)
+        texts = [text_of(first, stop) for first, stop in zip(firsts.tolist(), stops.tolist())]
+        return ChunkBatch.from_texts(video_id, chunk_starts, chunk_ends, texts)
+
     def generate_embeddings(self, chunks: List[Dict]) -> List[Dict]:
-        """Generate embeddings for chunks."""
+        """Generate embeddings for chunks (float32 values, see `embed_texts`)."""
         try:
-            texts = [chunk['metadata']['text'] for chunk in chunks]
-
-            if self.config.embedding_type == EmbeddingType.HUGGINGFACE:
-                embeddings = self.model.encode(texts)
-                for chunk, embedding in zip(chunks, embeddings):
-                    chunk['values'] = embedding.tolist()
-            else:
-                # OpenAI embeddings
-                for chunk in chunks:
-                    response = openai.Embedding.create(
-                        model="text-embedding-ada-002",
-                        input=chunk['metadata']['text']
-                    )
-                    chunk['values'] = response['data'][0]['embedding']
+            embeddings = self.embed_texts([chunk['metadata']['text'] for chunk in chunks])
+            for chunk, vector in zip(chunks, embeddings):
+                chunk['values'] = vector.tolist()
 
             return chunks
 
@@ -156,15 +390,67 @@ class ChunkProcessor:
             self.logger.error(f"Error generating embeddings: {str(e)}")
             raise
 
+    def embed_chunk_batch(self, batch: ChunkBatch) -> ChunkBatch:
+        """Fill in the embedding matrix of a ChunkBatch."""
+        try:
+            return batch.with_embeddings(self.embed_texts(batch.texts()))
+        except Exception as e:
+            self.logger.error(f"Error generating embeddings: {str(e)}")
+            raise
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed `texts` into a float32 matrix with one row per text.
+
+        Texts already in the embedding cache are not re-encoded, and texts that
+        repeat within `texts` are encoded once. With a projection configured the
+        rows have the projected dimension; the cache always holds full vectors.
+        """
+        if self.embedding_cache:
+            vectors = self.embedding_cache.get_many(self.embedding_model_name, texts)
+        else:
+            vectors = [None] * len(texts)
+
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            encoded = dict(zip(missing, self._encode(missing)))
+            if self.embedding_cache:
+                self.embedding_cache.put_many(self.embedding_model_name, missing, list(encoded.values()))
+            vectors = [encoded[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        vectors = np.vstack(vectors).astype(np.float32, copy=False)
+        return self.projection.apply(vectors) if self.projection else vectors
+
+    def _encode(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed `texts` with the configured model."""
+        if self.config.embedding_type in (EmbeddingType.HUGGINGFACE, EmbeddingType.ONNX):
+            if self.config.embedding_processes > 0:
+                return list(self.embedding_pool.encode(texts))
+            return list(self.model.encode(texts, batch_size=self.config.embedding_batch_size))
+        # OpenAI embeddings: token-sized batches sent concurrently
+        return [np.asarray(vector, dtype=np.float32) for vector in self.embedder.embed(texts)]
+
+    def chunk_transcript_file(self, transcript_path: str, video_id: str) -> List[Dict]:
+        """Chunk a transcript file without embedding it."""
+        if is_binary_transcript(transcript_path):
+            with Transcript(transcript_path) as transcript:
+                return self.create_transcript_chunks(transcript, video_id)
+        # Stream legacy segments straight into the chunker
+        return self.create_chunks(self.iter_transcript(transcript_path), video_id)
+
+    def chunk_batch_file(self, transcript_path: str, video_id: str) -> ChunkBatch:
+        """Chunk a transcript file into a ChunkBatch without embedding it."""
+        if is_binary_transcript(transcript_path):
+            with Transcript(transcript_path) as transcript:
+                return self.create_chunk_batch(transcript, video_id)
+        return self.create_chunk_batch(self.iter_transcript(transcript_path), video_id)
+
     def process_transcript_file(self, transcript_path: str, video_id: str) -> List[Dict]:
         """Process a transcript file and return chunks with embeddings."""
         try:
-            # Read and parse transcript
-            segments = self.read_transcript(transcript_path)
-            self.logger.info(f"Read {len(segments)} segments from transcript")
-
-            # Create chunks
-            chunks = self.create_chunks(segments, video_id)
+            chunks = self.chunk_transcript_file(transcript_path, video_id)
             self.logger.info(f"Created {len(chunks)} chunks")
 
             # Generate embeddings
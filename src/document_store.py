@@ -0,0 +1,141 @@
+# src/document_store.py
+
+import sqlite3
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .chunk_batch import ChunkBatch, chunk_metadata
+from .time_index import TimeIndex
+
+
+class DocumentStore:
+    def __init__(self, db_path: str = "documents.db", compression_level: int = 6):
+        """
+        Local store of chunk texts, keyed by chunk id.
+
+        Keeps the heavy part of each chunk out of the vector index: the index
+        only holds ids and the fields used for filtering, and search results
+        are hydrated from here in one query. Texts are zlib-compressed per
+        chunk, so any chunk can be read on its own. Derived fields such as the
+        YouTube link are rebuilt on read instead of being stored. Per-video
+        time indexes answer `chunk_at` and are dropped whenever the database
+        changes, including writes from other processes.
+
+        Args:
+            db_path: Path of the SQLite database file
+            compression_level: zlib level, 1 (fastest) to 9 (smallest)
+        """
+        self.db_path = db_path
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        # video_id -> (time index, chunk ids by index position)
+        self._time_indexes: Dict[str, Tuple[TimeIndex, List[str]]] = {}
+        self._data_version = None
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id TEXT PRIMARY KEY,
+                video_id TEXT NOT NULL,
+                start_time REAL NOT NULL,
+                end_time REAL NOT NULL,
+                text BLOB NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS documents_video ON documents (video_id)")
+        self._conn.commit()
+
+    def put_chunk_batch(self, batch: ChunkBatch):
+        self._put([
+            (batch.id_at(i), batch.video_id, float(batch.starts[i]), float(batch.ends[i]), batch.text_at(i))
+            for i in range(len(batch))
+        ])
+
+    def put_chunks(self, chunks: Sequence[Dict], video_id: Optional[str] = None):
+        """Store chunk dicts in the layout of ChunkProcessor.create_chunks, of `video_id` or their metadata's video."""
+        self._put([
+            (c['id'], video_id or c['metadata']['video_id'], c['metadata']['start_time'],
+             c['metadata']['end_time'], c['metadata']['text'])
+            for c in chunks
+        ])
+
+    def _put(self, rows: List[tuple]):
+        compressed = [
+            (chunk_id, video_id, start, end, zlib.compress(text.encode('utf-8'), self.compression_level))
+            for chunk_id, video_id, start, end, text in rows
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)", compressed)
+            self._conn.commit()
+            for row in rows:
+                self._time_indexes.pop(row[1], None)
+
+    def get_many(self, ids: Sequence[str]) -> Dict[str, Dict]:
+        """
+        Metadata of the chunks in `ids` (video_id, start_time, end_time, text, youtube_url).
+
+        Returns a dict keyed by chunk id; ids not in the store are left out.
+        """
+        rows = []
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                part = list(ids[start:start + 500])
+                rows.extend(self._conn.execute(
+                    f"SELECT id, video_id, start_time, end_time, text FROM documents "
+                    f"WHERE id IN ({','.join('?' * len(part))})", part))
+        return {
+            chunk_id: chunk_metadata(video_id, start, end, zlib.decompress(text).decode('utf-8'),
+                                     int(chunk_id.rsplit('_', 1)[1]) // 1000)
+            for chunk_id, video_id, start, end, text in rows
+        }
+
+    def time_index(self, video_id: str) -> Tuple[TimeIndex, List[str]]:
+        """Time index over a video's chunks and the chunk id at each of its positions."""
+        with self._lock:
+            # data_version changes when another connection commits; own writes clear the cache directly
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                self._time_indexes.clear()
+                self._data_version = data_version
+            cached = self._time_indexes.get(video_id)
+            if cached is None:
+                rows = self._conn.execute(
+                    "SELECT id, start_time, end_time FROM documents WHERE video_id = ?", (video_id,)).fetchall()
+                cached = (TimeIndex([row[1] for row in rows], [row[2] for row in rows]), [row[0] for row in rows])
+                self._time_indexes[video_id] = cached
+        return cached
+
+    def chunk_at(self, video_id: str, time: float) -> Optional[Dict]:
+        """The chunk playing at `time` seconds into a video (with its id), or None."""
+        index, ids = self.time_index(video_id)
+        position = index.at(time)
+        if position is None:
+            return None
+        chunk_id = ids[position]
+        return dict(self.get_many([chunk_id])[chunk_id], id=chunk_id)
+
+    def delete(self, ids: Iterable[str]):
+        ids = list(ids)
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                part = ids[start:start + 500]
+                self._conn.execute(f"DELETE FROM documents WHERE id IN ({','.join('?' * len(part))})", part)
+            self._conn.commit()
+            self._time_indexes.clear()
+
+    def delete_video(self, video_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM documents WHERE video_id = ?", (video_id,))
+            self._conn.commit()
+            self._time_indexes.pop(video_id, None)
+
+    def stats(self) -> Dict:
+        """Number of documents and the compressed size of their texts."""
+        with self._lock:
+            count, compressed = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(text)), 0) FROM documents").fetchone()
+        return {'documents': count, 'compressed_bytes': compressed}
+
+    def close(self):
+        self._conn.close()
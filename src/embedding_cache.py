@@ -0,0 +1,151 @@
+# src/embedding_cache.py
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def text_key(text: str) -> bytes:
+    """
+    Hash of `text` with whitespace normalized, so re-chunked copies of the same words match.
+
+    Example:
+        >>> text_key("hello  world\\n") == text_key("hello world")
+        True
+    """
+    normalized = " ".join(text.split())
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    def __init__(self, db_path: str, max_bytes: int = 1024 ** 3):
+        """
+        SQLite-backed cache of embeddings keyed by (model, text hash).
+
+        Vectors are stored as raw float32 blobs. When the stored vectors grow
+        past `max_bytes`, the least recently used entries are evicted down to
+        90% of the budget.
+
+        Args:
+            db_path: Path of the SQLite database file
+            max_bytes: Size budget for the stored vectors
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash BLOB NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Cached float32 vectors for `texts`, None where a text has not been embedded with `model`."""
+        keys = [text_key(text) for text in texts]
+        with self._lock:
+            found = {
+                key: np.frombuffer(vector, dtype=np.float32)
+                for key, vector in self._select("text_hash, vector", model, keys)
+            }
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, key) for key in found]
+                )
+                self._conn.commit()
+
+            vectors = [found.get(key) for key in keys]
+            hits = sum(vector is not None for vector in vectors)
+            self.hits += hits
+            self.misses += len(vectors) - hits
+        return vectors
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Store the vectors of `texts` embedded with `model`."""
+        now = time.time()
+        rows = {
+            text_key(text): np.asarray(vector, dtype=np.float32).tobytes()
+            for text, vector in zip(texts, vectors)
+        }
+        with self._lock:
+            replaced = sum(size for size, in self._select("LENGTH(vector)", model, list(rows)))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model, key, blob, now) for key, blob in rows.items()]
+            )
+            self._conn.commit()
+            self._bytes += sum(len(blob) for blob in rows.values()) - replaced
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _select(self, columns: str, model: str, keys: List[bytes]) -> List[tuple]:
+        """Rows of `model` whose hash is in `keys`, queried in batches. Caller holds the lock."""
+        rows = []
+        unique = list(dict.fromkeys(keys))
+        # Stay well below SQLite's limit on query parameters
+        for start in range(0, len(unique), 500):
+            batch = unique[start:start + 500]
+            rows.extend(self._conn.execute(
+                f"SELECT {columns} FROM embeddings WHERE model = ? "
+                f"AND text_hash IN ({', '.join('?' * len(batch))})",
+                (model, *batch)
+            ).fetchall())
+        return rows
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is at 90% of its budget. Caller holds the lock."""
+        target = int(self.max_bytes * 0.9)
+        while self._bytes > target:
+            rows = self._conn.execute(
+                "SELECT model, text_hash, LENGTH(vector) FROM embeddings ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for model, key, size in rows:
+                if self._bytes <= target:
+                    break
+                victims.append((model, key))
+                self._bytes -= size
+            self._conn.executemany("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", victims)
+            self.evictions += len(victims)
+        self._conn.commit()
+        logger.info(f"Evicted embeddings down to {self._bytes} bytes ({self.evictions} evicted so far)")
+
+    def stats(self) -> Dict:
+        """Hit/miss counts since this cache was opened, plus current size."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': entries,
+                'bytes': self._bytes,
+            }
+
+    def close(self):
+        self._conn.close()
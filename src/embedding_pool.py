@@ -0,0 +1,147 @@
+# src/embedding_pool.py
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Encoder of the current worker process, created once by _init_worker
+_encoder = None
+
+
+def sentence_transformer_encoder(model_name: str, batch_size: int = 64):
+    """Encoder factory for worker processes: a SentenceTransformer from the model registry."""
+    from .model_registry import get_sentence_transformer
+    model = get_sentence_transformer(model_name)
+    return partial(model.encode, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+
+
+def onnx_encoder(model_name: str, batch_size: int = 64, model_dir: str = "models/onnx"):
+    """Encoder factory for worker processes: the int8 ONNX export of `model_name` under `model_dir`."""
+    from .model_registry import get_onnx_embedder
+    model = get_onnx_embedder(model_name, model_dir)
+    return partial(model.encode, batch_size=batch_size)
+
+
+def local_encoder(dimension: int = 384):
+    """Encoder factory backed by LocalEmbeddingClient, for offline tests and benchmarks."""
+    from .embeddings import LocalEmbeddingClient
+    client = LocalEmbeddingClient(dimension=dimension)
+    return lambda texts: np.asarray(client.embed(texts), dtype=np.float32)
+
+
+def _init_worker(encoder_factory: Callable, threads: int):
+    global _encoder
+    # One compute thread per process; the pool itself provides the parallelism
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _encoder = encoder_factory()
+
+
+def _dimension() -> int:
+    return int(np.asarray(_encoder(["dimension probe"])).shape[1])
+
+
+def _encode_into(shm_name: str, shape: tuple, rows: List[int], texts: List[str]) -> int:
+    """Encode `texts` and write them to `rows` of the shared output matrix."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        out[rows] = np.asarray(_encoder(texts), dtype=np.float32)
+        del out
+    finally:
+        shm.close()
+    return len(rows)
+
+
+class EmbeddingPool:
+    def __init__(self, encoder_factory: Callable, processes: Optional[int] = None,
+                 batch_size: int = 64, threads_per_process: int = 1):
+        """
+        Spread CPU embedding work over a pool of worker processes.
+
+        Every worker builds its own encoder once. Texts are sorted by length and
+        cut into batches of similar length, so little work is wasted on
+        padding, and the batches are encoded in parallel. Workers write their
+        vectors straight into one shared-memory float32 matrix instead of
+        pickling them back to the parent.
+
+        Args:
+            encoder_factory: Picklable callable returning a function that maps a
+                             list of texts to a 2D array, e.g.
+                             partial(sentence_transformer_encoder, model_name)
+            processes: Number of worker processes, defaults to the CPU count
+            batch_size: Texts per task sent to a worker
+            threads_per_process: Compute threads each worker may use
+        """
+        self.encoder_factory = encoder_factory
+        self.processes = processes or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.threads_per_process = threads_per_process
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._dimension: Optional[int] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forked children of a process that already runs torch threads can deadlock
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.encoder_factory, self.threads_per_process)
+            )
+            self._dimension = self._executor.submit(_dimension).result()
+            logger.info(f"Started {self.processes} embedding processes (dimension {self._dimension})")
+        return self._executor
+
+    @property
+    def dimension(self) -> int:
+        self._pool()
+        return self._dimension
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed `texts` into a float32 matrix with one row per text, in input order."""
+        executor = self._pool()
+        shape = (len(texts), self._dimension)
+        if not texts:
+            return np.zeros(shape, dtype=np.float32)
+
+        # Length bucketing: neighbouring texts in a batch need similar padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 4))
+        try:
+            futures = [
+                executor.submit(_encode_into, shm.name, shape, rows, [texts[i] for i in rows])
+                for rows in batches
+            ]
+            for future in futures:
+                future.result()
+            return np.ndarray(shape, dtype=np.float32, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "EmbeddingPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,231 @@
+# src/embeddings.py
+
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+
+from .utils import retry_delay
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def retryable_errors() -> tuple:
+    """Errors worth retrying: the request may succeed if sent again later."""
+    import openai
+    return (
+        openai.error.RateLimitError,
+        openai.error.ServiceUnavailableError,
+        openai.error.APIConnectionError,
+        openai.error.Timeout,
+        openai.error.APIError,
+    )
+
+
+@lru_cache(maxsize=1)
+def _tokenizer():
+    """cl100k_base encoding (used by text-embedding-ada-002), or None without tiktoken."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Token count of `text`, using tiktoken when it is installed.
+
+    Without tiktoken, ASCII text is estimated at four characters per token,
+    which is close for English. Four characters per token would undercount
+    CJK and other non-Latin text, which often takes a token or more per
+    character, so non-ASCII characters count one token per UTF-8 byte: the
+    most a byte-level BPE tokenizer can produce.
+
+    Example:
+        >>> estimate_tokens("") >= 1
+        True
+    """
+    tokenizer = _tokenizer()
+    if tokenizer is None:
+        ascii_chars = len(text.encode('ascii', 'ignore'))
+        non_ascii_bytes = len(text.encode('utf-8')) - ascii_chars
+        return max(1, math.ceil(ascii_chars / 4) + non_ascii_bytes)
+    return max(1, len(tokenizer.encode(text)))
+
+
+def batch_by_tokens(texts: List[str], max_tokens: int, max_size: int) -> List[List[int]]:
+    """
+    Group consecutive texts into batches of at most `max_tokens` tokens and `max_size` inputs.
+
+    Returns the indexes of the texts in each batch. A single text larger than
+    `max_tokens` gets a batch of its own.
+
+    Example:
+        >>> batch_by_tokens(["aaaa", "aaaa", "aaaa"], max_tokens=2, max_size=10)
+        [[0, 1], [2]]
+    """
+    batches = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_size):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+class EmbeddingClient(ABC):
+    """
+    Embedding backend used by ChunkProcessor.
+
+    Implementations embed a batch of texts in one request and return one
+    vector per text, in input order. `name` identifies the model in caches,
+    so it must change whenever the vectors would.
+    """
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        ...
+
+
+class OpenAIEmbeddingClient(EmbeddingClient):
+    def __init__(self, model: str = "text-embedding-ada-002"):
+        """Embed through the OpenAI embeddings API."""
+        self.model = model
+
+    @property
+    def name(self) -> str:
+        return f"openai/{self.model}"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        import openai
+        response = openai.Embedding.create(model=self.model, input=texts)
+        data = sorted(response['data'], key=lambda item: item['index'])
+        return [item['embedding'] for item in data]
+
+
+class LocalEmbeddingClient(EmbeddingClient):
+    def __init__(self, dimension: int = 1536, latency: float = 0.0, rate_limit_every: int = 0):
+        """
+        Offline stand-in for the OpenAI embeddings API.
+
+        Texts are embedded as normalized hashed bag-of-words vectors, so equal
+        texts get equal vectors and texts sharing words are similar.
+
+        Args:
+            dimension: Size of the returned vectors
+            latency: Seconds each request takes, to mimic a network round trip
+            rate_limit_every: Reject every n-th request with RateLimitError (0 never does)
+        """
+        self.dimension = dimension
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return f"local/{self.dimension}"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            self.requests += 1
+            request = self.requests
+        time.sleep(self.latency)
+        if self.rate_limit_every and request % self.rate_limit_every == 0:
+            import openai
+            raise openai.error.RateLimitError("Rate limit reached (local stand-in)")
+
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                digest = hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest()
+                vectors[row, int.from_bytes(digest, 'little') % self.dimension] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1.0, norms)
+        return vectors.tolist()
+
+
+@dataclass
+class EmbeddingBatchConfig:
+    max_batch_tokens: int = 8000  # tokens per request
+    max_batch_size: int = 2048  # inputs per request
+    max_in_flight: int = 4  # concurrent requests
+    max_retries: int = 6  # retries per batch after a retryable error
+    initial_backoff: float = 1.0  # seconds, doubled after every retry
+    max_backoff: float = 60.0
+
+
+class BatchedEmbedder:
+    def __init__(self, client: EmbeddingClient, config: Optional[EmbeddingBatchConfig] = None):
+        """
+        Embed many texts with few requests.
+
+        Texts are grouped into token-sized batches that are sent concurrently,
+        at most `max_in_flight` at a time. Batches that hit a rate limit or a
+        transient error are retried with exponential backoff and jitter,
+        honouring the server's Retry-After header when it sends one.
+
+        Args:
+            client: Client that embeds one batch per call
+            config: Batch sizes, concurrency and retry settings
+        """
+        self.client = client
+        self.config = config or EmbeddingBatchConfig()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed `texts`, returning one vector per text in input order."""
+        if not texts:
+            return []
+
+        batches = batch_by_tokens(texts, self.config.max_batch_tokens, self.config.max_batch_size)
+        if len(batches) == 1:
+            return self._embed_batch([texts[i] for i in batches[0]])
+
+        with ThreadPoolExecutor(max_workers=self.config.max_in_flight) as executor:
+            results = executor.map(lambda batch: self._embed_batch([texts[i] for i in batch]), batches)
+            vectors: List[List[float]] = [None] * len(texts)
+            for batch, batch_vectors in zip(batches, results):
+                for i, vector in zip(batch, batch_vectors):
+                    vectors[i] = vector
+        return vectors
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                vectors = self.client.embed(texts)
+            except retryable_errors() as e:
+                if attempt == self.config.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                logger.warning(f"Embedding request failed ({str(e)}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if len(vectors) != len(texts):
+                raise ValueError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+            return vectors
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Seconds to wait before retry `attempt`: Retry-After if given, else jittered exponential."""
+        return retry_delay(attempt, error, self.config.initial_backoff, self.config.max_backoff)
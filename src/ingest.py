@@ -0,0 +1,397 @@
+# src/ingest.py
+
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional
+
+from .query_cache import QueryCache, default_query_cache
+from .utils import extract_video_id
+
+if TYPE_CHECKING:
+    from .chunk_batch import ChunkBatch
+
+logger = logging.getLogger(__name__)
+
+# Durable checkpoints, in order. A job resumes with the stage after its checkpoint.
+PENDING = "pending"
+DOWNLOADED = "downloaded"
+TRANSCRIBED = "transcribed"
+INDEXED = "indexed"
+
+STAGES = ("download", "transcribe", "chunk", "embed", "index")
+
+
+def _is_collection_url(url: str) -> bool:
+    """True for playlist and channel URLs, which expand to many videos."""
+    return any(marker in url for marker in ("list=", "/playlist", "/channel/", "/c/", "/user/", "/@"))
+
+
+def _expand_collection(url: str) -> List[str]:
+    """List the video URLs of a playlist or channel without downloading anything."""
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': 'in_playlist',
+        'ignoreerrors': True,
+    }
+    import yt_dlp
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+
+    urls = []
+    for entry in (info or {}).get('entries') or []:
+        if not entry:
+            continue
+        if entry.get('ie_key') == 'YoutubeTab' or entry.get('_type') == 'playlist':
+            # Channels list their tabs (videos, shorts, ...) as nested playlists
+            urls.extend(_expand_collection(entry['url']))
+        elif entry.get('id'):
+            urls.append(f"https://www.youtube.com/watch?v={entry['id']}")
+    return urls
+
+
+def expand_sources(sources: Iterable[str]) -> List[str]:
+    """
+    Turn playlists, channels, URL list files and single URLs into video URLs.
+
+    Args:
+        sources: Video/playlist/channel URLs, or paths to text files with one source per line
+
+    Returns:
+        List of video URLs, without duplicates, in input order
+    """
+    urls = []
+    for source in sources:
+        source = source.strip()
+        if not source or source.startswith('#'):
+            continue
+        if os.path.isfile(source):
+            with open(source, encoding='utf-8') as f:
+                urls.extend(expand_sources(f.read().splitlines()))
+        elif _is_collection_url(source) and 'v=' not in source:
+            urls.extend(_expand_collection(source))
+        else:
+            urls.append(source)
+
+    return list(dict.fromkeys(urls))
+
+
+class _AlreadyIndexed(Exception):
+    """Raised by the download stage when a video needs no work."""
+
+
+@dataclass
+class Job:
+    video_id: str
+    url: str
+    checkpoint: str = PENDING
+    transcript_path: Optional[str] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+class JobStore:
+    def __init__(self, db_path: str):
+        """
+        SQLite-backed checkpoint store for bulk ingestion jobs.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                video_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                checkpoint TEXT NOT NULL,
+                transcript_path TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def add_jobs(self, urls: Iterable[str]) -> int:
+        """Register new videos; videos that already have a job are left untouched."""
+        rows = []
+        for url in urls:
+            try:
+                rows.append((extract_video_id(url), url, PENDING, time.time()))
+            except ValueError:
+                logger.warning(f"Skipping URL without a video ID: {url}")
+
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (video_id, url, checkpoint, updated_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def unfinished_jobs(self, max_attempts: int) -> List[Job]:
+        """Jobs that are not indexed yet and still have attempts left."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id, url, checkpoint, transcript_path, attempts, error FROM jobs "
+                "WHERE checkpoint != ? AND attempts < ? ORDER BY rowid",
+                (INDEXED, max_attempts)
+            ).fetchall()
+        return [Job(*row) for row in rows]
+
+    def checkpoint(self, video_id: str, checkpoint: str, **fields):
+        """Record that a job reached `checkpoint`."""
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        sql = f"UPDATE jobs SET checkpoint = ?, updated_at = ?{', ' + assignments if fields else ''} WHERE video_id = ?"
+        with self._lock:
+            self._conn.execute(sql, (checkpoint, time.time(), *fields.values(), video_id))
+            self._conn.commit()
+
+    def record_failure(self, video_id: str, error: str):
+        """Count a failed attempt; the job keeps its last checkpoint so a retry resumes there."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET attempts = attempts + 1, error = ?, updated_at = ? WHERE video_id = ?",
+                (error, time.time(), video_id)
+            )
+            self._conn.commit()
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per checkpoint."""
+        with self._lock:
+            rows = self._conn.execute("SELECT checkpoint, COUNT(*) FROM jobs GROUP BY checkpoint").fetchall()
+        return dict(rows)
+
+    def close(self):
+        self._conn.close()
+
+
+@dataclass
+class IngestConfig:
+    job_db: str = "ingest_jobs.db"
+    download_workers: int = 4
+    transcribe_workers: int = 4
+    chunk_workers: int = 2
+    embed_workers: int = 1
+    index_workers: int = 4
+    max_in_flight: int = 16  # videos between download and index at once
+    max_attempts: int = 3
+
+
+class BulkIngestor:
+    def __init__(self, video_processor, chunk_processor, vector_store,
+                 config: Optional[IngestConfig] = None, query_cache: Optional[QueryCache] = None):
+        """
+        Resumable, concurrent ingestion of many videos.
+
+        Every video is a job that moves through the download, transcribe,
+        chunk, embed and index stages, each with its own worker pool. The
+        download, transcribe and index checkpoints are persisted in a JobStore,
+        so rerunning after a crash only repeats unfinished work.
+
+        Args:
+            video_processor: VideoProcessor used to download and transcribe
+            chunk_processor: ChunkProcessor used to chunk and embed
+            vector_store: Vector store the chunks are indexed into
+            config: Ingestion configuration
+            query_cache: Cache whose results of indexed videos are dropped,
+                         defaults to the process-wide cache configured in
+                         config/config.yaml
+        """
+        self.video_processor = video_processor
+        self.chunk_processor = chunk_processor
+        self.vector_store = vector_store
+        self.config = config or IngestConfig()
+        self.store = JobStore(self.config.job_db)
+        self.query_cache = query_cache or default_query_cache()
+        self.logger = logging.getLogger('BulkIngestor')
+
+        self._handlers: Dict[str, Callable[[Job, Any], Any]] = {
+            "download": self._download,
+            "transcribe": self._transcribe,
+            "chunk": self._chunk,
+            "embed": self._embed,
+            "index": self._index,
+        }
+        self._in_flight = threading.BoundedSemaphore(self.config.max_in_flight)
+        self._done = threading.Condition()
+        self._outstanding = 0
+
+    def _download(self, job: Job, _) -> None:
+        if self.vector_store.check_video_exists(job.video_id):
+            self.logger.info(f"{job.video_id} is already indexed, skipping")
+            raise _AlreadyIndexed()
+        if self.video_processor.cache:
+            self.video_processor.fetch_audio(job.url)
+        self.store.checkpoint(job.video_id, DOWNLOADED)
+
+    def _transcribe(self, job: Job, _) -> str:
+        _, _, transcript_path = self.video_processor.process_video(job.url)
+        self.store.checkpoint(job.video_id, TRANSCRIBED, transcript_path=transcript_path)
+        return transcript_path
+
+    def _chunk(self, job: Job, transcript_path: str) -> "ChunkBatch":
+        return self.chunk_processor.chunk_batch_file(transcript_path, job.video_id)
+
+    def _embed(self, job: Job, chunks: "ChunkBatch") -> "ChunkBatch":
+        return self.chunk_processor.embed_chunk_batch(chunks)
+
+    def _index(self, job: Job, chunks: "ChunkBatch") -> None:
+        registry = getattr(self.vector_store, "registry", None)
+        if registry is not None:
+            registry.begin(job.video_id, self.chunk_processor.index_settings(),
+                           self.chunk_processor.embedding_model_name)
+        if chunks:
+            self.vector_store.index_video_chunks(chunks, job.video_id)
+            if registry is not None:
+                hashes = self.chunk_processor.content_hashes(chunks)
+                registry.record_chunks(job.video_id, dict(zip(chunks.ids(), hashes)))
+        elif registry is not None:
+            registry.complete(job.video_id, 0)
+        if self.query_cache:
+            self.query_cache.invalidate_video(job.video_id)
+        self.store.checkpoint(job.video_id, INDEXED, error=None)
+
+    def _resume_stage(self, job: Job) -> str:
+        """First stage to run for a job, based on its last checkpoint."""
+        if job.checkpoint == TRANSCRIBED and job.transcript_path and os.path.exists(job.transcript_path):
+            return "chunk"
+        if job.checkpoint in (DOWNLOADED, TRANSCRIBED):
+            return "transcribe"
+        return "download"
+
+    def _submit(self, executors: Dict[str, ThreadPoolExecutor], stage: str, job: Job, payload: Any = None):
+        with self._done:
+            self._outstanding += 1
+        executors[stage].submit(self._run_stage, executors, stage, job, payload)
+
+    def _run_stage(self, executors: Dict[str, ThreadPoolExecutor], stage: str, job: Job, payload: Any):
+        finished = True
+        try:
+            result = self._handlers[stage](job, payload)
+            next_index = STAGES.index(stage) + 1
+            if next_index < len(STAGES):
+                self._submit(executors, STAGES[next_index], job, result)
+                finished = False
+            else:
+                self.logger.info(f"Indexed {job.video_id}")
+        except _AlreadyIndexed:
+            self.store.checkpoint(job.video_id, INDEXED)
+        except Exception as e:
+            self.logger.error(f"Error in {stage} stage for {job.video_id}: {str(e)}")
+            self.store.record_failure(job.video_id, f"{stage}: {e}")
+        finally:
+            if finished:
+                self._in_flight.release()
+            with self._done:
+                self._outstanding -= 1
+                self._done.notify_all()
+
+    def run(self, sources: Iterable[str]) -> Dict[str, int]:
+        """
+        Ingest every video in `sources` and resume any unfinished jobs.
+
+        Args:
+            sources: Video/playlist/channel URLs or URL list files
+
+        Returns:
+            Number of jobs per checkpoint after the run
+        """
+        added = self.store.add_jobs(expand_sources(sources))
+        jobs = self.store.unfinished_jobs(self.config.max_attempts)
+        self.logger.info(f"Added {added} new jobs, {len(jobs)} jobs to run")
+
+        workers = {
+            "download": self.config.download_workers,
+            "transcribe": self.config.transcribe_workers,
+            "chunk": self.config.chunk_workers,
+            "embed": self.config.embed_workers,
+            "index": self.config.index_workers,
+        }
+        executors = {stage: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"ingest-{stage}")
+                     for stage, n in workers.items()}
+        try:
+            for job in jobs:
+                # Bound the number of videos whose audio/chunks are held at once
+                self._in_flight.acquire()
+                stage = self._resume_stage(job)
+                # Jobs resumed at the chunk stage read the transcript from their checkpoint
+                self._submit(executors, stage, job, job.transcript_path if stage == "chunk" else None)
+
+            with self._done:
+                self._done.wait_for(lambda: self._outstanding == 0)
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+
+        counts = self.store.counts()
+        self.logger.info(f"Ingestion finished: {counts}")
+        return counts
+
+
+def main():
+    from .chunk_processor import ChunkConfig, ChunkProcessor, EmbeddingType
+    from .local_vector_store import LocalVectorStore
+    from .vector_store import create_vector_store
+    from .video_processor import VideoProcessor
+
+    parser = argparse.ArgumentParser(description="Bulk-ingest YouTube videos, playlists and channels.")
+    parser.add_argument("sources", nargs="+", help="Video/playlist/channel URLs or files with one URL per line")
+    defaults = IngestConfig()
+    parser.add_argument("--job-db", default=defaults.job_db)
+    parser.add_argument("--index-name", default="video-rag-test")
+    parser.add_argument("--vector-store", choices=["pinecone", "local"],
+                        help="vector store backend, defaults to vector_store.backend in config/config.yaml")
+    for stage in STAGES:
+        parser.add_argument(f"--{stage}-workers", type=int, default=getattr(defaults, f"{stage}_workers"))
+    parser.add_argument("--max-in-flight", type=int, default=defaults.max_in_flight)
+    parser.add_argument("--max-attempts", type=int, default=defaults.max_attempts)
+    parser.add_argument("--embedding-processes", type=int, default=0,
+                        help="worker processes for HuggingFace embeddings (0 encodes in-process)")
+    parser.add_argument("--embedding-type", choices=[t.value for t in EmbeddingType],
+                        default=EmbeddingType.HUGGINGFACE.value,
+                        help="embedding backend; 'onnx' runs the HuggingFace model int8-quantized on CPU")
+    parser.add_argument("--projection", help="EmbeddingProjection (.npz) applied before indexing, "
+                                             "see python -m src.projection")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    config = IngestConfig(
+        job_db=args.job_db,
+        max_in_flight=args.max_in_flight,
+        max_attempts=args.max_attempts,
+        **{f"{stage}_workers": getattr(args, f"{stage}_workers") for stage in STAGES}
+    )
+    chunk_processor = ChunkProcessor(ChunkConfig(
+        embedding_type=EmbeddingType(args.embedding_type),
+        embedding_processes=args.embedding_processes,
+        projection_path=args.projection
+    ))
+    projection = chunk_processor.projection
+    vector_store = create_vector_store(args.index_name, dimension=projection.output_dim if projection else None,
+                                       backend=args.vector_store)
+    ingestor = BulkIngestor(VideoProcessor(), chunk_processor, vector_store, config)
+    try:
+        ingestor.run(args.sources)
+    finally:
+        chunk_processor.close()
+        if isinstance(vector_store, LocalVectorStore):
+            vector_store.close()
+
+
+if __name__ == "__main__":
+    main()
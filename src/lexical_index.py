@@ -0,0 +1,321 @@
+# src/lexical_index.py
+
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .chunk_batch import ChunkBatch
+from .time_index import TimeIndex
+
+logger = logging.getLogger(__name__)
+
+# Words, numbers and identifiers such as gpt-4, 3.5, x86_64 or c++ stay one token
+_TOKEN_RE = re.compile(r"\w+(?:[.\-+#]+\w+)*[+#]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased search terms of `text`.
+
+    Example:
+        >>> tokenize("GPT-4 scored 86.4% on MMLU, see x86_64 and C++")
+        ['gpt-4', 'scored', '86.4', 'on', 'mmlu', 'see', 'x86_64', 'and', 'c++']
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    def __init__(self, chunks: ChunkBatch, k1: float = 1.2, b: float = 0.75):
+        """
+        BM25 index over the chunks of one video.
+
+        Postings are stored column-wise: the sorted vocabulary, an offsets
+        array into it, and one array of chunk positions and one of term
+        frequencies, both uint16 while the video has fewer than 65536 chunks.
+        Chunks are numbered in start time order, so a time window maps to a
+        range of positions that each posting list is cut to by binary search.
+        The chunk texts and times are kept in ChunkBatch layout, so hits are
+        returned without touching the vector store.
+
+        Args:
+            chunks: The video's chunks (embeddings are not used)
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        chunks = chunks.take(np.argsort(chunks.starts, kind="stable"))
+        self.chunks = ChunkBatch(chunks.video_id, chunks.starts, chunks.ends, chunks.start_ms,
+                                 chunks.text_offsets, chunks.text)
+        self.k1 = k1
+        self.b = b
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = np.zeros(len(chunks), dtype=np.uint32)
+        for position in range(len(chunks)):
+            terms = tokenize(chunks.text_at(position))
+            lengths[position] = len(terms)
+            for term, count in Counter(terms).items():
+                postings.setdefault(term, []).append((position, count))
+
+        position_type = np.uint16 if len(chunks) < 2 ** 16 else np.uint32
+        self.terms = np.array(sorted(postings), dtype=str)
+        counts = [len(postings[term]) for term in self.terms.tolist()]
+        self.offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+        flat = [entry for term in self.terms.tolist() for entry in postings[term]]
+        self.positions = np.array([p for p, _ in flat], dtype=position_type)
+        self.frequencies = np.minimum([c for _, c in flat], 2 ** 16 - 1).astype(np.uint16)
+        self.lengths = lengths
+        self._prepare()
+
+    def _prepare(self):
+        self._term_ids = {term: i for i, term in enumerate(self.terms.tolist())}
+        self._average_length = float(self.lengths.mean()) if len(self.lengths) else 0.0
+        self._ids = self.chunks.ids()
+        self.time_index = TimeIndex(self.chunks.starts, self.chunks.ends)
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def search(self, query: str, top_k: int = 10, start_time: Optional[float] = None,
+               end_time: Optional[float] = None) -> List[Dict]:
+        """
+        Chunks ranked by BM25 score for `query`; chunks sharing no term with it are left out.
+
+        Args:
+            query: Query text
+            top_k: Number of results to return
+            start_time: Only return chunks ending at or after this second
+            end_time: Only return chunks starting at or before this second
+
+        Returns:
+            List of chunks with id, score and metadata fields, best first
+        """
+        n = len(self.chunks)
+        if not n:
+            return []
+        first, stop, allowed = 0, n, None
+        if start_time is not None or end_time is not None:
+            window = self.time_index.overlapping(start_time, end_time)
+            if not len(window):
+                return []
+            first, stop = int(window.min()), int(window.max()) + 1
+            allowed = np.zeros(n, dtype=bool)
+            allowed[window] = True
+        scores = np.zeros(n, dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * self.lengths / max(self._average_length, 1e-9))
+        for term in set(tokenize(query)):
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            idf = math.log(1 + (n - (end - start) + 0.5) / ((end - start) + 0.5))
+            # Postings are sorted by position: keep the window's range only
+            postings = self.positions[start:end]
+            low, high = np.searchsorted(postings, [first, stop])
+            positions = postings[low:high]
+            tf = self.frequencies[start + low:start + high].astype(np.float32)
+            scores[positions] += idf * tf * (self.k1 + 1) / (tf + norm[positions])
+
+        if allowed is not None:
+            scores[~allowed] = 0
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return []
+        top = matched[np.argsort(-scores[matched], kind="stable")[:top_k]]
+        return [dict(self.chunks.metadata_at(i), id=self._ids[i], score=float(scores[i])) for i in top.tolist()]
+
+    def save(self, path: str):
+        """Write the index to `path` (.npz) atomically."""
+        fd, tmp_path = tempfile.mkstemp(suffix=".npz", dir=os.path.dirname(path) or ".")
+        os.close(fd)
+        try:
+            np.savez_compressed(
+                tmp_path, terms=self.terms, offsets=self.offsets, positions=self.positions,
+                frequencies=self.frequencies, lengths=self.lengths, params=np.array([self.k1, self.b]),
+                video_id=np.array(self.chunks.video_id), starts=self.chunks.starts, ends=self.chunks.ends,
+                start_ms=self.chunks.start_ms, text_offsets=self.chunks.text_offsets,
+                text=np.frombuffer(self.chunks.text.encode('utf-8'), dtype=np.uint8)
+            )
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with np.load(path) as data:
+            index = cls.__new__(cls)
+            index.chunks = ChunkBatch(str(data["video_id"]), data["starts"], data["ends"], data["start_ms"],
+                                      data["text_offsets"], data["text"].tobytes().decode('utf-8'))
+            index.k1, index.b = data["params"].tolist()
+            index.terms = data["terms"]
+            index.offsets = data["offsets"]
+            index.positions = data["positions"]
+            index.frequencies = data["frequencies"]
+            index.lengths = data["lengths"]
+        index._prepare()
+        return index
+
+
+class LexicalIndex:
+    def __init__(self, root: str = "lexical_index"):
+        """
+        Per-video BM25 indexes, built at ingest time next to the vectors.
+
+        Vector stores given a LexicalIndex update it from `index_video_chunks`,
+        `complete_video` and `delete_chunks`. Each video's index is one
+        compressed .npz file, rebuilt once per completed batch sequence or
+        deletion and cached in memory until its file is replaced.
+
+        Args:
+            root: Directory holding one index file per video
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        # video_id -> (file version, index)
+        self._loaded: Dict[str, Tuple[Tuple[int, int], BM25Index]] = {}
+        # video_id -> batches added with complete=False, not yet in the index
+        self._pending: Dict[str, List[ChunkBatch]] = {}
+
+    def _path(self, video_id: str) -> str:
+        return os.path.join(self.root, f"{video_id}.npz")
+
+    def get(self, video_id: str) -> Optional[BM25Index]:
+        """The video's index, or None if it has none."""
+        try:
+            stat = os.stat(self._path(video_id))
+        except FileNotFoundError:
+            self._loaded.pop(video_id, None)
+            return None
+        version = (stat.st_mtime_ns, stat.st_ino)
+        loaded = self._loaded.get(video_id)
+        if loaded is None or loaded[0] != version:
+            loaded = (version, BM25Index.load(self._path(video_id)))
+            self._loaded[video_id] = loaded
+        return loaded[1]
+
+    def index_video_chunks(self, chunks: Union[ChunkBatch, List[Dict]], video_id: str, complete: bool = True):
+        """
+        Add chunks to a video's index, replacing chunks with the same id.
+
+        Args:
+            chunks: ChunkBatch or list of chunks with metadata
+            video_id: YouTube video ID
+            complete: Whether these are the video's last chunks. Batches passed
+                      with complete=False are held in memory and the index is
+                      built once, by the last batch or complete_video, so a
+                      video streamed in small batches is not rebuilt per batch.
+                      Searches see the video's last completed build meanwhile.
+        """
+        if not isinstance(chunks, ChunkBatch):
+            chunks = ChunkBatch.from_chunks(chunks, video_id)
+        with self._lock:
+            self._pending.setdefault(video_id, []).append(
+                ChunkBatch(chunks.video_id, chunks.starts, chunks.ends, chunks.start_ms,
+                           chunks.text_offsets, chunks.text))
+            if complete:
+                self._build(video_id)
+
+    def complete_video(self, video_id: str):
+        """Build the index of a video whose batches were added with complete=False."""
+        with self._lock:
+            if video_id in self._pending:
+                self._build(video_id)
+
+    def delete_chunks(self, video_id: str, ids: Iterable[str]):
+        with self._lock:
+            if self.get(video_id) is None and video_id not in self._pending:
+                return
+            self._build(video_id, removed=set(ids))
+
+    def delete_video(self, video_id: str):
+        with self._lock:
+            self._pending.pop(video_id, None)
+            self._loaded.pop(video_id, None)
+            if os.path.exists(self._path(video_id)):
+                os.remove(self._path(video_id))
+
+    def _build(self, video_id: str, removed: Iterable[str] = ()):
+        """Rebuild the video's index from its file and pending batches, later batches replacing earlier ids."""
+        existing = self.get(video_id)
+        batches = ([existing.chunks] if existing is not None else []) + self._pending.pop(video_id, [])
+        seen = set(removed)
+        kept = []
+        for batch in reversed(batches):
+            ids = batch.ids()
+            kept.append(batch.take([i for i, chunk_id in enumerate(ids) if chunk_id not in seen]))
+            seen.update(ids)
+        index = BM25Index(_concat(kept[::-1]))
+        index.save(self._path(video_id))
+        self._loaded.pop(video_id, None)
+
+    def search(self, query: str, video_id: str, top_k: int = 10, start_time: Optional[float] = None,
+               end_time: Optional[float] = None) -> List[Dict]:
+        """BM25 search within one video; see BM25Index.search."""
+        index = self.get(video_id)
+        return index.search(query, top_k, start_time, end_time) if index is not None else []
+
+
+def _concat(batches: List[ChunkBatch]) -> ChunkBatch:
+    return ChunkBatch.from_texts(
+        batches[0].video_id,
+        np.concatenate([batch.starts for batch in batches]),
+        np.concatenate([batch.ends for batch in batches]),
+        [text for batch in batches for text in batch.texts()],
+        start_ms=np.concatenate([batch.start_ms for batch in batches])
+    )
+
+
+def reciprocal_rank_fusion(rankings: List[List[Dict]], k: int = 60, key: str = "id") -> List[Dict]:
+    """
+    Merge ranked result lists by reciprocal rank fusion.
+
+    Each result scores sum(1 / (k + rank)) over the lists it appears in, so
+    results ranked well by several retrievers rise to the top regardless of
+    how each retriever scales its scores. The fused score replaces "score".
+
+    Example:
+        >>> fused = reciprocal_rank_fusion([[{"id": "a"}, {"id": "b"}], [{"id": "b"}, {"id": "c"}]])
+        >>> [r["id"] for r in fused]
+        ['b', 'a', 'c']
+    """
+    fused: Dict[str, Dict] = {}
+    scores: Counter = Counter()
+    for ranking in rankings:
+        for rank, result in enumerate(ranking, start=1):
+            fused.setdefault(result[key], result)
+            scores[result[key]] += 1.0 / (k + rank)
+    return [dict(fused[result_key], score=score) for result_key, score in scores.most_common()]
+
+
+def hybrid_search(dense: Callable[[], List[Dict]], lexical: Callable[[], List[Dict]], top_k: int,
+                  executor: Optional[ThreadPoolExecutor] = None, k: int = 60) -> List[Dict]:
+    """
+    Run a dense and a lexical lookup concurrently and fuse their rankings.
+
+    Args:
+        dense: Returns dense results (with ids), e.g. embedding the query and searching the vector store
+        lexical: Returns lexical results, e.g. LexicalIndex.search
+        top_k: Number of fused results to return
+        executor: Pool to run the dense lookup on; a temporary one is used if None
+        k: Reciprocal rank fusion constant
+
+    Returns:
+        Fused results, best first
+    """
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return hybrid_search(dense, lexical, top_k, pool, k)
+    # The lexical lookup runs in the calling thread while the dense one is in flight
+    dense_future = executor.submit(dense)
+    lexical_results = lexical()
+    return reciprocal_rank_fusion([dense_future.result(), lexical_results], k)[:top_k]
@@ -0,0 +1,403 @@
+# src/local_vector_store.py
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .chunk_batch import ChunkBatch
+from .lexical_index import LexicalIndex
+from .time_index import TimeIndex
+from .video_registry import VideoRegistry
+
+VECTORS_FILE = "vectors.f32"
+CHUNKS_FILE = "chunks.json"
+LIBRARY_DIR = ".library"
+
+
+class LocalVectorStore:
+    def __init__(self, root: str = "vector_store", dimension: Optional[int] = None,
+                 library_index: bool = False, registry: Optional[VideoRegistry] = None,
+                 lexical_index: Optional[LexicalIndex] = None):
+        """
+        In-process vector store with the PineconeManager interface.
+
+        Each video gets a directory holding its embeddings as a raw float32
+        matrix (one L2-normalized row per chunk, memory-mapped for search) and
+        the chunk ids and metadata as JSON. Searches never leave the process:
+        the video's matrix is mapped once and top-k is a single matrix-vector
+        product, so scores are cosine similarities as with the Pinecone index.
+        Re-indexing a video replaces its directory atomically.
+
+        Batches passed to `index_video_chunks` with complete=False are held in
+        memory and the video's files are written once, by its last batch or
+        `complete_video`, so a video streamed in small batches is not
+        rewritten per batch. Searches see the video's last written files
+        meanwhile.
+
+        With `library_index` every chunk is also added to an AnnIndex, which
+        serves `search_library` across all videos. It is persisted whenever a
+        video completes or is deleted, and by `save()` and `close()`.
+
+        Args:
+            root: Directory holding one subdirectory per video
+            dimension: Expected embedding dimension, None accepts any
+                       (but each video's vectors must share one dimension)
+            library_index: Maintain an ANN index over all videos (needs hnswlib)
+            registry: Record of indexed videos; with it, videos whose indexing
+                      was interrupted do not count as existing
+            lexical_index: Per-video BM25 index kept up to date with the stored chunks
+        """
+        self.logger = logging.getLogger('LocalVectorStore')
+        self.root = root
+        self.dimension = dimension
+        os.makedirs(root, exist_ok=True)
+
+        # video_id -> (file version, vectors, ids, metadata)
+        self._loaded: Dict[str, Tuple[Tuple[int, int], np.ndarray, List[str], List[Dict]]] = {}
+        self._lock = threading.Lock()
+        # video_id -> batches (vectors, ids, metadata) added with complete=False, not yet written
+        self._pending: Dict[str, List[Tuple[np.ndarray, List[str], List[Dict]]]] = {}
+        # video_id -> (metadata it was built from, time index)
+        self._time_indexes: Dict[str, Tuple[List[Dict], TimeIndex]] = {}
+        self.library_index = library_index
+        self._library = None
+        self.registry = registry
+        self.lexical_index = lexical_index
+
+    def _video_dir(self, video_id: str) -> str:
+        return os.path.join(self.root, video_id)
+
+    def _version(self, video_id: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(os.path.join(self._video_dir(video_id), CHUNKS_FILE))
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_ino
+
+    def _load(self, video_id: str):
+        """Vectors, ids and metadata of a video; reloaded only when its files were replaced."""
+        version = self._version(video_id)
+        if version is None:
+            self._loaded.pop(video_id, None)
+            return None
+        loaded = self._loaded.get(video_id)
+        if loaded is not None and loaded[0] == version:
+            return loaded[1:]
+
+        with self._lock:
+            video_dir = self._video_dir(video_id)
+            with open(os.path.join(video_dir, CHUNKS_FILE)) as f:
+                chunks = json.load(f)
+            shape = (len(chunks['ids']), chunks['dimension'])
+            vectors = (np.memmap(os.path.join(video_dir, VECTORS_FILE), dtype=np.float32, mode='r', shape=shape)
+                       if shape[0] else np.zeros(shape, dtype=np.float32))
+            self._loaded[video_id] = (version, vectors, chunks['ids'], chunks['metadata'])
+        return vectors, chunks['ids'], chunks['metadata']
+
+    def check_video_exists(self, video_id: str) -> bool:
+        """
+        Check if video chunks already exist in the store.
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            bool: True if video exists, False otherwise
+        """
+        if self.registry is not None:
+            indexed = self.registry.is_indexed(video_id)
+            if indexed is not None:
+                return indexed
+        exists = self._version(video_id) is not None
+        if exists and self.registry is not None:
+            self.registry.complete(video_id, self.count_video_chunks(video_id))
+        return exists
+
+    def count_video_chunks(self, video_id: str) -> int:
+        loaded = self._load(video_id)
+        return 0 if loaded is None else len(loaded[1])
+
+    def index_video_chunks(self, chunks: Union[ChunkBatch, List[Dict]], video_id: str, complete: bool = True,
+                           chunk_config: Optional[Dict] = None, embedding_model: Optional[str] = None):
+        """
+        Store video chunks, replacing chunks with the same id and keeping the others.
+
+        Args:
+            chunks: ChunkBatch with embeddings, or list of chunks with embeddings and metadata
+            video_id: YouTube video ID
+            complete: Whether these are the video's last chunks, see PineconeManager
+            chunk_config: Chunking settings recorded in the registry on completion
+            embedding_model: Embedding model recorded in the registry on completion
+        """
+        try:
+            if isinstance(chunks, ChunkBatch):
+                if chunks.embeddings is None:
+                    raise ValueError("ChunkBatch has no embeddings")
+                vectors = chunks.embeddings
+                ids = chunks.ids()
+                metadata = [chunks.metadata_at(i) for i in range(len(chunks))]
+            else:
+                vectors = np.asarray([chunk['values'] for chunk in chunks], dtype=np.float32)
+                ids = [chunk['id'] for chunk in chunks]
+                metadata = [dict(chunk['metadata'], video_id=video_id) for chunk in chunks]
+            vectors = self._normalize(video_id, vectors, ids)
+            self._pending.setdefault(video_id, []).append((vectors, list(ids), metadata))
+            if self.library_index:
+                self.library(vectors.shape[1]).add(ids, vectors, metadata)
+            if self.lexical_index is not None:
+                self.lexical_index.index_video_chunks(chunks, video_id, complete=False)
+            if self.registry is not None:
+                self.registry.add_chunks(video_id, len(ids))
+            self.logger.info(f"Indexed {len(ids)} chunks for video {video_id}")
+            if complete:
+                self.complete_video(video_id, chunk_config=chunk_config, embedding_model=embedding_model)
+
+        except Exception as e:
+            self.logger.error(f"Error indexing video chunks: {str(e)}")
+            raise
+
+    def _normalize(self, video_id: str, vectors: np.ndarray, ids: List[str]) -> np.ndarray:
+        """L2-normalized float32 rows, checked against the dimension of the video's other chunks."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        dimension = vectors.shape[1]
+        expected = self.dimension
+        if expected is None and self._pending.get(video_id):
+            expected = self._pending[video_id][0][0].shape[1]
+        if expected is None:
+            existing = self._load(video_id)
+            if existing is not None and len(existing[1]):
+                expected = existing[0].shape[1]
+        if expected is not None and dimension != expected:
+            raise ValueError(f"Embedding dimension mismatch. Expected {expected}, got {dimension}")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.clip(norms, 1e-12, None)
+
+    def _write(self, video_id: str, removed: Iterable[str] = ()):
+        """Write the video's stored and pending chunks once, later batches replacing earlier ids."""
+        batches = self._pending.pop(video_id, [])
+        existing = self._load(video_id)
+        if existing is not None:
+            batches.insert(0, existing)
+        if not batches:
+            return
+        dimension = next((np.shape(vectors)[1] for vectors, ids, _ in batches if len(ids)),
+                         np.shape(batches[0][0])[1])
+
+        # Upsert semantics: new chunks replace stored chunks with the same id
+        seen = set(removed)
+        kept = []
+        for vectors, ids, metadata in reversed(batches):
+            keep = [i for i, chunk_id in enumerate(ids) if chunk_id not in seen]
+            seen.update(ids)
+            kept.append((np.asarray(vectors)[keep].reshape(len(keep), dimension),
+                         [ids[i] for i in keep], [metadata[i] for i in keep]))
+        kept.reverse()
+        self._replace(video_id, np.concatenate([vectors for vectors, _, _ in kept]),
+                      [chunk_id for _, ids, _ in kept for chunk_id in ids],
+                      [m for _, _, metadata in kept for m in metadata])
+
+    def _replace(self, video_id: str, vectors: np.ndarray, ids: List[str], metadata: List[Dict]):
+        """Write a video's normalized vectors, ids and metadata in place of its current files."""
+        dimension = vectors.shape[1]
+
+        # Write into a fresh directory and swap it in, so readers never see a partial video
+        work_dir = tempfile.mkdtemp(prefix=f".{video_id}.", dir=self.root)
+        try:
+            np.ascontiguousarray(vectors, dtype=np.float32).tofile(os.path.join(work_dir, VECTORS_FILE))
+            with open(os.path.join(work_dir, CHUNKS_FILE), 'w') as f:
+                json.dump({'dimension': dimension, 'ids': ids, 'metadata': metadata}, f)
+
+            video_dir = self._video_dir(video_id)
+            with self._lock:
+                if os.path.exists(video_dir):
+                    old_dir = tempfile.mkdtemp(prefix=f".{video_id}.old.", dir=self.root)
+                    os.replace(video_dir, os.path.join(old_dir, video_id))
+                    os.replace(work_dir, video_dir)
+                    shutil.rmtree(old_dir, ignore_errors=True)
+                else:
+                    os.replace(work_dir, video_dir)
+                self._loaded.pop(video_id, None)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def list_video_chunk_ids(self, video_id: str) -> List[str]:
+        """Ids of every chunk stored for a video."""
+        loaded = self._load(video_id)
+        return [] if loaded is None else list(loaded[1])
+
+    def delete_chunks(self, video_id: str, ids: List[str]):
+        """Delete chunks of a video by id, keeping the others; pending batches are written with the deletion."""
+        if self._version(video_id) is None and video_id not in self._pending:
+            return
+        before = self.count_video_chunks(video_id) + sum(len(batch[1]) for batch in self._pending.get(video_id, []))
+        removed = set(ids)
+        self._write(video_id, removed)
+        if self.library_index:
+            self.library().delete(removed)
+            self.save()
+        if self.lexical_index is not None:
+            self.lexical_index.delete_chunks(video_id, removed)
+        self.logger.info(f"Deleted {before - self.count_video_chunks(video_id)} chunks of video {video_id}")
+
+    def delete_video(self, video_id: str):
+        """Remove every chunk of a video."""
+        with self._lock:
+            self._pending.pop(video_id, None)
+            self._loaded.pop(video_id, None)
+            shutil.rmtree(self._video_dir(video_id), ignore_errors=True)
+        if self.library_index:
+            self.library().delete_video(video_id)
+            self.save()
+        if self.lexical_index is not None:
+            self.lexical_index.delete_video(video_id)
+        if self.registry is not None:
+            self.registry.remove(video_id)
+
+    def library(self, dimension: Optional[int] = None):
+        """The AnnIndex over all videos, opened (or created with `dimension`) on first use."""
+        if self._library is None:
+            from .ann_index import AnnIndex
+            self._library = AnnIndex(os.path.join(self.root, LIBRARY_DIR), dimension=dimension or self.dimension)
+        return self._library
+
+    def search_library(self, query_embedding: List[float], top_k: int = 10,
+                       filter: Optional[Dict] = None) -> List[Dict]:
+        """
+        Search the chunks of every video through the ANN index.
+
+        Args:
+            query_embedding: Embedding of the query text
+            top_k: Number of results to return
+            filter: Optional metadata filter on video_id, start_time or end_time,
+                    e.g. {"video_id": {"$in": [...]}}
+
+        Returns:
+            List of relevant chunks with id, video_id and metadata
+        """
+        if not self.library_index:
+            raise ValueError("LocalVectorStore was created without library_index")
+        return self.library(len(query_embedding)).search(query_embedding, top_k, filter)
+
+    def complete_video(self, video_id: str, chunk_count: Optional[int] = None, chunk_config: Optional[Dict] = None,
+                       embedding_model: Optional[str] = None):
+        """
+        Finish a video indexed in several batches: write its chunks, build
+        its lexical index, persist the library index and mark it complete.
+
+        Callers that pass complete=False to index_video_chunks call this once
+        the video's last chunks are stored, with the settings to record in
+        the registry.
+        """
+        if video_id in self._pending:
+            self._write(video_id)
+        if self.lexical_index is not None:
+            self.lexical_index.complete_video(video_id)
+        self.save()
+        if self.registry is not None:
+            # Counting is free here, and upserts may have replaced chunks
+            self.registry.complete(video_id, self.count_video_chunks(video_id) if chunk_count is None else chunk_count,
+                                   chunk_config, embedding_model)
+
+    def save(self):
+        """Persist the library index; per-video files are written when each video completes."""
+        if self._library is not None:
+            self._library.save()
+
+    def close(self):
+        if self._library is not None:
+            self._library.close()
+            self._library = None
+
+    def _time_index(self, video_id: str, metadata: List[Dict]) -> TimeIndex:
+        """Time index over a video's loaded chunks, rebuilt when the video is reloaded."""
+        cached = self._time_indexes.get(video_id)
+        if cached is None or cached[0] is not metadata:
+            cached = (metadata, TimeIndex([m["start_time"] for m in metadata], [m["end_time"] for m in metadata]))
+            self._time_indexes[video_id] = cached
+        return cached[1]
+
+    def chunk_at(self, video_id: str, time: float) -> Optional[Dict]:
+        """
+        The chunk playing at `time` seconds into a video, without any embedding or search.
+
+        Returns:
+            Chunk with id and metadata, or None if no chunk covers `time`
+        """
+        loaded = self._load(video_id)
+        if loaded is None:
+            return None
+        _, ids, metadata = loaded
+        position = self._time_index(video_id, metadata).at(time)
+        return None if position is None else dict(metadata[position], id=ids[position])
+
+    def search_video(self, query_embedding: List[float], video_id: str, top_k: int = 3,
+                     start_time: Optional[float] = None, end_time: Optional[float] = None) -> List[Dict]:
+        """
+        Search for relevant chunks within a specific video.
+
+        Args:
+            query_embedding: Embedding of the query text
+            video_id: YouTube video ID to search within
+            top_k: Number of results to return
+            start_time: Only return chunks ending at or after this second
+            end_time: Only return chunks starting at or before this second
+
+        Returns:
+            List of relevant chunks with metadata
+        """
+        try:
+            query = np.asarray(query_embedding, dtype=np.float32)
+            if self.dimension is not None and query.shape[0] != self.dimension:
+                raise ValueError(
+                    f"Query embedding dimension mismatch. Expected {self.dimension}, "
+                    f"got {query.shape[0]}"
+                )
+
+            loaded = self._load(video_id)
+            if loaded is None or not loaded[1]:
+                return []
+            vectors, ids, metadata = loaded
+            if query.shape[0] != vectors.shape[1]:
+                raise ValueError(
+                    f"Query embedding dimension mismatch. Expected {vectors.shape[1]}, "
+                    f"got {query.shape[0]}"
+                )
+
+            query = query / max(float(np.linalg.norm(query)), 1e-12)
+            if start_time is None and end_time is None:
+                rows = None
+                scores = vectors @ query
+            else:
+                # Only the rows inside the window are read and scored
+                rows = np.sort(self._time_index(video_id, metadata).overlapping(start_time, end_time))
+                scores = np.asarray(vectors[rows]) @ query
+            k = min(top_k, len(scores))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            top_scores = scores[top]
+            if rows is not None:
+                top = rows[top]
+
+            return [
+                {
+                    "id": ids[i],
+                    "score": float(score),
+                    "start_time": metadata[i]["start_time"],
+                    "end_time": metadata[i]["end_time"],
+                    "text": metadata[i]["text"],
+                    "youtube_url": metadata[i]["youtube_url"]
+                }
+                for i, score in zip(top, top_scores)
+            ]
+
+        except Exception as e:
+            self.logger.error(f"Error searching video: {str(e)}")
+            raise
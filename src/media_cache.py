@@ -0,0 +1,230 @@
+# src/media_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+
+def settings_key(settings: Dict) -> str:
+    """
+    Stable short hash of the settings that affect a transcript.
+
+    Example:
+        >>> settings_key({'model': 'whisper-1'}) == settings_key({'model': 'whisper-1'})
+        True
+    """
+    payload = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class MediaCache:
+    AUDIO_FILE = "audio.mp3"
+    INFO_FILE = "info.json"
+    TRANSCRIPT_JSON = "transcript.json"
+    TRANSCRIPT_FILE = "transcript"  # plus the extension of the saved transcript (.vrt or .txt)
+    LAST_USED = ".last_used"
+    PIN_PREFIX = ".pin_"
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024 ** 3, pin_timeout: float = 6 * 3600):
+        """
+        On-disk cache of downloaded audio and transcripts keyed by video ID.
+
+        Layout:
+            <cache_dir>/<video_id>/audio.mp3, info.json
+            <cache_dir>/<video_id>/<settings_key>/transcript.json, transcript.vrt (or .txt)
+
+        Each video directory is one LRU entry; when the cache grows past
+        `max_bytes` the least recently used videos are removed, except videos
+        pinned by a running job (see `pin`) in this or another process.
+
+        Args:
+            cache_dir: Root directory of the cache
+            max_bytes: Size budget for the whole cache
+            pin_timeout: Seconds after which a pin is considered left behind
+                         by a crashed job and no longer protects its video
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.pin_timeout = pin_timeout
+        self.logger = logging.getLogger('MediaCache')
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _video_dir(self, video_id: str) -> str:
+        return os.path.join(self.cache_dir, video_id)
+
+    def _touch(self, video_id: str):
+        """Mark a video entry as recently used."""
+        marker = os.path.join(self._video_dir(video_id), self.LAST_USED)
+        try:
+            with open(marker, 'a'):
+                os.utime(marker, None)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def pin(self, video_id: str) -> Iterator[None]:
+        """
+        Keep a video's entry from being evicted while a job uses its files.
+
+        The pin is a marker file in the video's directory, so jobs in other
+        processes sharing the cache respect it too.
+        """
+        video_dir = self._video_dir(video_id)
+        with self._lock:
+            os.makedirs(video_dir, exist_ok=True)
+            marker = os.path.join(video_dir, f"{self.PIN_PREFIX}{uuid.uuid4().hex}")
+            open(marker, 'w').close()
+        try:
+            yield
+        finally:
+            try:
+                os.remove(marker)
+            except FileNotFoundError:
+                pass
+
+    def _pinned(self, video_id: str) -> bool:
+        """Whether a job holds a pin on the video that has not timed out."""
+        video_dir = self._video_dir(video_id)
+        cutoff = time.time() - self.pin_timeout
+        try:
+            names = os.listdir(video_dir)
+        except FileNotFoundError:
+            return False
+        for name in names:
+            if name.startswith(self.PIN_PREFIX):
+                try:
+                    if os.path.getmtime(os.path.join(video_dir, name)) > cutoff:
+                        return True
+                except FileNotFoundError:
+                    continue
+        return False
+
+    def _atomic_copy(self, src: str, dest: str, move: bool = False):
+        """Copy or move `src` to `dest` so readers never see a partial file."""
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        partial = f"{dest}.{uuid.uuid4().hex}.partial"
+        if move:
+            shutil.move(src, partial)
+        else:
+            shutil.copyfile(src, partial)
+        os.replace(partial, dest)
+
+    def _atomic_write_json(self, data: Dict, dest: str):
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        partial = f"{dest}.{uuid.uuid4().hex}.partial"
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump(data, f, default=str)
+        os.replace(partial, dest)
+
+    def get_audio(self, video_id: str) -> Optional[Tuple[str, Dict]]:
+        """Return (audio_path, video_info) if the audio is cached."""
+        video_dir = self._video_dir(video_id)
+        audio_path = os.path.join(video_dir, self.AUDIO_FILE)
+        try:
+            with open(os.path.join(video_dir, self.INFO_FILE), encoding='utf-8') as f:
+                video_info = json.load(f)
+        except FileNotFoundError:
+            return None
+        if not os.path.exists(audio_path):
+            return None
+
+        self._touch(video_id)
+        return audio_path, video_info
+
+    def put_audio(self, video_id: str, audio_path: str, video_info: Dict) -> str:
+        """Copy downloaded audio into the cache and return the cached path."""
+        video_dir = self._video_dir(video_id)
+        cached_path = os.path.join(video_dir, self.AUDIO_FILE)
+        self._atomic_copy(audio_path, cached_path)
+        self._atomic_write_json(video_info, os.path.join(video_dir, self.INFO_FILE))
+        self._touch(video_id)
+        self.evict(keep=video_id)
+        return cached_path
+
+    def get_transcript(self, video_id: str, key: str) -> Optional[Tuple[Dict, Dict, str]]:
+        """Return (transcription, video_info, transcript_path) if the transcript is cached."""
+        video_dir = self._video_dir(video_id)
+        transcript_dir = os.path.join(video_dir, key)
+        try:
+            with open(os.path.join(transcript_dir, self.TRANSCRIPT_JSON), encoding='utf-8') as f:
+                transcription = json.load(f)
+            with open(os.path.join(video_dir, self.INFO_FILE), encoding='utf-8') as f:
+                video_info = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        transcript_path = next(
+            (os.path.join(transcript_dir, name) for name in os.listdir(transcript_dir)
+             if name.startswith(self.TRANSCRIPT_FILE + ".") and not name.endswith((".json", ".partial"))),
+            None
+        )
+        if transcript_path is None:
+            return None
+
+        self._touch(video_id)
+        return transcription, video_info, transcript_path
+
+    def put_transcript(self, video_id: str, key: str, transcription: Dict,
+                       transcript_path: str, video_info: Dict) -> str:
+        """Move a finished transcript into the cache and return the cached path."""
+        video_dir = self._video_dir(video_id)
+        transcript_dir = os.path.join(video_dir, key)
+        ext = os.path.splitext(transcript_path)[1]
+        cached_path = os.path.join(transcript_dir, self.TRANSCRIPT_FILE + ext)
+        self._atomic_copy(transcript_path, cached_path, move=True)
+        self._atomic_write_json(transcription, os.path.join(transcript_dir, self.TRANSCRIPT_JSON))
+        if not os.path.exists(os.path.join(video_dir, self.INFO_FILE)):
+            self._atomic_write_json(video_info, os.path.join(video_dir, self.INFO_FILE))
+        self._touch(video_id)
+        self.evict(keep=video_id)
+        return cached_path
+
+    def _entry_size(self, path: str) -> int:
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for name in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, name))
+                except FileNotFoundError:
+                    pass
+        return total
+
+    def _last_used(self, video_id: str) -> float:
+        video_dir = self._video_dir(video_id)
+        for path in (os.path.join(video_dir, self.LAST_USED), video_dir):
+            try:
+                return os.path.getmtime(path)
+            except FileNotFoundError:
+                continue
+        return 0.0
+
+    def size(self) -> int:
+        """Total size of the cache in bytes."""
+        return self._entry_size(self.cache_dir)
+
+    def evict(self, keep: Optional[str] = None):
+        """Remove least recently used videos until the cache fits in `max_bytes`; pinned videos are kept."""
+        with self._lock:
+            entries = []
+            for video_id in os.listdir(self.cache_dir):
+                path = self._video_dir(video_id)
+                if os.path.isdir(path):
+                    entries.append((self._last_used(video_id), video_id, self._entry_size(path)))
+
+            total = sum(size for _, _, size in entries)
+            for _, video_id, size in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if video_id == keep or self._pinned(video_id):
+                    continue
+                shutil.rmtree(self._video_dir(video_id), ignore_errors=True)
+                total -= size
+                self.logger.info(f"Evicted {video_id} from media cache ({size} bytes)")
@@ -0,0 +1,71 @@
+# src/model_registry.py
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    def __init__(self):
+        """
+        Process-wide store of loaded models.
+
+        Each model is loaded once, on first request, and the same instance is
+        handed to every caller afterwards. Loads of different models can run
+        in parallel; concurrent requests for the same model wait for a single
+        load instead of each loading their own copy.
+        """
+        self._models: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self._loading: Dict[Hashable, threading.Lock] = {}
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the model registered under `key`, calling `loader` if it is not loaded yet."""
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            load_lock = self._loading.setdefault(key, threading.Lock())
+        with load_lock:
+            model = self._models.get(key)
+            if model is None:
+                started = time.perf_counter()
+                model = loader()
+                logger.info(f"Loaded model {key} in {time.perf_counter() - started:.1f}s")
+                self._models[key] = model
+        return model
+
+    def loaded(self) -> List[Hashable]:
+        """Keys of the models loaded so far."""
+        return list(self._models)
+
+    def clear(self):
+        """Drop every loaded model, e.g. to free memory in a long-running worker."""
+        with self._lock:
+            self._models.clear()
+            self._loading.clear()
+
+
+registry = ModelRegistry()
+
+
+def get_sentence_transformer(model_name: str):
+    """Shared SentenceTransformer for `model_name`, loaded on first use."""
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    return registry.get(("sentence-transformers", model_name), load)
+
+
+def get_onnx_embedder(model_name: str, model_dir: str = "models/onnx"):
+    """Shared int8 ONNX embedder for `model_name`, exported and loaded on first use."""
+    def load():
+        from .onnx_embedder import OnnxEmbedder
+        return OnnxEmbedder(model_name, model_dir=model_dir)
+
+    return registry.get(("onnx-int8", model_name, model_dir), load)
@@ -0,0 +1,174 @@
+# src/onnx_embedder.py
+#
+# Optional dependencies: onnxruntime, transformers and (for the one-off
+# export) torch.  pip install onnxruntime transformers torch
+
+import logging
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = "model_int8.onnx"
+
+
+def _require(module: str):
+    try:
+        return __import__(module)
+    except ImportError as e:
+        raise ImportError(
+            f"EmbeddingType.ONNX needs '{module}': pip install -r requirements-onnx.txt"
+        ) from e
+
+
+def export_quantized_model(model_name: str, output_dir: str, opset: int = 14) -> str:
+    """
+    Export a HuggingFace encoder to ONNX and quantize its weights to int8.
+
+    The exported graph returns the token embeddings; pooling and
+    normalization are applied by OnnxEmbedder, matching the SentenceTransformer
+    pipeline of MiniLM-style models. The result is written to a temp
+    directory and moved into place, so concurrent exports never see a
+    half-written model.
+
+    Returns:
+        Path of the quantized model
+    """
+    torch = _require("torch")
+    _require("transformers")
+    _require("onnxruntime")
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    parent = os.path.dirname(os.path.abspath(output_dir))
+    os.makedirs(parent, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix="onnx_export_", dir=parent)
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        tokenizer.save_pretrained(work_dir)
+        model = AutoModel.from_pretrained(model_name).eval()
+
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["token_embeddings"]}
+
+        fp32_path = os.path.join(work_dir, "model.onnx")
+        with torch.no_grad():
+            torch.onnx.export(
+                model, tuple(sample[name] for name in input_names), fp32_path,
+                input_names=input_names, output_names=["token_embeddings"],
+                dynamic_axes=dynamic_axes, opset_version=opset
+            )
+        quantize_dynamic(fp32_path, os.path.join(work_dir, MODEL_FILE), weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+
+        try:
+            os.replace(work_dir, output_dir)
+        except OSError:
+            # Another process finished the same export first
+            if not os.path.exists(os.path.join(output_dir, MODEL_FILE)):
+                raise
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    logger.info(f"Exported int8 ONNX model for {model_name} to {output_dir}")
+    return os.path.join(output_dir, MODEL_FILE)
+
+
+class OnnxEmbedder:
+    def __init__(self, model_name: str, model_dir: str = "models/onnx",
+                 max_length: int = 256, threads: Optional[int] = None):
+        """
+        Sentence embeddings from an int8-quantized ONNX export of a HuggingFace model.
+
+        The model is exported and quantized on first use and cached under
+        `model_dir`. Encoding mirrors SentenceTransformer for MiniLM models:
+        mean pooling over the attention mask followed by L2 normalization.
+
+        Args:
+            model_name: HuggingFace model name, e.g. sentence-transformers/all-MiniLM-L6-v2
+            model_dir: Directory holding exported models, one subdirectory per model
+            max_length: Longest input in tokens; longer texts are truncated
+            threads: onnxruntime intra-op threads, defaults to the runtime's choice
+        """
+        ort = _require("onnxruntime")
+        _require("transformers")
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.max_length = max_length
+        export_dir = os.path.join(model_dir, model_name.replace("/", "__"))
+        model_path = os.path.join(export_dir, MODEL_FILE)
+        if not os.path.exists(model_path):
+            model_path = export_quantized_model(model_name, export_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self.session.get_outputs()[0].shape[-1])
+
+    def encode(self, texts: List[str], batch_size: int = 64, **_) -> np.ndarray:
+        """Embed `texts` into a float32 matrix of L2-normalized rows, in input order."""
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        # Sort by length so each batch pads to a similar length
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out = None
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [texts[i] for i in rows], padding=True, truncation=True,
+                max_length=self.max_length, return_tensors="np"
+            )
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+            token_embeddings = self.session.run(None, feeds)[0]
+
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+            if out is None:
+                out = np.empty((len(texts), pooled.shape[1]), dtype=np.float32)
+            out[rows] = pooled
+        return out
+
+
+def compare_with_pytorch(texts: List[str], model_name: str, onnx_model=None, torch_model=None) -> Dict:
+    """
+    Compare ONNX int8 embeddings of `texts` with the full-precision SentenceTransformer output.
+
+    Returns the mean and minimum cosine similarity between the two vectors of
+    each text, and how often both backends agree on each text's nearest
+    neighbour among the other texts.
+    """
+    from .model_registry import get_onnx_embedder, get_sentence_transformer
+
+    onnx_model = onnx_model or get_onnx_embedder(model_name)
+    torch_model = torch_model or get_sentence_transformer(model_name)
+    quantized = np.asarray(onnx_model.encode(texts), dtype=np.float32)
+    reference = np.asarray(torch_model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+    cosine = (quantized * reference).sum(axis=1)
+
+    def neighbours(vectors):
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, -np.inf)
+        return similarity.argmax(axis=1)
+
+    return {
+        'texts': len(texts),
+        'mean_cosine': float(cosine.mean()),
+        'min_cosine': float(cosine.min()),
+        'nearest_neighbour_agreement': float((neighbours(quantized) == neighbours(reference)).mean()),
+    }
@@ -0,0 +1,176 @@
+# src/pipeline.py
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+_DONE = object()  # end-of-stream marker passed between stages
+
+
+@dataclass
+class PipelineConfig:
+    segment_queue_size: int = 256  # transcript segments waiting to be chunked
+    chunk_queue_size: int = 8  # chunk batches waiting to be embedded
+    upsert_queue_size: int = 8  # embedded batches waiting to be indexed
+    embed_batch_size: int = 16  # chunks per embedding call and upsert
+
+
+class StreamingIngestPipeline:
+    def __init__(self, video_processor, chunk_processor, vector_store,
+                 config: Optional[PipelineConfig] = None):
+        """
+        Overlap transcription, chunking, embedding and indexing of one video.
+
+        Each stage runs in its own thread and hands work to the next through a
+        bounded queue, so a slow stage applies backpressure instead of letting
+        earlier stages buffer the whole video. The first chunks become
+        searchable while later audio is still being transcribed.
+
+        Args:
+            video_processor: VideoProcessor producing transcript segments
+            chunk_processor: ChunkProcessor used to chunk and embed
+            vector_store: Vector store the chunks are indexed into
+            config: Queue sizes and batch size
+        """
+        self.video_processor = video_processor
+        self.chunk_processor = chunk_processor
+        self.vector_store = vector_store
+        self.config = config or PipelineConfig()
+        self.logger = logging.getLogger('StreamingIngestPipeline')
+
+    def _put(self, q: queue.Queue, item, stop: threading.Event):
+        """Hand `item` to the next stage unless the pipeline is stopping."""
+        if not stop.is_set():
+            q.put(item)
+
+    def _drain(self, q: queue.Queue) -> Iterator:
+        """Yield items from `q` until the end-of-stream marker."""
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            yield item
+
+    def _run_stage(self, name: str, work: Callable[[], None], source: Optional[queue.Queue],
+                   output: queue.Queue, errors: List[BaseException], stop: threading.Event):
+        """
+        Run one stage and always pass the end-of-stream marker downstream.
+
+        Every stage reads its input to the end, even after a failure, so an
+        upstream stage is never left blocked on a full queue.
+        """
+        try:
+            work()
+        except BaseException as e:
+            self.logger.error(f"Error in {name} stage: {str(e)}")
+            errors.append(e)
+            stop.set()
+            if source is not None:
+                for _ in self._drain(source):
+                    pass
+        finally:
+            output.put(_DONE)
+
+    def run(self, url: str, video_id: str,
+            on_batch_indexed: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Transcribe, chunk, embed and index one video as a streaming pipeline.
+
+        Args:
+            url: YouTube video URL
+            video_id: YouTube video ID
+            on_batch_indexed: Called from the calling thread after every upsert
+                              with the running stats
+
+        Returns:
+            Dict with segment/chunk counts, seconds until the first chunk was
+            searchable and total seconds
+        """
+        started = time.perf_counter()
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        segments_q = queue.Queue(maxsize=self.config.segment_queue_size)
+        chunks_q = queue.Queue(maxsize=self.config.chunk_queue_size)
+        upsert_q = queue.Queue(maxsize=self.config.upsert_queue_size)
+        stats = {'segments': 0, 'chunks': 0, 'first_chunk_seconds': None, 'total_seconds': None}
+
+        # The video only counts as indexed once its last batch is in
+        registry = getattr(self.vector_store, "registry", None)
+        if registry is not None:
+            registry.begin(video_id, self.chunk_processor.index_settings(),
+                           self.chunk_processor.embedding_model_name)
+
+        def transcribe():
+            for segment in self.video_processor.process_video_stream(url):
+                if stop.is_set():
+                    return
+                stats['segments'] += 1
+                self._put(segments_q, {
+                    'start': segment['start'],
+                    'end': segment['end'],
+                    'text': segment['text'].strip()
+                }, stop)
+
+        def chunk():
+            from .chunk_batch import ChunkBatch
+            batch = []
+            for item in self.chunk_processor.iter_chunks(self._drain(segments_q), video_id):
+                batch.append(item)
+                if len(batch) >= self.config.embed_batch_size:
+                    self._put(chunks_q, ChunkBatch.from_chunks(batch, video_id), stop)
+                    batch = []
+            if batch:
+                self._put(chunks_q, ChunkBatch.from_chunks(batch, video_id), stop)
+
+        def embed():
+            for batch in self._drain(chunks_q):
+                if not stop.is_set():
+                    self._put(upsert_q, self.chunk_processor.embed_chunk_batch(batch), stop)
+
+        threads = [
+            threading.Thread(target=self._run_stage, args=(name, work, source, output, errors, stop),
+                             name=f"pipeline-{name}", daemon=True)
+            for name, work, source, output in (
+                ("transcribe", transcribe, None, segments_q),
+                ("chunk", chunk, segments_q, chunks_q),
+                ("embed", embed, chunks_q, upsert_q),
+            )
+        ]
+        for thread in threads:
+            thread.start()
+
+        # Upserts run in the calling thread so callbacks can touch UI state safely
+        for batch in self._drain(upsert_q):
+            if stop.is_set():
+                continue
+            try:
+                self.vector_store.index_video_chunks(batch, video_id, complete=False)
+                if registry is not None:
+                    hashes = self.chunk_processor.content_hashes(batch)
+                    registry.record_chunks(video_id, dict(zip(batch.ids(), hashes)))
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+                continue
+            stats['chunks'] += len(batch)
+            if stats['first_chunk_seconds'] is None:
+                stats['first_chunk_seconds'] = time.perf_counter() - started
+            if on_batch_indexed:
+                on_batch_indexed(stats)
+
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+        self.vector_store.complete_video(video_id)
+
+        stats['total_seconds'] = time.perf_counter() - started
+        self.logger.info(
+            f"Indexed {stats['chunks']} chunks from {stats['segments']} segments in "
+            f"{stats['total_seconds']:.1f}s (first chunk after {stats['first_chunk_seconds'] or 0:.1f}s)"
+        )
+        return stats
@@ -0,0 +1,187 @@
+# src/projection.py
+
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PCA = "pca"
+TRUNCATE = "truncate"
+
+
+@dataclass
+class EmbeddingProjection:
+    """
+    Linear map from model embeddings to the smaller vectors that are stored and searched.
+
+    PCA projections are fit from corpus embeddings: vectors are centred on the
+    corpus mean and projected onto the top principal components. Truncation
+    keeps the leading coordinates, which only preserves quality for
+    Matryoshka-trained models. Projected vectors are L2-normalized again, so
+    cosine and dot-product search keep working. The same projection must be
+    applied to chunk embeddings at index time and to query embeddings.
+    """
+    method: str
+    input_dim: int
+    output_dim: int
+    components: Optional[np.ndarray] = None  # (input_dim, output_dim), PCA only
+    mean: Optional[np.ndarray] = None  # (input_dim,), PCA only
+
+    @classmethod
+    def fit_pca(cls, vectors: np.ndarray, dimension: int) -> "EmbeddingProjection":
+        vectors = np.asarray(vectors, dtype=np.float64)
+        if dimension > min(vectors.shape):
+            raise ValueError(f"Cannot fit {dimension} components from {vectors.shape[0]} "
+                             f"vectors of dimension {vectors.shape[1]}")
+        mean = vectors.mean(axis=0)
+        # Right singular vectors of the centred data are the principal axes
+        _, _, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+        return cls(
+            method=PCA,
+            input_dim=vectors.shape[1],
+            output_dim=dimension,
+            components=np.ascontiguousarray(vt[:dimension].T, dtype=np.float32),
+            mean=mean.astype(np.float32)
+        )
+
+    @classmethod
+    def truncation(cls, input_dim: int, dimension: int) -> "EmbeddingProjection":
+        if dimension > input_dim:
+            raise ValueError(f"Cannot truncate {input_dim}-dimensional vectors to {dimension}")
+        return cls(method=TRUNCATE, input_dim=input_dim, output_dim=dimension)
+
+    def apply(self, vectors) -> np.ndarray:
+        """Project a vector or a matrix of row vectors to `output_dim`, re-normalized, as float32."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape[-1] != self.input_dim:
+            raise ValueError(f"Expected {self.input_dim}-dimensional embeddings, got {vectors.shape[-1]}")
+        if self.method == PCA:
+            projected = (vectors - self.mean) @ self.components
+        else:
+            projected = vectors[..., :self.output_dim]
+        norms = np.linalg.norm(projected, axis=-1, keepdims=True)
+        return np.ascontiguousarray(projected / np.clip(norms, 1e-12, None), dtype=np.float32)
+
+    def save(self, path: str):
+        arrays = {"method": np.array(self.method), "shape": np.array([self.input_dim, self.output_dim])}
+        if self.method == PCA:
+            arrays.update(components=self.components, mean=self.mean)
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingProjection":
+        with np.load(path) as data:
+            input_dim, output_dim = (int(x) for x in data["shape"])
+            method = str(data["method"])
+            return cls(
+                method=method,
+                input_dim=input_dim,
+                output_dim=output_dim,
+                components=data["components"] if method == PCA else None,
+                mean=data["mean"] if method == PCA else None
+            )
+
+
+def _top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ corpus.T
+    k = min(k, corpus.shape[0])
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def recall_report(corpus: np.ndarray, queries: np.ndarray, dimensions: Sequence[int],
+                  method: str = PCA, k: int = 10, fit_vectors: Optional[np.ndarray] = None) -> List[Dict]:
+    """
+    Recall@k of search over projected vectors against exact full-width search.
+
+    For each dimension a projection is built (PCA fit on `fit_vectors`,
+    defaulting to `corpus`), corpus and queries are projected, and the top-k
+    chunks of every query are compared with its full-width top-k. The report
+    also gives bytes per stored vector and the brute-force search time.
+    """
+    corpus = np.asarray(corpus, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    fit_vectors = corpus if fit_vectors is None else fit_vectors
+
+    started = time.perf_counter()
+    exact = _top_k(corpus, queries, k)
+    rows = [{
+        "dimension": corpus.shape[1],
+        "recall": 1.0,
+        "bytes_per_vector": corpus.shape[1] * 4,
+        "search_ms": (time.perf_counter() - started) * 1000,
+    }]
+
+    for dimension in dimensions:
+        if method == PCA:
+            projection = EmbeddingProjection.fit_pca(fit_vectors, dimension)
+        else:
+            projection = EmbeddingProjection.truncation(corpus.shape[1], dimension)
+        reduced_corpus = projection.apply(corpus)
+        reduced_queries = projection.apply(queries)
+
+        started = time.perf_counter()
+        approx = _top_k(reduced_corpus, reduced_queries, k)
+        search_ms = (time.perf_counter() - started) * 1000
+
+        hits = sum(len(set(a) & set(e)) for a, e in zip(approx.tolist(), exact.tolist()))
+        rows.append({
+            "dimension": dimension,
+            "recall": hits / exact.size,
+            "bytes_per_vector": dimension * 4,
+            "search_ms": search_ms,
+        })
+    return rows
+
+
+def main():
+    """Fit a projection from the chunks of transcript files and print a recall report."""
+    from .chunk_processor import ChunkConfig, ChunkProcessor, EmbeddingType
+
+    parser = argparse.ArgumentParser(description="Fit an embedding projection from transcripts")
+    parser.add_argument("transcripts", nargs="+", help="transcript files whose chunks form the corpus")
+    parser.add_argument("--dimension", type=int, required=True, help="stored embedding dimension")
+    parser.add_argument("--method", choices=[PCA, TRUNCATE], default=PCA)
+    parser.add_argument("--output", required=True, help="where to save the projection (.npz)")
+    parser.add_argument("--report-dimensions", type=int, nargs="*", default=[32, 64, 128, 192, 256])
+    parser.add_argument("--holdout", type=float, default=0.1, help="share of chunks used as queries")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--embedding-type", choices=[t.value for t in EmbeddingType],
+                        default=EmbeddingType.HUGGINGFACE.value)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    processor = ChunkProcessor(ChunkConfig(embedding_type=EmbeddingType(args.embedding_type)))
+    texts = []
+    for path in args.transcripts:
+        texts.extend(c['metadata']['text'] for c in processor.chunk_transcript_file(path, "corpus"))
+    vectors = processor.embed_texts(texts)
+    processor.close()
+
+    # Held-out chunks stand in for queries the projection was not fit on
+    order = np.random.default_rng(0).permutation(len(vectors))
+    n_queries = max(1, int(len(vectors) * args.holdout))
+    queries, corpus = vectors[order[:n_queries]], vectors[order[n_queries:]]
+
+    if args.method == PCA:
+        projection = EmbeddingProjection.fit_pca(corpus, args.dimension)
+    else:
+        projection = EmbeddingProjection.truncation(vectors.shape[1], args.dimension)
+    projection.save(args.output)
+    logger.info(f"Saved {args.method} projection {projection.input_dim} -> {projection.output_dim} to {args.output}")
+
+    dimensions = sorted({d for d in args.report_dimensions + [args.dimension] if d < min(vectors.shape[1], len(corpus))})
+    print(f"\nRecall@{args.k} over {len(corpus)} chunks, {len(queries)} held-out queries ({args.method})")
+    print(f"{'dimension':>10} {'recall':>8} {'bytes/vector':>13} {'search ms':>10}")
+    for row in recall_report(corpus, queries, dimensions, args.method, args.k):
+        print(f"{row['dimension']:>10} {row['recall']:>8.3f} {row['bytes_per_vector']:>13} {row['search_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# src/query_cache.py
+
+import copy
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from .utils import load_config
+
+logger = logging.getLogger(__name__)
+
+# Entry kinds
+EMBEDDING = "embedding"
+RESULTS = "results"
+
+
+def normalize_query(query: str) -> str:
+    """
+    Cache key form of a query: case and whitespace do not matter.
+
+    Example:
+        >>> normalize_query("  What is  RLHF? ")
+        'what is rlhf?'
+    """
+    return " ".join(query.lower().split())
+
+
+@dataclass
+class QueryCacheConfig:
+    max_entries: int = 4096  # per kind (embeddings, results) held in memory
+    ttl_seconds: float = 3600.0  # entries older than this are not served
+    path: Optional[str] = None  # SQLite file shared between processes; None keeps entries in memory only
+    max_file_entries: int = 100_000  # per kind in the file, least recently used are removed
+
+
+class QueryCache:
+    def __init__(self, config: Optional[QueryCacheConfig] = None):
+        """
+        Cache of query embeddings and retrieval results, with LRU and TTL eviction.
+
+        Embeddings are keyed by (model, normalized query) and results by
+        (video, video version, normalized query, search parameters), so a
+        question repeated in a chat, or asked by several users about the same
+        video, skips both the embedding model and the vector store. Each kind
+        is an in-memory LRU of `max_entries`; with `path` set, entries are also
+        written to a SQLite file that other processes (e.g. several Streamlit
+        workers) read on a memory miss.
+
+        A video's results are dropped by `invalidate_video`, which
+        BulkIngestor and DeltaReindexer call after indexing it. Callers pass
+        the video's registry timestamp as its version, so results cached
+        before a re-index in any process are not served afterwards; RAGEngine
+        does not cache results of videos without a registry entry.
+
+        Args:
+            config: Size, TTL and file backend settings
+        """
+        self.config = config or QueryCacheConfig()
+        self._lock = threading.Lock()
+        # kind -> key -> (expires_at, video_id, value)
+        self._memory: Dict[str, OrderedDict] = {EMBEDDING: OrderedDict(), RESULTS: OrderedDict()}
+        self._counts = {kind: {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+                        for kind in self._memory}
+        self._puts = 0
+        self._conn = None
+        if self.config.path:
+            self._conn = sqlite3.connect(self.config.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS query_cache (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    video_id TEXT,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS query_cache_video ON query_cache (video_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS query_cache_last_used ON query_cache (kind, last_used)")
+            self._conn.commit()
+
+    def get_embedding(self, model: str, query: str) -> Optional[List[float]]:
+        return self._get(EMBEDDING, (model, normalize_query(query)))
+
+    def put_embedding(self, model: str, query: str, embedding: List[float]):
+        self._put(EMBEDDING, (model, normalize_query(query)), list(embedding), None)
+
+    def get_results(self, video_id: str, query: str, version: Any = None, **params) -> Optional[List[Dict]]:
+        """Cached results for a search of `video_id`; `params` are the search settings (top_k, window, ...)."""
+        results = self._get(RESULTS, self._results_key(video_id, query, version, params))
+        return copy.deepcopy(results) if results is not None else None
+
+    def put_results(self, video_id: str, query: str, results: List[Dict], version: Any = None, **params):
+        self._put(RESULTS, self._results_key(video_id, query, version, params), copy.deepcopy(results), video_id)
+
+    @staticmethod
+    def _results_key(video_id: str, query: str, version: Any, params: Dict) -> Tuple:
+        return video_id, version, normalize_query(query), tuple(sorted(params.items()))
+
+    def _get(self, kind: str, key: Hashable) -> Any:
+        now = time.time()
+        with self._lock:
+            memory = self._memory[kind]
+            entry = memory.get(key)
+            if entry is not None and entry[0] <= now:
+                del memory[key]
+                self._counts[kind]["expirations"] += 1
+                entry = None
+            if entry is None and self._conn is not None:
+                entry = self._file_get(kind, key, now)
+                if entry is not None:
+                    self._remember(kind, key, entry)
+            if entry is None:
+                self._counts[kind]["misses"] += 1
+                return None
+            memory.move_to_end(key)
+            self._counts[kind]["hits"] += 1
+            return entry[2]
+
+    def _put(self, kind: str, key: Hashable, value: Any, video_id: Optional[str]):
+        entry = (time.time() + self.config.ttl_seconds, video_id, value)
+        with self._lock:
+            self._remember(kind, key, entry)
+            if self._conn is not None:
+                self._conn.execute("INSERT OR REPLACE INTO query_cache VALUES (?, ?, ?, ?, ?, ?)",
+                                   (kind, json.dumps(key), video_id, json.dumps(value), entry[0], time.time()))
+                self._conn.commit()
+                self._puts += 1
+                if self._puts % 256 == 0:
+                    self._trim_file()
+
+    def _remember(self, kind: str, key: Hashable, entry: Tuple):
+        """Add an entry to the in-memory LRU, evicting the least recently used. Caller holds the lock."""
+        memory = self._memory[kind]
+        memory[key] = entry
+        memory.move_to_end(key)
+        while len(memory) > self.config.max_entries:
+            memory.popitem(last=False)
+            self._counts[kind]["evictions"] += 1
+
+    def _file_get(self, kind: str, key: Hashable, now: float) -> Optional[Tuple]:
+        """Unexpired entry from the file, or None. Caller holds the lock."""
+        file_key = json.dumps(key)
+        row = self._conn.execute("SELECT video_id, value, expires_at FROM query_cache WHERE kind = ? AND key = ?",
+                                 (kind, file_key)).fetchone()
+        if row is None or row[2] <= now:
+            return None
+        self._conn.execute("UPDATE query_cache SET last_used = ? WHERE kind = ? AND key = ?", (now, kind, file_key))
+        self._conn.commit()
+        return row[2], row[0], json.loads(row[1])
+
+    def _trim_file(self):
+        """Remove expired entries and keep `max_file_entries` per kind. Caller holds the lock."""
+        self._conn.execute("DELETE FROM query_cache WHERE expires_at <= ?", (time.time(),))
+        for kind in self._memory:
+            self._conn.execute(
+                "DELETE FROM query_cache WHERE kind = ? AND key IN (SELECT key FROM query_cache WHERE kind = ? "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (kind, kind, self.config.max_file_entries))
+        self._conn.commit()
+
+    def invalidate_video(self, video_id: str):
+        """Drop every cached result of a video, e.g. after it was re-indexed."""
+        with self._lock:
+            memory = self._memory[RESULTS]
+            for key in [key for key, entry in memory.items() if entry[1] == video_id]:
+                del memory[key]
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM query_cache WHERE video_id = ?", (video_id,))
+                self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Hits, misses, hit rate, evictions, expirations and entries per kind since this cache was created."""
+        with self._lock:
+            stats = {}
+            for kind, counts in self._counts.items():
+                lookups = counts["hits"] + counts["misses"]
+                stats[kind] = dict(counts, hit_rate=counts["hits"] / lookups if lookups else 0.0,
+                                   entries=len(self._memory[kind]))
+            return stats
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_default_cache: Optional[QueryCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def default_query_cache() -> Optional[QueryCache]:
+    """
+    Process-wide QueryCache configured by `query_cache` in config/config.yaml.
+
+    Returns None when the configuration disables it (enabled: false).
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            settings = load_config().get("query_cache", {})
+            if not settings.get("enabled", True):
+                return None
+            defaults = QueryCacheConfig()
+            _default_cache = QueryCache(QueryCacheConfig(
+                max_entries=settings.get("max_entries", defaults.max_entries),
+                ttl_seconds=settings.get("ttl_seconds", defaults.ttl_seconds),
+                path=settings.get("path", defaults.path),
+                max_file_entries=settings.get("max_file_entries", defaults.max_file_entries)
+            ))
+        return _default_cache
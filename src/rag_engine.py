@@ -1,34 +1,77 @@
 # src/rag_engine.py
 
 import logging
-from typing import List, Dict
-import openai
-from dotenv import load_dotenv
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
 import os
-from sentence_transformers import SentenceTransformer
-from src import PineconeManager
-from src import extract_video_id
+from .vector_store import create_vector_store
+from .utils import extract_video_id, load_env
+from .model_registry import get_onnx_embedder, get_sentence_transformer
+from .query_cache import QueryCache, default_query_cache
 
-# Load environment variables
-load_dotenv()
+# Runs the dense half of hybrid lookups; shared by every engine in the process
+_search_pool: Optional[ThreadPoolExecutor] = None
+_search_pool_lock = threading.Lock()
+
+
+def _get_search_pool() -> ThreadPoolExecutor:
+    global _search_pool
+    with _search_pool_lock:
+        if _search_pool is None:
+            _search_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rag-search")
+        return _search_pool
 
 
 class RAGEngine:
-    def __init__(self, video_url: str):
-        """Initialize RAG Engine for a specific video."""
+    EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+    def __init__(self, video_url: str, quantized_queries: bool = False,
+                 projection_path: Optional[str] = None, vector_store=None,
+                 hybrid: bool = True, candidates: int = 20, query_cache: Optional[QueryCache] = None):
+        """
+        Initialize RAG Engine for a specific video.
+
+        Args:
+            video_url: URL of the video to answer questions about
+            quantized_queries: Embed queries with the int8 ONNX export of the
+                               embedding model; use it when the video was
+                               ingested with EmbeddingType.ONNX
+            projection_path: EmbeddingProjection the video's chunks were indexed
+                             with; queries are projected the same way
+            vector_store: Store to search, defaults to the backend configured
+                          in config/config.yaml
+            hybrid: Fuse dense results with BM25 results from the store's
+                    lexical index, when it has one
+            candidates: Results taken from each retriever before fusion
+            query_cache: Cache for query embeddings and retrieval results,
+                         defaults to the process-wide cache configured in
+                         config/config.yaml
+        """
         self.logger = logging.getLogger('RAGEngine')
+        self.quantized_queries = quantized_queries
+        self.hybrid = hybrid
+        self.candidates = candidates
+        self.query_cache = query_cache or default_query_cache()
 
         # Initialize OpenAI
+        import openai
+        load_env()
         self.api_key = os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
         openai.api_key = self.api_key
 
-        # Initialize embedding model for queries
-        self.model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-
         # Initialize vector store
-        self.pinecone = PineconeManager("video-rag-test")
+        self.projection = None
+        if projection_path:
+            from .projection import EmbeddingProjection
+            self.projection = EmbeddingProjection.load(projection_path)
+        self.embedding_key = (f"{'onnx-int8' if quantized_queries else 'huggingface'}/{self.EMBEDDING_MODEL}"
+                              f"/{projection_path or ''}")
+        self.pinecone = vector_store or create_vector_store(
+            dimension=self.projection.output_dim if self.projection else None
+        )
 
         # Set up video context
         self.video_id = extract_video_id(video_url)
@@ -39,10 +82,26 @@ class RAGEngine:
         self.last_chunks = None
         self.conversation_history = []
 
+    @property
+    def model(self):
+        """Query embedding model, shared with every other engine and loaded on first query."""
+        if self.quantized_queries:
+            return get_onnx_embedder(self.EMBEDDING_MODEL)
+        return get_sentence_transformer(self.EMBEDDING_MODEL)
+
     def generate_query_embedding(self, query: str) -> List[float]:
         """Generate embedding for query text."""
+        if self.query_cache:
+            cached = self.query_cache.get_embedding(self.embedding_key, query)
+            if cached is not None:
+                return cached
         embedding = self.model.encode([query])[0]
-        return embedding.tolist()
+        if self.projection:
+            embedding = self.projection.apply(embedding)
+        embedding = embedding.tolist()
+        if self.query_cache:
+            self.query_cache.put_embedding(self.embedding_key, query, embedding)
+        return embedding
 
     def should_use_last_context(self, current_query: str) -> bool:
         """Determine if we should use the last context."""
@@ -62,6 +121,7 @@ class RAGEngine:
 
         Answer with just 'yes' or 'no'."""
 
+        import openai
         response = openai.ChatCompletion.create(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
@@ -71,12 +131,61 @@ class RAGEngine:
 
         return response.choices[0].message['content'].lower().strip() == 'yes'
 
-    def get_relevant_chunks(self, query: str) -> List[Dict]:
-        """Get relevant chunks from vector store using query."""
-        query_embedding = self.generate_query_embedding(query)
-        chunks = self.pinecone.search_video(query_embedding, self.video_id)
+    def get_relevant_chunks(self, query: str, top_k: int = 3, start_time: Optional[float] = None,
+                            end_time: Optional[float] = None) -> List[Dict]:
+        """
+        Get relevant chunks from vector store using query.
+
+        With hybrid retrieval, the dense search (query embedding included) and
+        the BM25 search run concurrently and their rankings are merged by
+        reciprocal rank fusion, so exact terms such as names, numbers and
+        identifiers are found even when the embedding misses them.
+
+        Args:
+            query: Question or search text
+            top_k: Number of chunks to return
+            start_time: Only consider chunks ending at or after this second
+            end_time: Only consider chunks starting at or before this second
+        """
+        lexical_index = getattr(self.pinecone, "lexical_index", None)
+        hybrid = self.hybrid and lexical_index is not None
+        params = dict(top_k=top_k, start_time=start_time, end_time=end_time,
+                      hybrid=hybrid, candidates=self.candidates if hybrid else None)
+        # Without a registry there is no version to tell stale results apart, so they are not cached
+        version = self._video_version()
+        cache_results = self.query_cache and version is not None
+        if cache_results:
+            cached = self.query_cache.get_results(self.video_id, query, version, **params)
+            if cached is not None:
+                return cached
+
+        if not hybrid:
+            query_embedding = self.generate_query_embedding(query)
+            chunks = self.pinecone.search_video(query_embedding, self.video_id, top_k, start_time, end_time)
+        else:
+            from .lexical_index import hybrid_search
+            chunks = hybrid_search(
+                lambda: self.pinecone.search_video(self.generate_query_embedding(query), self.video_id,
+                                                   self.candidates, start_time, end_time),
+                lambda: lexical_index.search(query, self.video_id, self.candidates, start_time, end_time),
+                top_k,
+                _get_search_pool()
+            )
+
+        if cache_results:
+            self.query_cache.put_results(self.video_id, query, chunks, version, **params)
         return chunks
 
+    def _video_version(self) -> Optional[float]:
+        """When the video's registry entry last changed; cached results from before a re-index are not used."""
+        registry = getattr(self.pinecone, "registry", None)
+        entry = registry.get(self.video_id) if registry is not None else None
+        return entry["updated_at"] if entry else None
+
+    def chunk_at(self, time: float) -> Optional[Dict]:
+        """What is being said `time` seconds into the video: the chunk playing then, or None."""
+        return self.pinecone.chunk_at(self.video_id, time)
+
     def generate_answer(self, query: str, chunks: List[Dict]) -> str:
         """Generate answer using OpenAI."""
         # Format conversation history
@@ -87,7 +196,7 @@ class RAGEngine:
 
         # Format chunks
         context = "\n".join([
-            f"[{chunk['start_time']}s - {chunk['end_time']}s]: {chunk['text']}"
+            f"[{chunk['start_time']:.0f}s - {chunk['end_time']:.0f}s]: {chunk['text']}"
             for chunk in chunks
         ])
 
@@ -104,6 +213,7 @@ class RAGEngine:
 
         Answer: """
 
+        import openai
         response = openai.ChatCompletion.create(
             model="gpt-3.5-turbo",
             messages=[
@@ -147,9 +257,9 @@ class RAGEngine:
                 "answer": answer,
                 "sources": [
                     {
-                        "timestamp": f"{chunk['start_time']}s - {chunk['end_time']}s",
+                        "timestamp": f"{chunk['start_time']:.0f}s - {chunk['end_time']:.0f}s",
                         "text": chunk['text'],
-                        "url": f"{self.video_url}&t={chunk['start_time']}"
+                        "url": f"{self.video_url}&t={int(chunk['start_time'])}"
                     }
                     for chunk in chunks
                 ]
@@ -0,0 +1,224 @@
+# src/reindex.py
+
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .chunk_batch import ChunkBatch
+from .query_cache import QueryCache, default_query_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReindexConfig:
+    videos_per_batch: int = 32  # videos whose changed chunks are embedded in one call
+    chunk_workers: int = 4  # videos chunked and diffed concurrently
+    dry_run: bool = False  # only report what would change
+
+
+@dataclass
+class VideoDelta:
+    video_id: str
+    chunks: ChunkBatch  # the video's new chunk set
+    hashes: List[str]  # content hash per chunk
+    changed: List[int]  # positions in `chunks` that are new or changed
+    orphans: List[str]  # stored chunk ids missing from the new set
+
+    def summary(self) -> Dict:
+        return {
+            "video_id": self.video_id,
+            "chunks": len(self.chunks),
+            "unchanged": len(self.chunks) - len(self.changed),
+            "changed": len(self.changed),
+            "deleted": len(self.orphans),
+        }
+
+
+def diff_chunks(ids: Sequence[str], hashes: Sequence[str],
+                stored: Dict[str, Optional[str]]) -> Tuple[List[int], List[str]]:
+    """
+    Compare a new chunk set with the stored one.
+
+    Args:
+        ids: Chunk ids of the new set
+        hashes: Content hash of each new chunk
+        stored: Stored chunk ids with their content hash, None when unknown
+
+    Returns:
+        (positions of new or changed chunks, stored ids not in the new set)
+
+    Example:
+        >>> diff_chunks(["v_000000", "v_000025"], ["a", "b"], {"v_000000": "a", "v_000030": "c"})
+        ([1], ['v_000030'])
+    """
+    changed = [i for i, (chunk_id, digest) in enumerate(zip(ids, hashes)) if stored.get(chunk_id) != digest]
+    new_ids = set(ids)
+    orphans = [chunk_id for chunk_id in stored if chunk_id not in new_ids]
+    return changed, orphans
+
+
+class DeltaReindexer:
+    def __init__(self, chunk_processor, vector_store, transcript_path: Callable[[str], str],
+                 config: Optional[ReindexConfig] = None, query_cache: Optional[QueryCache] = None):
+        """
+        Bring indexed videos in line with the current chunking and embedding settings.
+
+        Each video is re-chunked from its transcript and diffed against what
+        is stored, by chunk id and content hash (see ChunkProcessor.content_hashes).
+        Only new or changed chunks are embedded and upserted, and stored chunks
+        the new settings no longer produce are deleted, so old and new chunks
+        never mix under one video. Changed chunks of `videos_per_batch` videos
+        are embedded together to keep the model's batches full.
+
+        The hashes of stored chunks come from the vector store's registry.
+        Videos indexed before hashes were recorded are listed from the store
+        instead; all their chunks count as changed once.
+
+        Args:
+            chunk_processor: ChunkProcessor with the new settings
+            vector_store: PineconeManager or LocalVectorStore, ideally with a registry
+            transcript_path: Returns the transcript file of a video id
+            config: Re-index configuration
+            query_cache: Cache whose results of re-indexed videos are dropped,
+                         defaults to the process-wide cache configured in
+                         config/config.yaml
+        """
+        self.chunk_processor = chunk_processor
+        self.vector_store = vector_store
+        self.transcript_path = transcript_path
+        self.config = config or ReindexConfig()
+        self.registry = getattr(vector_store, "registry", None)
+        self.query_cache = query_cache or default_query_cache()
+        self.logger = logging.getLogger('DeltaReindexer')
+
+    def plan(self, video_id: str) -> VideoDelta:
+        """Re-chunk a video and diff it against its stored chunks, without writing anything."""
+        chunks = self.chunk_processor.chunk_batch_file(self.transcript_path(video_id), video_id)
+        hashes = self.chunk_processor.content_hashes(chunks)
+        stored = self.registry.chunk_hashes(video_id) if self.registry is not None else {}
+        if not stored:
+            stored = dict.fromkeys(self.vector_store.list_video_chunk_ids(video_id))
+        changed, orphans = diff_chunks(chunks.ids(), hashes, stored)
+        return VideoDelta(video_id, chunks, hashes, changed, orphans)
+
+    def apply(self, deltas: List[VideoDelta]):
+        """Embed the changed chunks of `deltas` in one call, then upsert them and delete orphans per video."""
+        changed = [delta.chunks.take(delta.changed) for delta in deltas]
+        texts = [text for batch in changed for text in batch.texts()]
+        embeddings = self.chunk_processor.embed_texts(texts) if texts else None
+
+        offset = 0
+        for delta, batch in zip(deltas, changed):
+            if self.registry is not None:
+                self.registry.begin(delta.video_id, self.chunk_processor.index_settings(),
+                                    self.chunk_processor.embedding_model_name)
+            if len(batch):
+                batch.with_embeddings(embeddings[offset:offset + len(batch)])
+                offset += len(batch)
+                self.vector_store.index_video_chunks(batch, delta.video_id, complete=False)
+            if delta.orphans:
+                self.vector_store.delete_chunks(delta.video_id, delta.orphans)
+            if self.registry is not None:
+                hashes = [delta.hashes[i] for i in delta.changed]
+                self.registry.record_chunks(delta.video_id, dict(zip(batch.ids(), hashes)), removed=delta.orphans)
+            self.vector_store.complete_video(delta.video_id, len(delta.chunks))
+            if self.query_cache:
+                self.query_cache.invalidate_video(delta.video_id)
+
+    def run(self, video_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Re-index `video_ids`, by default every video in the registry.
+
+        Returns:
+            One summary per video (chunks, unchanged, changed, deleted), or
+            with an "error" key for videos that could not be re-indexed
+        """
+        if video_ids is None:
+            if self.registry is None:
+                raise ValueError("Pass the videos to re-index when the vector store has no registry")
+            video_ids = [entry["video_id"] for entry in self.registry.videos()]
+
+        summaries = []
+        for start in range(0, len(video_ids), self.config.videos_per_batch):
+            group = video_ids[start:start + self.config.videos_per_batch]
+            with ThreadPoolExecutor(max_workers=self.config.chunk_workers) as executor:
+                futures = [executor.submit(self.plan, video_id) for video_id in group]
+            deltas = []
+            for video_id, future in zip(group, futures):
+                try:
+                    deltas.append(future.result())
+                except Exception as e:
+                    self.logger.error(f"Could not re-chunk {video_id}: {str(e)}")
+                    summaries.append({"video_id": video_id, "error": str(e)})
+
+            if not self.config.dry_run:
+                self.apply([delta for delta in deltas if delta.changed or delta.orphans])
+            summaries.extend(delta.summary() for delta in deltas)
+
+        totals = {key: sum(s.get(key, 0) for s in summaries) for key in ("chunks", "changed", "deleted")}
+        self.logger.info(
+            f"{'Planned' if self.config.dry_run else 'Re-indexed'} {len(video_ids)} videos: "
+            f"{totals['changed']} of {totals['chunks']} chunks new or changed, {totals['deleted']} deleted"
+        )
+        return summaries
+
+
+def main():
+    from .chunk_processor import ChunkConfig, ChunkProcessor, EmbeddingType
+    from .local_vector_store import LocalVectorStore
+    from .vector_store import create_vector_store
+    from .video_processor import VideoProcessor
+
+    parser = argparse.ArgumentParser(description="Re-index videos after changing chunking or embedding settings, "
+                                                 "touching only the chunks that changed.")
+    parser.add_argument("video_ids", nargs="*", help="videos to re-index, defaults to every registered video")
+    defaults, config = ChunkConfig(), ReindexConfig()
+    parser.add_argument("--index-name", default="video-rag-test")
+    parser.add_argument("--vector-store", choices=["pinecone", "local"])
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size)
+    parser.add_argument("--overlap", type=int, default=defaults.overlap)
+    parser.add_argument("--hf-model", default=defaults.hf_model_name)
+    parser.add_argument("--embedding-type", choices=[t.value for t in EmbeddingType],
+                        default=defaults.embedding_type.value)
+    parser.add_argument("--projection", help="EmbeddingProjection (.npz) applied before indexing")
+    parser.add_argument("--videos-per-batch", type=int, default=config.videos_per_batch)
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    chunk_processor = ChunkProcessor(ChunkConfig(
+        chunk_size=args.chunk_size,
+        overlap=args.overlap,
+        hf_model_name=args.hf_model,
+        embedding_type=EmbeddingType(args.embedding_type),
+        projection_path=args.projection
+    ))
+    projection = chunk_processor.projection
+    vector_store = create_vector_store(args.index_name, dimension=projection.output_dim if projection else None,
+                                       backend=args.vector_store)
+    # Transcripts come from the media cache; videos missing from it are transcribed again
+    video_processor = VideoProcessor()
+    reindexer = DeltaReindexer(
+        chunk_processor, vector_store,
+        lambda video_id: video_processor.process_video(f"https://www.youtube.com/watch?v={video_id}")[2],
+        ReindexConfig(videos_per_batch=args.videos_per_batch, dry_run=args.dry_run)
+    )
+    try:
+        for row in reindexer.run(args.video_ids or None):
+            if "error" in row:
+                print(f"{row['video_id']:<14} error: {row['error']}")
+            else:
+                print(f"{row['video_id']:<14} {row['chunks']:>6} chunks  {row['changed']:>6} changed  "
+                      f"{row['deleted']:>6} deleted")
+    finally:
+        chunk_processor.close()
+        if isinstance(vector_store, LocalVectorStore):
+            vector_store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# src/time_index.py
+
+from typing import Optional
+
+import numpy as np
+
+
+class TimeIndex:
+    def __init__(self, starts, ends):
+        """
+        Sorted interval index over the chunks of one video.
+
+        Chunks are ordered by start time, with a running maximum of their end
+        times next to it. Both arrays are sorted, so the chunks overlapping a
+        time window are found with two binary searches, and the chunk playing
+        at a given second with one, without looking at any other chunk.
+
+        Args:
+            starts: Chunk start times in seconds, in any order
+            ends: Chunk end times in seconds
+        """
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        self.order = np.argsort(starts, kind="stable")  # positions in the given arrays, by start time
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+        self.max_ends = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlapping(self, start_time: Optional[float] = None, end_time: Optional[float] = None) -> np.ndarray:
+        """
+        Positions of the chunks overlapping [start_time, end_time], ordered by start time.
+
+        Either bound may be None for an open window.
+
+        Example:
+            >>> TimeIndex([0, 25, 50, 75], [30, 55, 80, 100]).overlapping(40, 60).tolist()
+            [1, 2]
+        """
+        # Chunks starting after the window cannot overlap it...
+        stop = len(self.starts) if end_time is None else int(np.searchsorted(self.starts, end_time, side="right"))
+        if start_time is None:
+            return self.order[:stop]
+        # ...nor can chunks before the first one whose running max end reaches the window
+        start = int(np.searchsorted(self.max_ends, start_time, side="left"))
+        candidates = np.arange(start, max(start, stop))
+        return self.order[candidates[self.ends[candidates] >= start_time]]
+
+    def at(self, time: float) -> Optional[int]:
+        """
+        Position of the chunk playing at `time` seconds, or None.
+
+        Where overlapping chunks both contain `time`, the one that started
+        last wins, as its text follows on from that moment.
+
+        Example:
+            >>> TimeIndex([0, 25, 50], [30, 55, 80]).at(27)
+            1
+        """
+        i = int(np.searchsorted(self.starts, time, side="right")) - 1
+        # Walk back only while an earlier chunk could still reach past `time`
+        while i >= 0 and self.max_ends[i] > time:
+            if self.ends[i] > time:
+                return int(self.order[i])
+            i -= 1
+        return None
@@ -0,0 +1,195 @@
+# src/transcript_format.py
+
+import json
+import mmap
+import os
+import struct
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+TRANSCRIPT_SUFFIX = ".vrt"
+MAGIC = b"VRTS"
+VERSION = 1
+_PREFIX = struct.Struct("<4sII")  # magic, version, header length
+_ALIGN = 8
+
+
+def _encode_texts(texts: Iterable[str]):
+    """Pack strings into one UTF-8 blob plus an offsets array with len(texts) + 1 entries."""
+    blobs = [t.encode('utf-8') for t in texts]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    if blobs:
+        np.cumsum([len(b) for b in blobs], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(blobs), dtype=np.uint8)
+
+
+def write_transcript(path: str, segments: List[Dict]):
+    """
+    Write segments to a columnar binary transcript.
+
+    The file holds a small JSON header followed by 8-byte aligned arrays:
+    segment ids, float64 start/end times, text offsets and a UTF-8 text blob.
+    Word timings, when segments carry a 'words' list, are stored the same way.
+    The file is written to a temp name and renamed into place.
+
+    Args:
+        path: Destination path, normally ending in TRANSCRIPT_SUFFIX
+        segments: Whisper-style segments with 'start', 'end', 'text' and optional 'id'/'words'
+    """
+    text_offsets, text = _encode_texts(s['text'].strip() for s in segments)
+    arrays = {
+        'ids': np.array([s.get('id', i) for i, s in enumerate(segments)], dtype=np.int64),
+        'starts': np.array([s['start'] for s in segments], dtype=np.float64),
+        'ends': np.array([s['end'] for s in segments], dtype=np.float64),
+        'text_offsets': text_offsets,
+        'text': text,
+    }
+
+    if any(s.get('words') for s in segments):
+        words = [w for s in segments for w in (s.get('words') or [])]
+        word_offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+        np.cumsum([len(s.get('words') or []) for s in segments], out=word_offsets[1:])
+        word_text_offsets, word_text = _encode_texts(w['word'].strip() for w in words)
+        arrays.update({
+            'word_offsets': word_offsets,
+            'word_starts': np.array([w['start'] for w in words], dtype=np.float64),
+            'word_ends': np.array([w['end'] for w in words], dtype=np.float64),
+            'word_text_offsets': word_text_offsets,
+            'word_text': word_text,
+        })
+
+    # Lay out arrays after the header, each aligned for zero-copy views
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // _ALIGN) * _ALIGN
+        layout[name] = {'offset': offset, 'dtype': array.dtype.str, 'length': int(array.size)}
+        offset += array.nbytes
+    header = json.dumps({'count': len(segments), 'arrays': layout}).encode('utf-8')
+    data_start = -(-(_PREFIX.size + len(header)) // _ALIGN) * _ALIGN
+
+    partial = f"{path}.{uuid.uuid4().hex}.partial"
+    with open(partial, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(partial, path)
+
+
+class Transcript:
+    def __init__(self, path: str):
+        """
+        Memory-mapped reader for transcripts written by `write_transcript`.
+
+        `starts`, `ends` and `ids` are NumPy views into the mapped file, so
+        opening a transcript costs no parsing and no copies.
+
+        Args:
+            path: Path of a binary transcript file
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_len = _PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a binary transcript: {path}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported transcript version {version}: {path}")
+
+        header = json.loads(bytes(self._mmap[_PREFIX.size:_PREFIX.size + header_len]))
+        data_start = -(-(_PREFIX.size + header_len) // _ALIGN) * _ALIGN
+        self._arrays = {
+            name: np.frombuffer(self._mmap, dtype=np.dtype(spec['dtype']), count=spec['length'],
+                                offset=data_start + spec['offset'])
+            for name, spec in header['arrays'].items()
+        }
+        self.count = header['count']
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._arrays['ids']
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self._arrays['starts']
+
+    @property
+    def ends(self) -> np.ndarray:
+        return self._arrays['ends']
+
+    @property
+    def has_words(self) -> bool:
+        return 'word_offsets' in self._arrays
+
+    def __len__(self) -> int:
+        return self.count
+
+    def text(self, index: int) -> str:
+        """Text of segment `index`."""
+        offsets = self._arrays['text_offsets']
+        return self._arrays['text'][offsets[index]:offsets[index + 1]].tobytes().decode('utf-8')
+
+    def texts(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """Texts of segments `start` to `stop` (exclusive)."""
+        stop = self.count if stop is None else stop
+        return [self.text(i) for i in range(start, stop)]
+
+    def words(self, index: int) -> List[Dict]:
+        """Word timings of segment `index`, empty when the transcript has none."""
+        if not self.has_words:
+            return []
+        a = self._arrays
+        first, last = a['word_offsets'][index], a['word_offsets'][index + 1]
+        text_offsets = a['word_text_offsets']
+        return [
+            {
+                'word': a['word_text'][text_offsets[w]:text_offsets[w + 1]].tobytes().decode('utf-8'),
+                'start': float(a['word_starts'][w]),
+                'end': float(a['word_ends'][w]),
+            }
+            for w in range(first, last)
+        ]
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Yield segments as dicts with 'id', 'start', 'end' and 'text' (and 'words' if stored)."""
+        for i in range(self.count):
+            segment = {
+                'id': int(self.ids[i]),
+                'start': float(self.starts[i]),
+                'end': float(self.ends[i]),
+                'text': self.text(i),
+            }
+            if self.has_words:
+                segment['words'] = self.words(i)
+            yield segment
+
+    def close(self):
+        self._arrays = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds an array view; the map is released with it
+            pass
+
+    def __enter__(self) -> "Transcript":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_binary_transcript(path: str) -> bool:
+    """True if `path` is a binary transcript rather than a legacy `[HH:MM:SS] text` file."""
+    if path.endswith(TRANSCRIPT_SUFFIX):
+        return True
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
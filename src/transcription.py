@@ -0,0 +1,217 @@
+# src/transcription.py
+
+import logging
+import math
+import os
+import subprocess
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionBackend(ABC):
+    """
+    Speech-to-text backend used by VideoProcessor.
+
+    Implementations take the path of an audio file and return a Whisper
+    `verbose_json` style dict with at least a `segments` list of
+    {'start', 'end', 'text'} entries (times in seconds, relative to the file).
+    """
+
+    @abstractmethod
+    def transcribe(self, audio_path: str) -> Dict:
+        ...
+
+
+class WhisperAPIBackend(TranscriptionBackend):
+    def __init__(self, model: str = "whisper-1"):
+        """Transcribe through the OpenAI Whisper API."""
+        self.model = model
+
+    def transcribe(self, audio_path: str) -> Dict:
+        import openai
+        with open(audio_path, 'rb') as audio_file:
+            return openai.Audio.transcribe(
+                model=self.model,
+                file=audio_file,
+                response_format="verbose_json"
+            )
+
+
+@dataclass
+class AudioWindow:
+    index: int
+    start: float  # offset of the extracted clip in the source audio
+    end: float
+    keep_start: float  # segments whose midpoint falls in [keep_start, keep_end) belong to this window
+    keep_end: float
+    path: str = ""
+
+
+def plan_windows(duration: float, window_seconds: float, overlap_seconds: float = 0.0) -> List[AudioWindow]:
+    """
+    Split `duration` seconds of audio into time-aligned windows.
+
+    Each window owns `window_seconds` of audio and is padded by `overlap_seconds`
+    on both sides so that words cut at a boundary are heard in full by one side.
+
+    Example:
+        >>> [(w.start, w.end) for w in plan_windows(25, 10, 1)]
+        [(0, 11), (9, 21), (19, 25)]
+    """
+    if window_seconds <= 0:
+        raise ValueError("window_seconds must be positive")
+
+    count = max(1, math.ceil(duration / window_seconds))
+    windows = []
+    for i in range(count):
+        keep_start = i * window_seconds
+        keep_end = (i + 1) * window_seconds
+        windows.append(AudioWindow(
+            index=i,
+            start=max(0, keep_start - overlap_seconds),
+            end=min(duration, keep_end + overlap_seconds),
+            keep_start=keep_start if i > 0 else float('-inf'),
+            keep_end=keep_end if i < count - 1 else float('inf')
+        ))
+    return windows
+
+
+def probe_duration(audio_path: str) -> float:
+    """Return the duration of an audio file in seconds using ffprobe."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+         "-of", "default=noprint_wrappers=1:nokey=1", audio_path],
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip())
+
+
+def split_audio(audio_path: str, windows: List[AudioWindow], output_dir: str) -> List[AudioWindow]:
+    """Cut `audio_path` into one file per window with ffmpeg (stream copy, no re-encode)."""
+    ext = os.path.splitext(audio_path)[1] or ".mp3"
+    for window in windows:
+        window.path = os.path.join(output_dir, f"segment_{window.index:04d}{ext}")
+        subprocess.run(
+            ["ffmpeg", "-v", "error", "-y",
+             "-ss", f"{window.start:.3f}", "-t", f"{window.end - window.start:.3f}",
+             "-i", audio_path, "-c", "copy", window.path],
+            check=True
+        )
+    return windows
+
+
+def window_segments(window: AudioWindow, transcript: Dict) -> List[Dict]:
+    """
+    Segments of one window's transcript that the window owns, on the source timeline.
+
+    Segment times are shifted by the window offset and segments that belong
+    to a neighbouring window's overlap are dropped.
+    """
+    segments = []
+    for segment in transcript['segments']:
+        start = segment['start'] + window.start
+        end = segment['end'] + window.start
+        midpoint = (start + end) / 2
+        if window.keep_start <= midpoint < window.keep_end:
+            segments.append({**segment, 'start': start, 'end': end})
+    segments.sort(key=lambda s: s['start'])
+    return segments
+
+
+def stitch_transcripts(windows: List[AudioWindow], transcripts: List[Dict]) -> Dict:
+    """Merge per-window transcripts into one transcript on the source timeline, renumbering ids."""
+    segments = []
+    language = None
+    for window, transcript in zip(windows, transcripts):
+        language = language or transcript.get('language')
+        segments.extend(window_segments(window, transcript))
+
+    segments.sort(key=lambda s: s['start'])
+    for i, segment in enumerate(segments):
+        segment['id'] = i
+
+    return {
+        'text': " ".join(s['text'].strip() for s in segments),
+        'segments': segments,
+        'language': language,
+        'duration': segments[-1]['end'] if segments else 0.0
+    }
+
+
+class SegmentedTranscriber:
+    def __init__(self, backend: TranscriptionBackend, segment_duration: float = 600,
+                 overlap: float = 2.0, max_workers: int = 4,
+                 splitter: Callable[[str, List[AudioWindow], str], List[AudioWindow]] = split_audio):
+        """
+        Transcribe long audio as overlapping windows on a bounded worker pool.
+
+        Args:
+            backend: Backend used for each window
+            segment_duration: Seconds of audio owned by each window
+            overlap: Seconds of padding shared with neighbouring windows
+            max_workers: Maximum number of concurrent backend requests
+            splitter: Function that writes one audio file per window
+        """
+        self.backend = backend
+        self.segment_duration = segment_duration
+        self.overlap = overlap
+        self.max_workers = max_workers
+        self.splitter = splitter
+
+    def transcribe(self, audio_path: str, work_dir: str, duration: Optional[float] = None) -> Dict:
+        """
+        Transcribe `audio_path`, writing window files to `work_dir`.
+
+        Audio that fits in a single window is sent to the backend unchanged.
+        """
+        if duration is None:
+            duration = probe_duration(audio_path)
+
+        windows = plan_windows(duration, self.segment_duration, self.overlap)
+        if len(windows) == 1:
+            return self.backend.transcribe(audio_path)
+
+        windows = self.splitter(audio_path, windows, work_dir)
+        logger.info(f"Transcribing {len(windows)} segments with {self.max_workers} workers...")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            transcripts = list(executor.map(lambda w: self.backend.transcribe(w.path), windows))
+
+        return stitch_transcripts(windows, transcripts)
+
+    def iter_segments(self, audio_path: str, work_dir: str, duration: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Transcribe `audio_path` and yield segments in timeline order as soon as they are final.
+
+        Windows are transcribed concurrently; a window's segments are released
+        once every earlier window has finished, so consumers can start on the
+        beginning of a long video while the rest is still being transcribed.
+        """
+        if duration is None:
+            duration = probe_duration(audio_path)
+
+        windows = plan_windows(duration, self.segment_duration, self.overlap)
+        if len(windows) == 1:
+            yield from self.backend.transcribe(audio_path)['segments']
+            return
+
+        windows = self.splitter(audio_path, windows, work_dir)
+        logger.info(f"Streaming {len(windows)} segments with {self.max_workers} workers...")
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            # executor.map returns results in submission order, i.e. timeline order
+            transcripts = executor.map(lambda w: self.backend.transcribe(w.path), windows)
+            next_id = 0
+            for window, transcript in zip(windows, transcripts):
+                for segment in window_segments(window, transcript):
+                    segment['id'] = next_id
+                    next_id += 1
+                    yield segment
+        finally:
+            # Don't keep paying for windows nobody will read if the consumer stops early
+            executor.shutdown(wait=True, cancel_futures=True)
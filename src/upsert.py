@@ -0,0 +1,167 @@
+# src/upsert.py
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .utils import retry_delay
+
+logger = logging.getLogger(__name__)
+
+# JSON bytes per embedding value: a float32 printed as a Python float takes up to 22
+# characters, plus the ", " separator
+BYTES_PER_VALUE = 24
+# Ids, metadata keys, times and the video URL
+PAYLOAD_OVERHEAD_BYTES = 256
+
+
+@dataclass
+class UpsertConfig:
+    max_request_bytes: int = 1_500_000  # estimated payload per request; Pinecone rejects requests over 2 MB
+    max_batch_size: int = 1000  # vectors per request (Pinecone's limit)
+    max_in_flight: int = 4  # concurrent upsert requests on the shared client
+    max_retries: int = 4  # retries per failed batch
+    initial_backoff: float = 0.5  # seconds, doubled after every retry
+    max_backoff: float = 30.0
+
+
+class UpsertError(RuntimeError):
+    """Some upsert batches still failed after their retries; the other batches were written."""
+
+    def __init__(self, failed: List[Tuple[int, int]], errors: List[Exception]):
+        super().__init__(f"{len(failed)} upsert batches failed, first error: {errors[0]}")
+        self.failed = failed  # (start, stop) ranges of the failed batches
+        self.errors = errors
+
+
+def estimate_payload_bytes(dimension: int, text_length: int) -> int:
+    """Upper estimate of the request bytes one vector with `text_length` characters of text adds."""
+    return dimension * BYTES_PER_VALUE + text_length + PAYLOAD_OVERHEAD_BYTES
+
+
+def batch_by_bytes(sizes: Sequence[int], max_bytes: int, max_size: int) -> List[Tuple[int, int]]:
+    """
+    Cut consecutive items into (start, stop) ranges of at most `max_bytes` and `max_size` items.
+
+    An item larger than `max_bytes` gets a batch of its own.
+
+    Example:
+        >>> batch_by_bytes([400, 400, 400, 900], max_bytes=1000, max_size=10)
+        [(0, 2), (2, 3), (3, 4)]
+    """
+    batches = []
+    start, total = 0, 0
+    for i, size in enumerate(sizes):
+        if i > start and (total + size > max_bytes or i - start >= max_size):
+            batches.append((start, i))
+            start, total = i, 0
+        total += size
+    if start < len(sizes):
+        batches.append((start, len(sizes)))
+    return batches
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors and connection problems; not bad requests."""
+    status = getattr(error, 'status', None) or getattr(error, 'status_code', None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return isinstance(error, (ConnectionError, TimeoutError, OSError)) or \
+        type(error).__module__.startswith(('urllib3', 'requests', 'grpc'))
+
+
+class ConcurrentUpserter:
+    def __init__(self, upsert: Callable[[List[Dict]], object], config: Optional[UpsertConfig] = None):
+        """
+        Upsert many vectors with several size-bounded requests in flight.
+
+        Vectors are cut into batches by estimated payload bytes instead of a
+        fixed count, so requests stay under the size limit whatever the
+        dimension and text length. Batches are sent from a thread pool through
+        the one shared client, reusing its pooled connections. A batch that
+        fails with a retryable error is retried on its own with backoff; the
+        other batches are not sent again.
+
+        Args:
+            upsert: Sends one request when called as upsert(vectors=[...]), e.g. index.upsert
+            config: Request size, concurrency and retry settings
+        """
+        self.upsert = upsert
+        self.config = config or UpsertConfig()
+
+    def run(self, count: int, sizes: Sequence[int], payloads: Callable[[int, int], List[Dict]]) -> Dict:
+        """
+        Upsert `count` vectors.
+
+        Args:
+            count: Number of vectors
+            sizes: Estimated payload bytes of each vector
+            payloads: Builds the request payloads of vectors start..stop, so
+                      only batches in flight are held as JSON-ready dicts
+
+        Returns:
+            Stats: vectors, batches, seconds, vectors_per_second and a
+            per-batch list with vectors, bytes, attempts and seconds
+
+        Raises:
+            UpsertError: if batches still failed after their retries
+        """
+        started = time.perf_counter()
+        ranges = batch_by_bytes(sizes, self.config.max_request_bytes, self.config.max_batch_size)
+        batch_stats: List[Dict] = [None] * len(ranges)
+        failed, errors = [], []
+        lock = threading.Lock()
+
+        def send(index: int):
+            start, stop = ranges[index]
+            try:
+                batch_stats[index] = self._send(payloads(start, stop), sum(sizes[start:stop]))
+            except Exception as e:
+                with lock:
+                    failed.append((start, stop))
+                    errors.append(e)
+
+        if len(ranges) == 1:
+            send(0)
+        else:
+            with ThreadPoolExecutor(max_workers=self.config.max_in_flight) as executor:
+                list(executor.map(send, range(len(ranges))))
+
+        seconds = time.perf_counter() - started
+        stats = {
+            'vectors': count,
+            'batches': len(ranges),
+            'seconds': seconds,
+            'vectors_per_second': count / seconds if seconds > 0 else 0.0,
+            'per_batch': [s for s in batch_stats if s is not None],
+        }
+        if failed:
+            raise UpsertError(sorted(failed), errors)
+        return stats
+
+    def _send(self, vectors: List[Dict], size: int) -> Dict:
+        started = time.perf_counter()
+        for attempt in range(self.config.max_retries + 1):
+            request_started = time.perf_counter()
+            try:
+                self.upsert(vectors=vectors)
+            except Exception as e:
+                if attempt == self.config.max_retries or not is_retryable(e):
+                    raise
+                delay = retry_delay(attempt, e, self.config.initial_backoff, self.config.max_backoff)
+                logger.warning(f"Upsert of {len(vectors)} vectors failed ({str(e)}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            latency = time.perf_counter() - request_started
+            logger.debug(f"Upserted {len(vectors)} vectors (~{size / 1e3:.0f} KB) in {latency * 1000:.0f} ms")
+            return {
+                'vectors': len(vectors),
+                'bytes': size,
+                'attempts': attempt + 1,
+                'latency_seconds': latency,
+                'seconds': time.perf_counter() - started,
+            }
@@ -1,6 +1,9 @@
 # src/utils.py
 
+import random
 import re
+from functools import lru_cache
+from pathlib import Path
 from urllib.parse import urlparse, parse_qs
 from typing import Dict, List
 import logging
@@ -8,6 +11,52 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def load_env():
+    """
+    Load variables from a .env file into the environment, once per process.
+
+    Components call this when they are constructed rather than at import
+    time, so importing the package stays cheap and free of side effects.
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def retry_delay(attempt: int, error: Exception, initial_backoff: float, max_backoff: float) -> float:
+    """
+    Seconds to wait before retry `attempt` (0-based) after `error`.
+
+    Honours a Retry-After header on the error when the server sent one;
+    otherwise exponential backoff with jitter, capped at `max_backoff`.
+    """
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        retry_after = float(headers.get('retry-after') or headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        retry_after = None
+    if retry_after is not None:
+        return min(retry_after, max_backoff)
+
+    delay = min(initial_backoff * (2 ** attempt), max_backoff)
+    return delay * random.uniform(0.5, 1.0)
+
+
+CONFIG_PATH = str(Path(__file__).resolve().parent.parent / "config" / "config.yaml")
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str = CONFIG_PATH) -> Dict:
+    """
+    Read the YAML configuration file, once per process and path.
+
+    Callers must not modify the returned dict; it is shared.
+    """
+    import yaml
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+
 def extract_video_id(url: str) -> str:
     """
     Extract video ID from different YouTube URL formats.
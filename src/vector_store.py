@@ -1,28 +1,96 @@
 # src/pinecone_manager.py
 
-from pinecone import Pinecone, Index
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional, Union
 import logging
-from dotenv import load_dotenv
 import os
 
-# Load environment variables
-load_dotenv()
+from .upsert import ConcurrentUpserter, UpsertConfig, estimate_payload_bytes
+from .utils import load_config, load_env
+from .video_registry import VideoRegistry
+
+if TYPE_CHECKING:
+    # numpy-backed; imported where used so importing this module stays light
+    from .chunk_batch import ChunkBatch
+    from .document_store import DocumentStore
+    from .lexical_index import LexicalIndex
+
+
+def create_vector_store(index_name: str = "video-rag-test", dimension: Optional[int] = None,
+                        backend: Optional[str] = None):
+    """
+    Vector store for the backend named in config/config.yaml (`vector_store.backend`).
+
+    Args:
+        index_name: Pinecone index to use with the pinecone backend
+        dimension: Dimension of the stored vectors, see PineconeManager
+        backend: "pinecone" or "local", overriding the configured backend
+
+    Returns:
+        PineconeManager or LocalVectorStore; both offer check_video_exists,
+        index_video_chunks and search_video
+    """
+    settings = load_config().get("vector_store", {})
+    backend = backend or settings.get("backend", "pinecone")
+    registry_path = settings.get("registry_path")
+    registry = VideoRegistry(registry_path) if registry_path else None
+    lexical_index_path = settings.get("lexical_index_path")
+    lexical_index = None
+    if lexical_index_path:
+        from .lexical_index import LexicalIndex
+        lexical_index = LexicalIndex(lexical_index_path)
+    if backend == "local":
+        from .local_vector_store import LocalVectorStore
+        local = settings.get("local", {})
+        return LocalVectorStore(local.get("path", "vector_store"), dimension=dimension,
+                                library_index=local.get("library_index", False), registry=registry,
+                                lexical_index=lexical_index)
+    if backend == "pinecone":
+        document_store_path = settings.get("document_store_path")
+        document_store = None
+        if document_store_path:
+            from .document_store import DocumentStore
+            document_store = DocumentStore(document_store_path)
+        return PineconeManager(index_name, dimension=dimension, registry=registry,
+                               document_store=document_store, lexical_index=lexical_index)
+    raise ValueError(f"Unknown vector store backend: {backend}")
+
 
 class PineconeManager:
     # Model dimension for all-MiniLM-L6-v2
     EMBEDDING_DIM = 384
 
-    def __init__(self, index_name: str = "video-rag-test"):  # Changed default to our test index
+    def __init__(self, index_name: str = "video-rag-test",  # Changed default to our test index
+                 dimension: Optional[int] = None, registry: Optional[VideoRegistry] = None,
+                 upsert_config: Optional[UpsertConfig] = None,
+                 document_store: Optional["DocumentStore"] = None,
+                 lexical_index: Optional["LexicalIndex"] = None):
         """
         Initialize Pinecone manager.
 
         Args:
             index_name: Name of the Pinecone index to use
+            dimension: Dimension of the stored vectors, defaults to EMBEDDING_DIM;
+                       set it to the output dimension when embeddings are projected
+            registry: Local record of indexed videos; existence checks are
+                      answered from it instead of querying the index
+            upsert_config: Request size, concurrency and retry settings for indexing
+            document_store: Local store for chunk texts; when set, vectors only
+                            carry FILTER_FIELDS as metadata and search results
+                            are filled in from the store
+            lexical_index: Per-video BM25 index kept up to date with the
+                           indexed chunks, for hybrid retrieval in RAGEngine
         """
         self.logger = logging.getLogger('PineconeManager')
+        self.dimension = dimension or self.EMBEDDING_DIM
+        self.registry = registry
+        self.upsert_config = upsert_config or UpsertConfig()
+        self.document_store = document_store
+        self.lexical_index = lexical_index
+        self.last_upsert_stats: Optional[Dict] = None
 
         # Initialize Pinecone
+        from pinecone import Pinecone
+        load_env()
         api_key = os.getenv('PINECONE_API_KEY')
 
         if not api_key:
@@ -42,64 +110,182 @@ class PineconeManager:
         Returns:
             bool: True if video exists, False otherwise
         """
+        if self.registry is not None:
+            indexed = self.registry.is_indexed(video_id)
+            if indexed is not None:
+                return indexed
+
         try:
             # Query with filter for video_id
             results = self.index.query(
-                vector=[0] * self.EMBEDDING_DIM,  # dummy vector matching dimension
+                vector=[0] * self.dimension,  # dummy vector matching dimension
                 filter={"video_id": video_id},
                 top_k=1
             )
-            return len(results['matches']) > 0
+            exists = len(results['matches']) > 0
 
         except Exception as e:
             self.logger.error(f"Error checking video existence: {str(e)}")
             raise
 
-    def index_video_chunks(self, chunks: List[Dict], video_id: str):
+        if exists and self.registry is not None:
+            # Indexed before the registry was introduced: record it once
+            try:
+                chunk_count = self.count_video_chunks(video_id)
+            except Exception as e:
+                self.logger.warning(f"Could not count the chunks of {video_id}, recording it without a count: {e}")
+                chunk_count = None
+            self.registry.complete(video_id, chunk_count)
+        return exists
+
+    def count_video_chunks(self, video_id: str) -> int:
+        """
+        Number of vectors stored for a video.
+
+        Serverless indexes list them by id prefix (chunk ids are
+        `<video_id>_<millisecond>`); pod-based indexes, which cannot list ids,
+        count them from index statistics filtered by video_id.
+        """
+        try:
+            return sum(len(ids) for ids in self.index.list(prefix=f"{video_id}_"))
+        except Exception:
+            stats = self.index.describe_index_stats(filter={"video_id": video_id})
+            return stats['total_vector_count']
+
+    def list_video_chunk_ids(self, video_id: str) -> List[str]:
+        """Ids of every vector stored for a video."""
+        return [chunk_id for ids in self.index.list(prefix=f"{video_id}_") for chunk_id in ids]
+
+    def delete_chunks(self, video_id: str, ids: List[str]):
+        """Delete chunks of a video by id, in requests of at most 1000 ids (Pinecone's limit)."""
+        try:
+            ids = list(ids)
+            for start in range(0, len(ids), 1000):
+                self.index.delete(ids=ids[start:start + 1000])
+            if self.document_store is not None:
+                self.document_store.delete(ids)
+            if self.lexical_index is not None:
+                self.lexical_index.delete_chunks(video_id, ids)
+            self.logger.info(f"Deleted {len(ids)} chunks of video {video_id}")
+
+        except Exception as e:
+            self.logger.error(f"Error deleting video chunks: {str(e)}")
+            raise
+
+    def index_video_chunks(self, chunks: Union["ChunkBatch", List[Dict]], video_id: str, complete: bool = True,
+                           chunk_config: Optional[Dict] = None, embedding_model: Optional[str] = None):
         """
         Index video chunks in Pinecone.
 
         Args:
-            chunks: List of chunks with embeddings and metadata
+            chunks: ChunkBatch with embeddings, or list of chunks with embeddings and metadata
             video_id: YouTube video ID
+            complete: Whether these are the video's last chunks; callers indexing
+                      a video in several batches pass False for all but the last
+            chunk_config: Chunking settings recorded in the registry on completion,
+                          e.g. ChunkProcessor.index_settings()
+            embedding_model: Embedding model recorded in the registry on completion
         """
+        from .chunk_batch import ChunkBatch
+        if isinstance(chunks, ChunkBatch):
+            self._index_chunk_batch(chunks)
+        else:
+            self._index_chunk_list(chunks, video_id)
+        if self.lexical_index is not None:
+            self.lexical_index.index_video_chunks(chunks, video_id, complete=False)
+
+        if self.registry is not None:
+            self.registry.add_chunks(video_id, len(chunks))
+        if complete:
+            self.complete_video(video_id, chunk_config=chunk_config, embedding_model=embedding_model)
+
+    def complete_video(self, video_id: str, chunk_count: Optional[int] = None, chunk_config: Optional[Dict] = None,
+                       embedding_model: Optional[str] = None):
+        """
+        Finish a video indexed in several batches: build its lexical index and mark it complete.
+
+        Callers that pass complete=False to index_video_chunks call this once
+        the video's last chunks are stored, with the settings to record in
+        the registry (see index_video_chunks).
+        """
+        if self.lexical_index is not None:
+            self.lexical_index.complete_video(video_id)
+        if self.registry is not None:
+            self.registry.complete(video_id, chunk_count, chunk_config, embedding_model)
+
+    def _index_chunk_list(self, chunks: List[Dict], video_id: str):
         try:
             # Validate embedding dimensions
-            if len(chunks[0]['values']) != self.EMBEDDING_DIM:
+            if len(chunks[0]['values']) != self.dimension:
                 raise ValueError(
-                    f"Embedding dimension mismatch. Expected {self.EMBEDDING_DIM}, "
+                    f"Embedding dimension mismatch. Expected {self.dimension}, "
                     f"got {len(chunks[0]['values'])}"
                 )
 
+            # Texts go to the document store before their vectors become searchable
+            if self.document_store is not None:
+                self.document_store.put_chunks(chunks, video_id)
+
             # Prepare vectors for upserting
             vectors = []
+            sizes = []
             for chunk in chunks:
-                vector_data = {
-                    "id": chunk["id"],
-                    "values": chunk["values"],
-                    "metadata": {
-                        "video_id": video_id,
-                        "start_time": chunk["metadata"]["start_time"],
-                        "end_time": chunk["metadata"]["end_time"],
-                        "text": chunk["metadata"]["text"],
-                        "youtube_url": chunk["metadata"]["youtube_url"]
-                    }
+                metadata = {
+                    "video_id": video_id,
+                    "start_time": chunk["metadata"]["start_time"],
+                    "end_time": chunk["metadata"]["end_time"],
                 }
-                vectors.append(vector_data)
+                if self.document_store is None:
+                    metadata["text"] = chunk["metadata"]["text"]
+                    metadata["youtube_url"] = chunk["metadata"]["youtube_url"]
+                vectors.append({"id": chunk["id"], "values": chunk["values"], "metadata": metadata})
+                sizes.append(estimate_payload_bytes(self.dimension, len(metadata.get("text", ""))))
+
+            self._upsert(len(vectors), sizes, lambda start, stop: vectors[start:stop], video_id)
+
+        except Exception as e:
+            self.logger.error(f"Error indexing video chunks: {str(e)}")
+            raise
 
-            # Upsert in batches of 100
-            batch_size = 20
-            for i in range(0, len(vectors), batch_size):
-                batch = vectors[i:i + batch_size]
-                self.index.upsert(vectors=batch)
+    def _index_chunk_batch(self, batch: "ChunkBatch"):
+        """Upsert a ChunkBatch, building the request payloads one upsert batch at a time."""
+        from .chunk_batch import FILTER_FIELDS
+        try:
+            if batch.embeddings is None or batch.embeddings.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Embedding dimension mismatch. Expected {self.dimension}, "
+                    f"got {None if batch.embeddings is None else batch.embeddings.shape[1]}"
+                )
 
-            self.logger.info(f"Indexed {len(vectors)} chunks for video {video_id}")
+            if self.document_store is not None:
+                self.document_store.put_chunk_batch(batch)
+                fields = FILTER_FIELDS
+                sizes = [estimate_payload_bytes(self.dimension, 0)] * len(batch)
+            else:
+                fields = None
+                text_lengths = (batch.text_offsets[1:] - batch.text_offsets[:-1]).tolist()
+                sizes = [estimate_payload_bytes(self.dimension, n) for n in text_lengths]
+            self._upsert(len(batch), sizes,
+                         lambda start, stop: list(batch.slice(start, stop).upsert_payloads(fields)),
+                         batch.video_id)
 
         except Exception as e:
             self.logger.error(f"Error indexing video chunks: {str(e)}")
             raise
 
-    def search_video(self, query_embedding: List[float], video_id: str, top_k: int = 3) -> List[Dict]:
+    def _upsert(self, count: int, sizes: List[int], payloads, video_id: str):
+        """Send size-bounded upsert batches concurrently through the shared index client."""
+        stats = ConcurrentUpserter(self.index.upsert, self.upsert_config).run(count, sizes, payloads)
+        self.last_upsert_stats = stats
+        latencies = sorted(b['latency_seconds'] for b in stats['per_batch']) or [0.0]
+        self.logger.info(
+            f"Indexed {count} chunks for video {video_id} in {stats['batches']} batches, "
+            f"{stats['vectors_per_second']:.0f} vectors/s (batch latency median "
+            f"{latencies[len(latencies) // 2] * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms)"
+        )
+
+    def search_video(self, query_embedding: List[float], video_id: str, top_k: int = 3,
+                     start_time: Optional[float] = None, end_time: Optional[float] = None) -> List[Dict]:
         """
         Search for relevant chunks within a specific video.
 
@@ -107,39 +293,119 @@ class PineconeManager:
             query_embedding: Embedding of the query text
             video_id: YouTube video ID to search within
             top_k: Number of results to return
+            start_time: Only return chunks ending at or after this second
+            end_time: Only return chunks starting at or before this second
 
         Returns:
             List of relevant chunks with metadata
         """
         try:
             # Validate query embedding dimension
-            if len(query_embedding) != self.EMBEDDING_DIM:
+            if len(query_embedding) != self.dimension:
                 raise ValueError(
-                    f"Query embedding dimension mismatch. Expected {self.EMBEDDING_DIM}, "
+                    f"Query embedding dimension mismatch. Expected {self.dimension}, "
                     f"got {len(query_embedding)}"
                 )
 
-            # Query with video_id filter
+            # Query with video_id filter; with a document store only ids and scores come back
             results = self.index.query(
                 vector=query_embedding,
-                filter={"video_id": video_id},  # Only search within this video
+                filter=self._video_filter(video_id, start_time, end_time),  # Only search within this video
                 top_k=top_k,
-                include_metadata=True
+                include_metadata=self.document_store is None
             )
+            matches = results['matches']
+            if self.document_store is None:
+                metadata = {match['id']: match['metadata'] for match in matches}
+            else:
+                metadata = self._hydrate([match['id'] for match in matches])
 
-            # Format results
+            # Format results; chunks whose text is unavailable are left out (see _hydrate)
             formatted_results = []
-            for match in results['matches']:
+            for match in matches:
+                chunk = metadata.get(match['id'])
+                if chunk is None:
+                    continue
                 formatted_results.append({
+                    "id": match['id'],
                     "score": match['score'],
-                    "start_time": match['metadata']["start_time"],
-                    "end_time": match['metadata']["end_time"],
-                    "text": match['metadata']["text"],
-                    "youtube_url": match['metadata']["youtube_url"]
+                    "start_time": chunk["start_time"],
+                    "end_time": chunk["end_time"],
+                    "text": chunk["text"],
+                    "youtube_url": chunk["youtube_url"]
                 })
 
             return formatted_results
 
         except Exception as e:
             self.logger.error(f"Error searching video: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    def _video_filter(video_id: str, start_time: Optional[float] = None,
+                      end_time: Optional[float] = None) -> Dict:
+        """Metadata filter for the chunks of a video that overlap [start_time, end_time]."""
+        video_filter = {"video_id": video_id}
+        if start_time is not None:
+            video_filter["end_time"] = {"$gte": start_time}
+        if end_time is not None:
+            video_filter["start_time"] = {"$lte": end_time}
+        return video_filter
+
+    def chunk_at(self, video_id: str, time: float) -> Optional[Dict]:
+        """
+        The chunk playing at `time` seconds into a video, without any embedding call.
+
+        Answered from the document store's time index when there is one;
+        otherwise the index is queried with a time filter.
+
+        Returns:
+            Chunk with id and metadata, or None if no chunk covers `time`
+        """
+        if self.document_store is not None and len(self.document_store.time_index(video_id)[0]):
+            return self.document_store.chunk_at(video_id, time)
+
+        results = self.index.query(
+            vector=[0] * self.dimension,
+            filter={"video_id": video_id, "start_time": {"$lte": time}, "end_time": {"$gt": time}},
+            top_k=10,
+            include_metadata=True
+        )
+        matches = results['matches']
+        if not matches:
+            return None
+        # Of overlapping chunks, the one that started last, as with TimeIndex.at
+        match = max(matches, key=lambda m: m['metadata']['start_time'])
+        if self.document_store is not None:
+            chunk = self._hydrate([match['id']]).get(match['id'])
+            return dict(chunk, id=match['id']) if chunk is not None else None
+        return dict(match['metadata'], id=match['id'])
+
+    def _hydrate(self, ids: List[str]) -> Dict[str, Dict]:
+        """
+        Chunk metadata for `ids` from the document store, in one batch.
+
+        Vectors indexed before the document store was introduced still carry
+        their text in the index; those are fetched from it and copied into the
+        store, so each is fetched only once. Vectors indexed with a document
+        store that this process does not have (another host, a deleted file)
+        carry no text anywhere reachable and are left out with a warning.
+        """
+        metadata = self.document_store.get_many(ids)
+        missing = [chunk_id for chunk_id in ids if chunk_id not in metadata]
+        if missing:
+            fetched = self.index.fetch(ids=missing)['vectors']
+            chunks = [{"id": chunk_id, "metadata": vector.get('metadata') or {}}
+                      for chunk_id, vector in fetched.items()]
+            chunks = [chunk for chunk in chunks if "text" in chunk["metadata"]]
+            if chunks:
+                self.document_store.put_chunks(chunks)
+                metadata.update((chunk["id"], chunk["metadata"]) for chunk in chunks)
+            unavailable = len(missing) - len(chunks)
+            if unavailable:
+                self.logger.warning(
+                    f"Left out {unavailable} chunks whose text is neither in the document store at "
+                    f"{self.document_store.db_path} nor in the index; they were indexed with a document store "
+                    f"this process does not have. Re-index the video, or point document_store_path at that store."
+                )
+        return metadata
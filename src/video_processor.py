@@ -1,48 +1,82 @@
 import datetime
 import sys
-import openai
-import yt_dlp
-from pathlib import Path
-from typing import Dict, Tuple
+import threading
+import uuid
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, Optional, Tuple
 import logging
+import shutil
+import tempfile
 from dataclasses import dataclass
-from dotenv import load_dotenv
 import os
 
-# Load environment variables
-load_dotenv()
+from .media_cache import MediaCache, settings_key
+from .transcription import TranscriptionBackend, WhisperAPIBackend, SegmentedTranscriber
+from .utils import extract_video_id, load_env
+
+# Only one job at a time may try to self-update yt-dlp
+_ytdlp_update_lock = threading.Lock()
 
 
 @dataclass
 class VideoProcessorConfig:
-    temp_audio_file: str = "temp_audio.mp3"
+    temp_audio_file: str = "temp_audio.mp3"  # file name inside each job's workspace
+    workspace_dir: Optional[str] = None  # parent of per-job workspaces, defaults to the system temp dir
     model: str = "whisper-1"
     output_dir: str = "transcripts"
+    segment_duration: int = 600  # seconds per transcription request, 0 sends the whole file
+    segment_overlap: float = 2.0  # seconds shared between neighbouring segments
+    max_workers: int = 4  # concurrent transcription requests
+    cache_dir: Optional[str] = "cache"  # audio and transcript cache, None disables caching
+    cache_max_bytes: int = 2 * 1024 ** 3
+    transcript_format: str = "vrt"  # "vrt" keeps float times, ids and words; "txt" writes legacy [HH:MM:SS] lines
 
 
 class VideoProcessor:
-    def __init__(self):
-        """Initialize VideoProcessor with OpenAI API key from environment."""
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        if not self.api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
-
-        # Set up OpenAI API key
-        openai.api_key = self.api_key
+    def __init__(self, config: Optional[VideoProcessorConfig] = None,
+                 backend: Optional[TranscriptionBackend] = None):
+        """
+        Initialize VideoProcessor.
 
+        Args:
+            config: Processor configuration
+            backend: Transcription backend, defaults to the OpenAI Whisper API
+                     using OPENAI_API_KEY from the environment
+        """
         # Initialize config
-        self.config = VideoProcessorConfig()
+        self.config = config or VideoProcessorConfig()
+
+        if backend is None:
+            import openai
+            load_env()
+            self.api_key = os.getenv("OPENAI_API_KEY")
+            if not self.api_key:
+                raise ValueError("OPENAI_API_KEY not found in environment variables")
+
+            # Set up OpenAI API key
+            openai.api_key = self.api_key
+            backend = WhisperAPIBackend(self.config.model)
+        self.backend = backend
 
         # Create output directory if it doesn't exist
         os.makedirs(self.config.output_dir, exist_ok=True)
 
+        # Audio and transcripts are reused across runs for the same video
+        self.cache = MediaCache(self.config.cache_dir, self.config.cache_max_bytes) if self.config.cache_dir else None
+
         # Setup logger
         self.logger = logging.getLogger('VideoProcessor')
 
-    def download_youtube_audio(self, url: str) -> Dict:
+    def download_youtube_audio(self, url: str, audio_path: str) -> Dict:
         """
         Download audio from YouTube video with updated options to handle restrictions.
+
+        Args:
+            url: YouTube video URL
+            audio_path: Where to write the mp3, normally inside a job workspace
         """
+        import yt_dlp
+
         try:
             ydl_opts = {
                 'format': 'bestaudio/best',
@@ -51,7 +85,7 @@ class VideoProcessor:
                     'preferredcodec': 'mp3',
                     'preferredquality': '192',
                 }],
-                'outtmpl': self.config.temp_audio_file.replace('.mp3', ''),
+                'outtmpl': os.path.splitext(audio_path)[0],
                 'quiet': True,
                 'no_warnings': True,
                 'extract_flat': False,
@@ -78,7 +112,8 @@ class VideoProcessor:
             self.logger.info("Attempting to update yt-dlp...")
             try:
                 import subprocess
-                subprocess.run([sys.executable, "-m", "pip", "install", "--upgrade", "yt-dlp"])
+                with _ytdlp_update_lock:
+                    subprocess.run([sys.executable, "-m", "pip", "install", "--upgrade", "yt-dlp"])
                 # Retry download after update
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                     info = ydl.extract_info(url, download=True)
@@ -87,80 +122,235 @@ class VideoProcessor:
                 self.logger.error(f"Error after update attempt: {str(update_error)}")
                 raise
 
-    def transcribe_audio(self, audio_path: str, video_title: str) -> Tuple[Dict, str]:
+    def transcribe_audio(self, audio_path: str, video_title: str,
+                         duration: Optional[float] = None, workspace: Optional[str] = None) -> Tuple[Dict, str]:
         """
-        Transcribe audio file using OpenAI Whisper API and save with timestamps.
+        Transcribe audio file and save with timestamps.
+
+        Audio longer than `segment_duration` is split into overlapping segments
+        that are transcribed concurrently and stitched back together. Segment
+        files are written under `workspace` (or `workspace_dir`).
         """
+        work_dir = None
         try:
-            # Create safe filename
-            safe_title = "".join([c if c.isalnum() or c in (' ', '-', '_') else '_' for c in video_title])
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_filename = f"{safe_title}_{timestamp}"
-
-            # Transcribe using OpenAI API
             self.logger.info("Transcribing audio...")
-            with open(audio_path, 'rb') as audio_file:
-                transcript = openai.Audio.transcribe(
-                    model=self.config.model,
-                    file=audio_file,
-                    response_format="verbose_json"
-                )
+            if self.config.segment_duration > 0:
+                work_dir = tempfile.mkdtemp(prefix="segments_", dir=workspace or self.config.workspace_dir)
+                transcript = self._transcriber().transcribe(audio_path, work_dir, duration)
+            else:
+                transcript = self.backend.transcribe(audio_path)
 
-            # Save transcript with timestamps
-            txt_path = os.path.join(self.config.output_dir, f"{output_filename}.txt")
-            with open(txt_path, 'w', encoding='utf-8') as f:
-                for segment in transcript['segments']:
-                    # Convert time to HH:MM:SS format
-                    start_time = int(segment['start'])
-                    hours = start_time // 3600
-                    minutes = (start_time % 3600) // 60
-                    seconds = start_time % 60
-                    timestamp = f"[{hours:02d}:{minutes:02d}:{seconds:02d}]"
-
-                    # Write to file
-                    f.write(f"{timestamp} {segment['text'].strip()}\n")
-
-            self.logger.info(f"Transcript saved to: {txt_path}")
+            txt_path = self._save_transcript(transcript, video_title)
             return transcript, txt_path
 
         except Exception as e:
             self.logger.error(f"Error transcribing audio: {str(e)}")
             raise
 
+        finally:
+            if work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
     def process_video(self, url: str) -> Tuple[Dict, Dict, str]:
         """
         Process video: download and transcribe.
 
+        Results are served from the media cache when this video was already
+        transcribed with the same settings; cached audio is reused otherwise.
+
         Args:
             url: YouTube video URL
 
         Returns:
             Tuple[Dict, Dict, str]: (transcription, video_info, transcript_path)
         """
-        try:
+        video_id = self._cache_video_id(url)
+        key = self.transcription_settings_key()
+
+        if video_id:
+            cached = self.cache.get_transcript(video_id, key)
+            if cached:
+                self.logger.info(f"Using cached transcript for {video_id}")
+                return cached
+
+        with self._job_workspace() as workspace, self._pin(video_id):
             # Download audio
-            video_info = self.download_youtube_audio(url)
+            audio_path, video_info = self._get_audio(url, video_id, workspace)
 
             # Get video title
             video_title = video_info.get('title', 'Untitled')
 
             # Transcribe
             transcription, transcript_path = self.transcribe_audio(
-                self.config.temp_audio_file,
-                video_title
+                audio_path,
+                video_title,
+                video_info.get('duration'),
+                workspace
             )
 
-            # Clean up
-            self._cleanup()
+            if video_id:
+                transcript_path = self.cache.put_transcript(
+                    video_id, key, transcription, transcript_path, video_info
+                )
 
             return transcription, video_info, transcript_path
 
-        except Exception as e:
-            self._cleanup()
-            raise
+    def process_video_stream(self, url: str) -> Iterator[Dict]:
+        """
+        Process video and yield transcript segments as soon as they are transcribed.
+
+        Segments come in timeline order. Long videos are transcribed as
+        concurrent segments and released in order, so callers can chunk and
+        index the start of a video while the rest is still being transcribed.
+        The full transcript is saved and cached once the stream is exhausted.
+
+        Args:
+            url: YouTube video URL
+
+        Yields:
+            Dict: Segment with 'id', 'start', 'end' and 'text'
+        """
+        video_id = self._cache_video_id(url)
+        key = self.transcription_settings_key()
 
-    def _cleanup(self):
-        """Clean up temporary files."""
-        temp_file = Path(self.config.temp_audio_file)
-        if temp_file.exists():
-            temp_file.unlink()
\ No newline at end of file
+        if video_id:
+            cached = self.cache.get_transcript(video_id, key)
+            if cached:
+                self.logger.info(f"Using cached transcript for {video_id}")
+                yield from cached[0]['segments']
+                return
+
+        with self._job_workspace() as workspace, self._pin(video_id):
+            audio_path, video_info = self._get_audio(url, video_id, workspace)
+
+            self.logger.info("Transcribing audio...")
+            if self.config.segment_duration > 0:
+                work_dir = tempfile.mkdtemp(prefix="segments_", dir=workspace)
+                stream = self._transcriber().iter_segments(audio_path, work_dir, video_info.get('duration'))
+            else:
+                stream = iter(self.backend.transcribe(audio_path)['segments'])
+
+            segments = []
+            for segment in stream:
+                segments.append(segment)
+                yield segment
+
+            transcription = {
+                'text': " ".join(s['text'].strip() for s in segments),
+                'segments': segments,
+                'duration': segments[-1]['end'] if segments else 0.0
+            }
+            transcript_path = self._save_transcript(transcription, video_info.get('title', 'Untitled'))
+            if video_id:
+                self.cache.put_transcript(video_id, key, transcription, transcript_path, video_info)
+
+    def fetch_audio(self, url: str) -> Tuple[str, Dict]:
+        """
+        Download a video's audio into the media cache without transcribing it.
+
+        Lets bulk ingestion run downloads and transcriptions as separate stages.
+
+        Returns:
+            Tuple[str, Dict]: (cached_audio_path, video_info)
+        """
+        video_id = self._cache_video_id(url)
+        if not video_id:
+            raise ValueError("fetch_audio requires the media cache and a YouTube URL")
+
+        with self._job_workspace() as workspace, self._pin(video_id):
+            return self._get_audio(url, video_id, workspace)
+
+    def _get_audio(self, url: str, video_id: Optional[str], workspace: str) -> Tuple[str, Dict]:
+        """Return (audio_path, video_info) from the cache, or download into `workspace`."""
+        cached_audio = self.cache.get_audio(video_id) if video_id else None
+        if cached_audio:
+            self.logger.info(f"Using cached audio for {video_id}")
+            return cached_audio
+
+        audio_path = os.path.join(workspace, self.config.temp_audio_file)
+        video_info = self.download_youtube_audio(url, audio_path)
+        if video_id:
+            audio_path = self.cache.put_audio(video_id, audio_path, video_info)
+        return audio_path, video_info
+
+    def _transcriber(self) -> SegmentedTranscriber:
+        return SegmentedTranscriber(
+            self.backend,
+            segment_duration=self.config.segment_duration,
+            overlap=self.config.segment_overlap,
+            max_workers=self.config.max_workers
+        )
+
+    def _save_transcript(self, transcript: Dict, video_title: str) -> str:
+        """Write the transcript to the output directory in `transcript_format` and return the path."""
+        # Create safe filename
+        safe_title = "".join([c if c.isalnum() or c in (' ', '-', '_') else '_' for c in video_title])
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_filename = f"{safe_title}_{timestamp}_{uuid.uuid4().hex[:8]}"
+
+        if self.config.transcript_format == "vrt":
+            from .transcript_format import TRANSCRIPT_SUFFIX, write_transcript
+            vrt_path = os.path.join(self.config.output_dir, f"{output_filename}{TRANSCRIPT_SUFFIX}")
+            write_transcript(vrt_path, transcript['segments'])
+            self.logger.info(f"Transcript saved to: {vrt_path}")
+            return vrt_path
+
+        # Save transcript with timestamps; write to a temp file first so
+        # concurrent readers never see a partial transcript
+        txt_path = os.path.join(self.config.output_dir, f"{output_filename}.txt")
+        partial_path = f"{txt_path}.partial"
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            for segment in transcript['segments']:
+                # Convert time to HH:MM:SS format
+                start_time = int(segment['start'])
+                hours = start_time // 3600
+                minutes = (start_time % 3600) // 60
+                seconds = start_time % 60
+                timestamp = f"[{hours:02d}:{minutes:02d}:{seconds:02d}]"
+
+                # Write to file
+                f.write(f"{timestamp} {segment['text'].strip()}\n")
+        os.replace(partial_path, txt_path)
+
+        self.logger.info(f"Transcript saved to: {txt_path}")
+        return txt_path
+
+    def transcription_settings_key(self) -> str:
+        """Cache key for every setting that changes the transcript of a video."""
+        return settings_key({
+            'backend': type(self.backend).__name__,
+            'model': self.config.model,
+            'segment_duration': self.config.segment_duration,
+            'segment_overlap': self.config.segment_overlap,
+            'transcript_format': self.config.transcript_format
+        })
+
+    def _cache_video_id(self, url: str) -> Optional[str]:
+        """Video ID used as the cache key, or None when caching does not apply."""
+        if not self.cache:
+            return None
+        try:
+            return extract_video_id(url)
+        except ValueError:
+            return None
+
+    def _pin(self, video_id: Optional[str]):
+        """Keep the video's cached audio from being evicted by other jobs while this one uses it."""
+        return self.cache.pin(video_id) if video_id else nullcontext()
+
+    @contextmanager
+    def _job_workspace(self) -> Iterator[str]:
+        """
+        Create a private temp directory for one process_video call.
+
+        Each job downloads and splits audio in its own directory, so any number
+        of jobs can run in parallel threads or processes. The directory is
+        removed when the job finishes, whether it succeeded or not.
+        """
+        if self.config.workspace_dir:
+            os.makedirs(self.config.workspace_dir, exist_ok=True)
+        workspace = tempfile.mkdtemp(prefix="video_rag_", dir=self.config.workspace_dir)
+        try:
+            yield workspace
+        finally:
+            shutil.rmtree(workspace, ignore_errors=True)
@@ -0,0 +1,263 @@
+# src/video_registry.py
+
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Video states
+INDEXING = "indexing"  # chunks are being written; a crash leaves the video here
+COMPLETE = "complete"  # every chunk of the video was indexed
+PARTIAL = "partial"  # reconcile found fewer (or more) chunks in the store than recorded
+
+
+class VideoRegistry:
+    def __init__(self, db_path: str = "video_registry.db"):
+        """
+        Local record of the videos in a vector store.
+
+        Vector stores update the registry from `index_video_chunks` and answer
+        `check_video_exists` from it, so existence checks cost no network
+        round trip. Each video records its state, chunk count, chunking
+        settings and embedding model. A video only counts as indexed once it
+        reaches COMPLETE; one whose indexing was interrupted stays INDEXING
+        and is processed again. Complete videos are also held in an in-memory
+        set, so repeated checks (e.g. on every Streamlit rerun) skip SQLite.
+        The content hash of every stored chunk is kept as well, which lets
+        DeltaReindexer find the chunks that changed.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                chunk_count INTEGER NOT NULL DEFAULT 0,
+                chunk_config TEXT,
+                embedding_model TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                video_id TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                PRIMARY KEY (video_id, chunk_id)
+            )
+        """)
+        self._conn.commit()
+        self._complete = {video_id for (video_id,) in self._conn.execute(
+            "SELECT video_id FROM videos WHERE status = ?", (COMPLETE,))}
+
+    def is_indexed(self, video_id: str) -> Optional[bool]:
+        """
+        Whether `video_id` is completely indexed; None if the registry has never seen it.
+
+        Hits come from memory. Misses are looked up in SQLite so videos
+        completed by another process (e.g. bulk ingestion) are picked up.
+        """
+        if video_id in self._complete:
+            return True
+        status = self._status(video_id)
+        if status == COMPLETE:
+            self._complete.add(video_id)
+            return True
+        return None if status is None else False
+
+    def _status(self, video_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        """Registry entry of a video, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT video_id, status, chunk_count, chunk_config, embedding_model, updated_at "
+                "FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        return self._entry(row) if row else None
+
+    def videos(self, status: Optional[str] = None) -> List[Dict]:
+        """Every registered video, optionally only those in `status`."""
+        query = "SELECT video_id, status, chunk_count, chunk_config, embedding_model, updated_at FROM videos"
+        with self._lock:
+            rows = (self._conn.execute(query + " WHERE status = ?", (status,)) if status
+                    else self._conn.execute(query)).fetchall()
+        return [self._entry(row) for row in rows]
+
+    @staticmethod
+    def _entry(row) -> Dict:
+        return {
+            "video_id": row[0],
+            "status": row[1],
+            "chunk_count": row[2],
+            "chunk_config": json.loads(row[3]) if row[3] else None,
+            "embedding_model": row[4],
+            "updated_at": row[5],
+        }
+
+    def begin(self, video_id: str, chunk_config: Optional[Dict] = None, embedding_model: Optional[str] = None):
+        """Start (re-)indexing a video: its count restarts at zero and it stops counting as indexed."""
+        with self._lock:
+            self._complete.discard(video_id)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO videos VALUES (?, ?, 0, ?, ?, ?)",
+                (video_id, INDEXING, json.dumps(chunk_config) if chunk_config is not None else None,
+                 embedding_model, time.time())
+            )
+            self._conn.commit()
+
+    def add_chunks(self, video_id: str, count: int):
+        """Record `count` more chunks written for a video, starting a new round if it was not INDEXING."""
+        with self._lock:
+            self._complete.discard(video_id)
+            updated = self._conn.execute(
+                "UPDATE videos SET chunk_count = chunk_count + ?, updated_at = ? WHERE video_id = ? AND status = ?",
+                (count, time.time(), video_id, INDEXING)
+            ).rowcount
+            if not updated:
+                # Keep the settings recorded earlier, if any
+                self._conn.execute(
+                    "INSERT INTO videos (video_id, status, chunk_count, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (video_id) DO UPDATE SET status = excluded.status, "
+                    "chunk_count = excluded.chunk_count, updated_at = excluded.updated_at",
+                    (video_id, INDEXING, count, time.time())
+                )
+            self._conn.commit()
+
+    def complete(self, video_id: str, chunk_count: Optional[int] = None, chunk_config: Optional[Dict] = None,
+                 embedding_model: Optional[str] = None):
+        """
+        Mark a video as completely indexed, optionally overriding its chunk count.
+
+        `chunk_config` and `embedding_model` replace the settings recorded by
+        `begin`, if given. A video completed without any recorded settings is
+        logged, since DeltaReindexer cannot tell which of its chunks changed.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO videos (video_id, status, chunk_count, chunk_config, embedding_model, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (video_id) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at, "
+                "chunk_config = COALESCE(excluded.chunk_config, chunk_config), "
+                "embedding_model = COALESCE(excluded.embedding_model, embedding_model)"
+                + (", chunk_count = excluded.chunk_count" if chunk_count is not None else ""),
+                (video_id, COMPLETE, chunk_count or 0, json.dumps(chunk_config) if chunk_config is not None else None,
+                 embedding_model, time.time())
+            )
+            recorded = self._conn.execute(
+                "SELECT chunk_config IS NOT NULL AND embedding_model IS NOT NULL FROM videos WHERE video_id = ?",
+                (video_id,)).fetchone()[0]
+            self._conn.commit()
+            self._complete.add(video_id)
+        if not recorded:
+            logger.warning(f"{video_id} was indexed without recorded chunking settings or embedding model; "
+                           f"DeltaReindexer will re-embed all of its chunks once")
+
+    def remove(self, video_id: str):
+        with self._lock:
+            self._complete.discard(video_id)
+            self._conn.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+            self._conn.execute("DELETE FROM chunks WHERE video_id = ?", (video_id,))
+            self._conn.commit()
+
+    def chunk_hashes(self, video_id: str) -> Dict[str, str]:
+        """Content hash of every chunk recorded for a video, keyed by chunk id."""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT chunk_id, content_hash FROM chunks WHERE video_id = ?", (video_id,)))
+
+    def record_chunks(self, video_id: str, hashes: Dict[str, str], removed: Iterable[str] = ()):
+        """Record the content hashes of chunks written for a video and forget the `removed` chunk ids."""
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?)",
+                                   [(video_id, chunk_id, digest) for chunk_id, digest in hashes.items()])
+            self._conn.executemany("DELETE FROM chunks WHERE video_id = ? AND chunk_id = ?",
+                                   [(video_id, chunk_id) for chunk_id in removed])
+            self._conn.commit()
+
+    def reconcile(self, vector_store, video_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Compare recorded chunk counts with the chunks actually in `vector_store`.
+
+        Complete videos whose stored count differs are marked PARTIAL, so they
+        are indexed again; partial or interrupted videos whose stored count
+        now matches are left as they are (the registry cannot tell whether
+        chunks are missing from the end). Videos in `video_ids` that the
+        registry does not know but the store holds are registered as complete.
+
+        Args:
+            vector_store: Store with a count_video_chunks(video_id) method
+            video_ids: Videos to check, defaults to every registered video
+
+        Returns:
+            One dict per video whose registry entry changed or disagrees with the store
+        """
+        entries = {entry["video_id"]: entry for entry in self.videos()}
+        report = []
+        for video_id in video_ids or list(entries):
+            stored = vector_store.count_video_chunks(video_id)
+            entry = entries.get(video_id)
+            if entry is None:
+                if stored:
+                    self.complete(video_id, stored)
+                    report.append({"video_id": video_id, "status": COMPLETE, "registered": None, "stored": stored})
+                continue
+            if entry["chunk_count"] == stored:
+                continue
+            if entry["status"] == COMPLETE:
+                self._set_status(video_id, PARTIAL)
+            report.append({"video_id": video_id, "status": PARTIAL if entry["status"] == COMPLETE
+                           else entry["status"], "registered": entry["chunk_count"], "stored": stored})
+        logger.info(f"Reconciled {len(video_ids or entries)} videos, {len(report)} mismatched")
+        return report
+
+    def _set_status(self, video_id: str, status: str):
+        with self._lock:
+            self._conn.execute("UPDATE videos SET status = ?, updated_at = ? WHERE video_id = ?",
+                               (status, time.time(), video_id))
+            self._conn.commit()
+            if status == COMPLETE:
+                self._complete.add(video_id)
+            else:
+                self._complete.discard(video_id)
+
+    def close(self):
+        self._conn.close()
+
+
+def main():
+    from .vector_store import create_vector_store
+
+    parser = argparse.ArgumentParser(description="Inspect and reconcile the indexed-video registry")
+    parser.add_argument("command", choices=["list", "reconcile"])
+    parser.add_argument("video_ids", nargs="*", help="videos to reconcile, defaults to every registered video")
+    parser.add_argument("--index-name", default="video-rag-test")
+    parser.add_argument("--vector-store", choices=["pinecone", "local"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    store = create_vector_store(args.index_name, backend=args.vector_store)
+    if args.command == "list":
+        for entry in store.registry.videos():
+            print(f"{entry['video_id']:<14} {entry['status']:<9} {entry['chunk_count']:>6} chunks  "
+                  f"{entry['embedding_model'] or '-'}  {json.dumps(entry['chunk_config'])}")
+    else:
+        for row in store.registry.reconcile(store, args.video_ids or None):
+            print(f"{row['video_id']:<14} {row['status']:<9} registered {row['registered']}, stored {row['stored']}")
+
+
+if __name__ == "__main__":
+    main()
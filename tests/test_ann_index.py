@@ -0,0 +1,150 @@
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.ann_index import AnnIndex
+from src.chunk_batch import ChunkBatch
+from src.local_vector_store import LocalVectorStore
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+def make_batch(video_id: str, count: int, rng, dimension: int = 64) -> ChunkBatch:
+    starts = np.arange(count) * 25.0
+    texts = [f"chunk {i} of {video_id}" for i in range(count)]
+    return ChunkBatch.from_texts(video_id, starts, starts + 30, texts).with_embeddings(
+        rng.normal(size=(count, dimension)))
+
+
+def exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.argsort(-(normalized @ query))[:k]
+
+
+def main():
+    """Test ANN inserts, updates, deletes, filters and persistence against exact search."""
+    rng = np.random.default_rng(0)
+    batches = [make_batch(f"video{v:03d}", 100, rng) for v in range(40)]
+    vectors = np.concatenate([b.embeddings for b in batches])
+    ids = [chunk_id for b in batches for chunk_id in b.ids()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "library")
+        index = AnnIndex(path, dimension=64, initial_capacity=500)  # grows while inserting
+        for batch in batches:
+            index.add_chunk_batch(batch)
+        assert len(index) == 4000
+
+        queries = rng.normal(size=(50, 64)).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+        hits = 0
+        for query in queries:
+            found = [r['id'] for r in index.search(query, top_k=10)]
+            hits += len(set(found) & {ids[i] for i in exact_top_k(vectors, query, 10)})
+        recall = hits / (10 * len(queries))
+        print(f"\nrecall@10 over {len(index)} chunks: {recall:.3f}")
+        assert recall > 0.9
+
+        # A single-video filter is exact; time filters combine with it
+        results = index.search(queries[0], top_k=5, filter={"video_id": "video007"})
+        assert [r['text'] for r in results] == \
+            [batches[7].text_at(i) for i in exact_top_k(batches[7].embeddings, queries[0], 5)]
+        results = index.search(queries[0], top_k=100, filter={
+            "video_id": {"$in": ["video001", "video002"]}, "start_time": {"$gte": 500, "$lt": 1000}})
+        assert len(results) == 40
+        assert all(500 <= r['start_time'] < 1000 and r['video_id'] in ("video001", "video002") for r in results)
+
+        # Updates keep one entry per id; deletes remove chunks from every kind of search
+        index.add([ids[0]], queries[:1], [batches[0].metadata_at(0)])
+        results = index.search(queries[0], top_k=3)
+        assert results[0]['id'] == ids[0] and abs(results[0]['score'] - 1.0) < 1e-4
+        assert len({r['id'] for r in results}) == 3
+        assert index.delete([ids[0]]) == 1
+        assert ids[0] not in [r['id'] for r in index.search(queries[0], top_k=10)]
+        assert index.delete_video("video003") == 100
+        assert index.search(queries[1], top_k=5, filter={"video_id": "video003"}) == []
+        assert all(r['video_id'] != "video003" for r in index.search(queries[1], top_k=50))
+
+        # New chunks reuse deleted slots without growing the graph
+        capacity = index.index.get_max_elements()
+        index.add_chunk_batch(make_batch("video100", 100, rng))
+        assert len(index) == 3999 and index.index.get_max_elements() == capacity
+        index.close()
+
+        reopened = AnnIndex(path)
+        assert len(reopened) == 3999 and reopened.dimension == 64
+        assert reopened.search(queries[2], top_k=5, filter={"video_id": "video100"})[0]['video_id'] == "video100"
+        reopened.close()
+
+        # LocalVectorStore keeps the library index in step with the per-video files
+        store = LocalVectorStore(os.path.join(tmp, "store"), library_index=True)
+        for batch in batches[:5]:
+            store.index_video_chunks(batch, batch.video_id)
+        store.delete_video("video004")
+        found = store.search_library(queries[3], top_k=20)
+        assert len(found) == 20 and all(r['video_id'] != "video004" for r in found)
+
+        # Completed videos are persisted without close(), as in the app
+        store.index_video_chunks(batches[5].slice(0, 50), batches[5].video_id, complete=False)
+        store.index_video_chunks(batches[5].slice(50, 100), batches[5].video_id, complete=False)
+        store.complete_video(batches[5].video_id)
+        reopened = LocalVectorStore(os.path.join(tmp, "store"), library_index=True)
+        found = reopened.search_library(queries[3], top_k=500)
+        assert len(found) == 500 and {r['video_id'] for r in found} == {f"video{v:03d}" for v in (0, 1, 2, 3, 5)}
+        reopened.close()
+        store.close()
+
+        # Labels of deleted chunks stay in the graph, so new chunks after a reopen must not reuse them
+        path = os.path.join(tmp, "reopen")
+        small = rng.normal(size=(12, 8))
+        meta = [{"video_id": "v", "start_time": float(i), "end_time": float(i + 1), "text": f"x{i}",
+                 "youtube_url": ""} for i in range(12)]
+        with AnnIndex(path, dimension=8) as index:
+            index.add([f"x{i}" for i in range(7)], small[:7], meta[:7])
+            assert index.delete(["x4", "x5", "x6"]) == 3
+        with AnnIndex(path) as index:
+            index.add(["x7"], small[7:8], meta[7:8])
+            assert index.delete(["x7"]) == 1
+            index.add([f"x{i}" for i in range(8, 12)], small[8:], meta[8:])
+            assert index.delete(["x8", "x10"]) == 2
+            assert sorted(r["id"] for r in index.search(small[0], top_k=10)) == sorted(["x0", "x1", "x2", "x3", "x9", "x11"])
+
+        # Random adds, deletes and reopens keep the index consistent with a dict of live chunks
+        path = os.path.join(tmp, "fuzz")
+        live = {}
+        index = AnnIndex(path, dimension=8)
+        for step in range(300):
+            action = rng.random()
+            if action < 0.1:
+                index.close()
+                index = AnnIndex(path)
+            elif action < 0.55 or not live:
+                new_ids = [f"f{int(i)}" for i in rng.integers(0, 60, size=int(rng.integers(1, 6)))]
+                new_ids = list(dict.fromkeys(new_ids))
+                new_vectors = rng.normal(size=(len(new_ids), 8))
+                index.add(new_ids, new_vectors, [dict(meta[0], text=chunk_id) for chunk_id in new_ids])
+                live.update(zip(new_ids, new_vectors))
+            else:
+                gone = list(rng.choice(sorted(live), size=min(len(live), int(rng.integers(1, 4))), replace=False))
+                assert index.delete(gone + ["never-added"]) == len(gone)
+                for chunk_id in gone:
+                    del live[chunk_id]
+            assert len(index) == len(live)
+        for chunk_id, vector in list(live.items())[:10]:
+            assert index.search(vector, top_k=1, filter={"video_id": "v"})[0]["id"] == chunk_id
+        index.close()
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
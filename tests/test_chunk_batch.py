@@ -0,0 +1,78 @@
+import logging
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_batch import ChunkBatch
+from src.chunk_processor import ChunkProcessor, ChunkConfig
+from src.local_vector_store import LocalVectorStore
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+def main():
+    """Test that ChunkBatch holds the same chunks as create_chunks in far less memory."""
+    processor = ChunkProcessor.__new__(ChunkProcessor)
+    processor.config = ChunkConfig()
+    segments = [{'start': i * 2.37, 'end': i * 2.37 + 2, 'text': f"this is sentence number {i}"}
+                for i in range(30000)]
+
+    chunks = processor.create_chunks(segments, "video")
+    batch = processor.create_chunk_batch(segments, "video")
+    assert batch.to_chunks() == chunks
+    assert ChunkBatch.from_chunks(chunks, "video").to_chunks() == chunks
+
+    embeddings = np.random.default_rng(0).random((len(chunks), 384), dtype=np.float32)
+
+    tracemalloc.start()
+    as_dicts = processor.create_chunks(segments, "video")
+    for chunk, row in zip(as_dicts, embeddings):
+        chunk['values'] = row.tolist()
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del as_dicts
+
+    tracemalloc.start()
+    batch = processor.create_chunk_batch(segments, "video").with_embeddings(embeddings.copy())
+    batch_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"\n{len(chunks)} embedded chunks: {dict_bytes / 1e6:.1f} MB as dicts, "
+          f"{batch_bytes / 1e6:.1f} MB as a ChunkBatch")
+    assert batch_bytes * 3 < dict_bytes
+
+    # Slices share memory and build payloads only on demand
+    part = batch.slice(10, 30)
+    assert np.shares_memory(part.embeddings, batch.embeddings)
+    payloads = list(part.upsert_payloads())
+    assert [p['id'] for p in payloads] == [c['id'] for c in chunks[10:30]]
+    assert payloads[0]['metadata'] == chunks[10]['metadata']
+    assert len(payloads[0]['values']) == 384
+
+    # Chunks starting within the same second keep distinct ids, and link to that whole second
+    processor.config = ChunkConfig(chunk_size=0.3, overlap=0)
+    close = [{'start': 12.2, 'end': 12.6, 'text': "first"}, {'start': 12.7, 'end': 13.4, 'text': "second"}]
+    batch = processor.create_chunk_batch(close, "video")
+    assert batch.ids() == ["video_000012200", "video_000012700"]
+    assert [c['id'] for c in processor.create_chunks(close, "video")] == batch.ids()
+    assert [c['id'] for c in processor.iter_chunks(iter(close), "video")] == batch.ids()
+    assert ChunkBatch.from_chunks(batch.to_chunks(), "video").ids() == batch.ids()
+    assert [m['youtube_url'][-5:] for m in map(batch.metadata_at, range(2))] == ["&t=12", "&t=12"]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVectorStore(tmp, dimension=4)
+        store.index_video_chunks(batch.with_embeddings(np.eye(2, 4)), "video")
+        assert len(store._load("video")[1]) == 2
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,7 +21,8 @@ def main():
         config = ChunkConfig(
             chunk_size=30,  # 30 seconds chunks
             overlap=5,  # 5 seconds overlap
-            embedding_type=EmbeddingType.HUGGINGFACE
+            embedding_type=EmbeddingType.HUGGINGFACE,
+            embedding_cache_path=None
         )
         processor = ChunkProcessor(config)
 
@@ -0,0 +1,120 @@
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_processor import ChunkConfig, ChunkProcessor
+from src.transcript_format import Transcript, write_transcript
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+def reference_chunks(segments, chunk_size, overlap):
+    """The original per-segment chunking loop, with the guard that the next chunk starts on a later segment."""
+    chunks = []
+    i = 0
+    while i < len(segments):
+        first = i
+        chunk_texts = []
+        chunk_start = segments[i]['start']
+        current_time = chunk_start
+        while i < len(segments) and (current_time - chunk_start) < chunk_size:
+            chunk_texts.append(segments[i]['text'])
+            current_time = segments[i + 1]['start'] if i < len(segments) - 1 else segments[i]['end']
+            i += 1
+        chunk_end = min(chunk_start + chunk_size, current_time)
+        chunks.append((chunk_start, chunk_end, " ".join(chunk_texts)))
+        while i > first + 1 and segments[i - 1]['start'] > (chunk_end - overlap):
+            i -= 1
+    return chunks
+
+
+def random_segments(rng, n):
+    """Sorted segments with random gaps, including zero gaps (several segments starting at once)."""
+    gaps = rng.choice([0.0, 0.5, 1.0, 2.5, 4.0, 7.0, 12.0, 40.0], size=n)
+    if rng.random() < 0.3:
+        gaps = np.round(rng.exponential(4.0, size=n), 2)
+    starts = np.cumsum(gaps) - gaps[0]
+    ends = starts + rng.choice([0.0, 1.0, 3.0, 5.0], size=n)
+    return [{'start': float(s), 'end': float(e), 'text': f"s{i}"} for i, (s, e) in enumerate(zip(starts, ends))]
+
+
+def as_tuples(processor, segments):
+    """(start, end, text) of each chunk from create_chunk_batch and from create_chunks (times rounded to 0.01s)."""
+    batch = processor.create_chunk_batch(segments, "video")
+    from_batch = [(float(batch.starts[i]), float(batch.ends[i]), batch.text_at(i)) for i in range(len(batch))]
+    from_dicts = [(c['metadata']['start_time'], c['metadata']['end_time'], c['metadata']['text'])
+                  for c in processor.create_chunks(segments, "video")]
+    return from_batch, from_dicts
+
+
+def rounded(chunks):
+    return [(round(start, 2), round(end, 2), text) for start, end, text in chunks]
+
+
+def main():
+    """Test that searchsorted chunk boundaries match the per-segment loop."""
+    rng = np.random.default_rng(0)
+    settings = [(30, 5), (30, 0), (10, 3), (60, 15), (5, 5), (1, 0)]
+    processors = {
+        (size, overlap): ChunkProcessor(ChunkConfig(chunk_size=size, overlap=overlap, embedding_cache_path=None))
+        for size, overlap in settings
+    }
+
+    mismatches = 0
+    cases = 0
+    for _ in range(5000):
+        segments = random_segments(rng, int(rng.integers(1, 60)))
+        size, overlap = settings[int(rng.integers(len(settings)))]
+        expected = reference_chunks(segments, size, overlap)
+        from_batch, from_dicts = as_tuples(processors[(size, overlap)], segments)
+        cases += 1
+        streamed = [(c['metadata']['start_time'], c['metadata']['end_time'], c['metadata']['text'])
+                    for c in processors[(size, overlap)].iter_chunks(iter(segments), "video")]
+        mismatches += from_batch != expected or from_dicts != rounded(expected) or streamed != rounded(expected)
+    print(f"\n{mismatches} mismatches in {cases} random segment lists")
+    assert mismatches == 0
+
+    # Binary transcripts are chunked from their arrays the same way
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transcript.vrt")
+        for size, overlap in settings:
+            segments = random_segments(rng, 200)
+            write_transcript(path, segments)
+            with Transcript(path) as transcript:
+                batch = processors[(size, overlap)].create_chunk_batch(transcript, "video")
+                from_arrays = [(float(batch.starts[i]), float(batch.ends[i]), batch.text_at(i))
+                               for i in range(len(batch))]
+            assert from_arrays == reference_chunks(segments, size, overlap)
+
+    processor = processors[(30, 5)]
+
+    # Single segment: one chunk ending at the segment's end
+    single = [{'start': 12.0, 'end': 17.5, 'text': "only"}]
+    assert as_tuples(processor, single) == ([(12.0, 17.5, "only")],) * 2
+    assert reference_chunks(single, 30, 5) == [(12.0, 17.5, "only")]
+
+    # Zero gaps: segments sharing a start time still make progress and match the loop
+    same_start = [{'start': 0.0, 'end': 0.0, 'text': f"s{i}"} for i in range(5)]
+    assert as_tuples(processor, same_start) == (reference_chunks(same_start, 30, 5),) * 2
+    bursts = [{'start': float(t), 'end': float(t), 'text': f"s{i}"}
+              for i, t in enumerate([0, 0, 0, 30, 30, 30, 31, 60, 60])]
+    assert as_tuples(processor, bursts) == (reference_chunks(bursts, 30, 5),) * 2
+
+    # No segments, no chunks
+    assert len(processor.create_chunk_batch([], "video")) == 0
+    assert processor.create_chunks([], "video") == []
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
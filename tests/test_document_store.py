@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_batch import ChunkBatch
+from src.document_store import DocumentStore
+from src.upsert import UpsertConfig
+from src.vector_store import PineconeManager
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+class RecordingIndex:
+    """Stands in for a Pinecone index; records request and response sizes."""
+
+    def __init__(self):
+        self.vectors = {}
+        self.upserted_bytes = 0
+        self.response_bytes = 0
+        self.fetches = 0
+
+    def upsert(self, vectors):
+        self.upserted_bytes += len(json.dumps(vectors))
+        self.vectors.update((v['id'], v) for v in vectors)
+
+    def query(self, vector, filter, top_k, include_metadata=False, **_):
+        scored = sorted(
+            (v for v in self.vectors.values() if v['metadata']['video_id'] == filter['video_id']),
+            key=lambda v: -float(np.dot(v['values'], vector)))[:top_k]
+        matches = [{'id': v['id'], 'score': float(np.dot(v['values'], vector)),
+                    **({'metadata': v['metadata']} if include_metadata else {})} for v in scored]
+        self.response_bytes += len(json.dumps(matches))
+        return {'matches': matches}
+
+    def fetch(self, ids):
+        self.fetches += 1
+        return {'vectors': {i: self.vectors[i] for i in ids if i in self.vectors}}
+
+
+def make_manager(document_store=None) -> PineconeManager:
+    manager = PineconeManager.__new__(PineconeManager)
+    manager.logger = logging.getLogger('PineconeManager')
+    manager.dimension = 384
+    manager.index = RecordingIndex()
+    manager.registry = None
+    manager.document_store = document_store
+    manager.lexical_index = None
+    manager.upsert_config = UpsertConfig()
+    return manager
+
+
+def make_batch(video_id: str, count: int) -> ChunkBatch:
+    rng = np.random.default_rng(0)
+    starts = np.arange(count) * 25.5
+    words = ["neural", "network", "gradient", "the", "a", "model", "training", "loss", "we", "see"]
+    texts = [" ".join(rng.choice(words, size=90)) for _ in range(count)]
+    return ChunkBatch.from_texts(video_id, starts, starts + 30, texts).with_embeddings(
+        rng.normal(size=(count, 384)).astype(np.float32))
+
+
+def main():
+    """Test that chunk texts live in the document store and search results are hydrated from it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        batch = make_batch("video", 200)
+        queries = make_batch("video", 20).embeddings.tolist()
+
+        full = make_manager()
+        full.index_video_chunks(batch, "video")
+        store = DocumentStore(os.path.join(tmp, "documents.db"))
+        slim = make_manager(store)
+        slim.index_video_chunks(batch, "video")
+
+        # Vectors only carry the filter fields
+        assert set(next(iter(slim.index.vectors.values()))['metadata']) == {"video_id", "start_time", "end_time"}
+
+        # Identical results, hydrated from the store
+        for query in queries:
+            assert slim.search_video(query, "video", top_k=5) == full.search_video(query, "video", top_k=5)
+        assert slim.index.fetches == 0
+
+        upsert_saving = 1 - slim.index.upserted_bytes / full.index.upserted_bytes
+        response_saving = 1 - slim.index.response_bytes / full.index.response_bytes
+        stats = store.stats()
+        print(f"\nUpsert payload {upsert_saving:.0%} smaller, query responses {response_saving:.0%} smaller, "
+              f"texts stored at {stats['compressed_bytes'] / len(batch.text):.0%} of their size")
+        assert response_saving > 0.8 and upsert_saving > 0.05
+        assert stats['documents'] == len(batch) and stats['compressed_bytes'] < len(batch.text)
+
+        # Random access by id, including chunks from the list-of-dicts path
+        chunks = make_batch("other", 5).to_chunks()
+        slim.index_video_chunks(chunks, "other")
+        documents = store.get_many([chunks[3]['id'], batch.id_at(7), "missing_000001"])
+        assert documents[chunks[3]['id']] == chunks[3]['metadata']
+        assert documents[batch.id_at(7)] == batch.metadata_at(7)
+        assert "missing_000001" not in documents
+
+        # Vectors indexed with full metadata (before the store) are fetched once and copied in
+        legacy = make_manager(DocumentStore(os.path.join(tmp, "legacy.db")))
+        legacy.index = full.index
+        expected = full.search_video(queries[0], "video", top_k=3)
+        assert legacy.search_video(queries[0], "video", top_k=3) == expected
+        assert legacy.search_video(queries[0], "video", top_k=3) == expected
+        assert legacy.index.fetches == 1
+
+        # A process without the document store the vectors were indexed with leaves their chunks out
+        elsewhere = make_manager(DocumentStore(os.path.join(tmp, "elsewhere.db")))
+        elsewhere.index = slim.index
+        assert elsewhere.search_video(queries[0], "video", top_k=3) == []
+        assert elsewhere.chunk_at("video", 40.0) is None
+        assert slim.chunk_at("video", 40.0)["id"] == batch.id_at(1)
+
+        store.delete_video("other")
+        assert store.stats()['documents'] == len(batch)
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
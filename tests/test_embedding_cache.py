@@ -0,0 +1,75 @@
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_processor import ChunkProcessor, ChunkConfig, EmbeddingType
+from src.embedding_cache import EmbeddingCache
+from src.embeddings import LocalEmbeddingClient
+from src.utils import load_config
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+def make_chunks(segments, chunk_size, overlap):
+    processor = ChunkProcessor.__new__(ChunkProcessor)
+    processor.config = ChunkConfig(chunk_size=chunk_size, overlap=overlap)
+    return processor.create_chunks(segments, "video")
+
+
+def main():
+    """Test that re-embedding only pays for texts that were never embedded before."""
+    segments = [{'start': i * 5, 'end': i * 5 + 5, 'text': f"sentence {i}"} for i in range(200)]
+
+    # The cache file is configured in config/config.yaml
+    assert ChunkConfig().embedding_cache_path == load_config()["vector_store"]["embedding_cache_path"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "embeddings.db")
+        client = LocalEmbeddingClient(dimension=32)
+        config = ChunkConfig(embedding_type=EmbeddingType.OPENAI, embedding_cache_path=db_path)
+
+        processor = ChunkProcessor(config, embedding_client=client)
+        first = processor.generate_embeddings(make_chunks(segments, 30, 5))
+        requests = client.requests
+
+        # Same chunks again: everything comes from the cache, with identical vectors
+        again = processor.generate_embeddings(make_chunks(segments, 30, 5))
+        assert client.requests == requests
+        assert [c['values'] for c in again] == [c['values'] for c in first]
+        stats = processor.embedding_cache.stats()
+        print(f"\nCache stats after re-embedding: {stats}")
+        assert stats['hits'] == len(first)
+
+        # A different chunking only embeds the texts it has never seen
+        processor.embedding_cache.close()
+        processor = ChunkProcessor(config, embedding_client=client)
+        rechunked = make_chunks(segments, 30, 10)
+        seen = {c['metadata']['text'] for c in first}
+        processor.generate_embeddings(rechunked)
+        stats = processor.embedding_cache.stats()
+        assert stats['misses'] == len({c['metadata']['text'] for c in rechunked} - seen)
+        processor.embedding_cache.close()
+
+        # Least recently used vectors are evicted past the size budget
+        cache = EmbeddingCache(os.path.join(tmp, "small.db"), max_bytes=100 * 32 * 4)
+        texts = [f"text {i}" for i in range(150)]
+        cache.put_many("model", texts[:100], [[float(i)] * 32 for i in range(100)])
+        cache.get_many("model", texts[:10])
+        cache.put_many("model", texts[100:], [[float(i)] * 32 for i in range(50)])
+        assert all(v is not None for v in cache.get_many("model", texts[:10]))
+        assert cache.stats()['bytes'] <= cache.max_bytes
+        assert cache.stats()['evictions'] > 0
+        cache.close()
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
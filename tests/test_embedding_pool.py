@@ -0,0 +1,59 @@
+import logging
+import sys
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src import model_registry
+from src.chunk_processor import ChunkConfig, ChunkProcessor, EmbeddingType
+from src.embedding_pool import EmbeddingPool, local_encoder
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+def main():
+    """Test that the process pool returns the same vectors, in input order, as encoding in-process."""
+    texts = [" ".join(f"word{j}" for j in range(i % 50 + 1)) + f" text{i}" for i in range(500)]
+    expected = np.asarray(local_encoder(32)(texts), dtype=np.float32)
+
+    with EmbeddingPool(partial(local_encoder, 32), processes=2, batch_size=16) as pool:
+        assert pool.dimension == 32
+        vectors = pool.encode(texts)
+        assert pool.encode([]).shape == (0, 32)
+
+    assert vectors.dtype == np.float32 and vectors.flags['C_CONTIGUOUS']
+    assert np.array_equal(vectors, expected), "pooled vectors differ from in-process vectors"
+
+    # ONNX workers load the model from the configured onnx_model_dir
+    loaded = []
+
+    class FakeOnnxEmbedder:
+        def encode(self, texts, batch_size=64):
+            return np.zeros((len(texts), 4), dtype=np.float32)
+
+    def fake_get_onnx_embedder(model_name, model_dir="models/onnx"):
+        loaded.append(model_dir)
+        return FakeOnnxEmbedder()
+
+    get_onnx_embedder = model_registry.get_onnx_embedder
+    model_registry.get_onnx_embedder = fake_get_onnx_embedder
+    try:
+        processor = ChunkProcessor(ChunkConfig(embedding_type=EmbeddingType.ONNX, onnx_model_dir="custom/onnx",
+                                               embedding_processes=1, embedding_cache_path=None))
+        # Build a worker's encoder in this process, without starting the pool
+        processor.embedding_pool.encoder_factory()(["text"])
+        assert loaded == ["custom/onnx"]
+    finally:
+        model_registry.get_onnx_embedder = get_onnx_embedder
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
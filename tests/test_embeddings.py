@@ -0,0 +1,70 @@
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_processor import ChunkProcessor, ChunkConfig, EmbeddingType
+from src.embeddings import (BatchedEmbedder, EmbeddingBatchConfig, EmbeddingClient, LocalEmbeddingClient,
+                            batch_by_tokens, estimate_tokens)
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+def main():
+    """Test batched, concurrent embeddings against the local stand-in for the OpenAI API."""
+    logger = logging.getLogger('TestEmbeddings')
+    texts = [f"chunk {i} talks about topic {i % 7} for thirty seconds" for i in range(400)]
+
+    # One request per text, the old behaviour
+    client = LocalEmbeddingClient(latency=0.01)
+    started = time.perf_counter()
+    expected = [client.embed([text])[0] for text in texts]
+    sequential = time.perf_counter() - started
+
+    # Small batches plus rate limits, so ordering and retries are exercised
+    client = LocalEmbeddingClient(latency=0.01, rate_limit_every=5)
+    embedder = BatchedEmbedder(client, EmbeddingBatchConfig(
+        max_batch_tokens=200, max_in_flight=4, initial_backoff=0.01
+    ))
+    started = time.perf_counter()
+    vectors = embedder.embed(texts)
+    batched = time.perf_counter() - started
+
+    assert vectors == expected, "Embeddings were not returned in input order"
+    logger.info(f"{len(texts)} texts: {sequential:.2f}s one by one, {batched:.2f}s batched "
+                f"({client.requests} requests)")
+    assert batched < sequential / 5
+
+    # ChunkProcessor uses the batched path for the OpenAI embedding type
+    processor = ChunkProcessor(ChunkConfig(embedding_type=EmbeddingType.OPENAI, embedding_cache_path=None),
+                               embedding_client=LocalEmbeddingClient(dimension=8))
+    chunks = processor.generate_embeddings([{'metadata': {'text': text}} for text in texts[:3]])
+    assert all(len(chunk['values']) == 8 for chunk in chunks)
+
+    # Non-Latin text is not undercounted, so its batches stay under the token limit
+    cjk = "機械学習モデルは大量のデータから学習します。" * 10
+    assert estimate_tokens(cjk) >= len(cjk)
+    batches = batch_by_tokens([cjk] * 20, max_tokens=2000, max_size=100)
+    assert all(sum(estimate_tokens(cjk) for _ in batch) <= 2000 for batch in batches)
+    assert len(batches) >= 20 * len(cjk) // 2000
+
+    # A client without embed fails when it is created
+    class IncompleteClient(EmbeddingClient):
+        pass
+
+    try:
+        IncompleteClient()
+        raise AssertionError("embedding clients must implement embed")
+    except TypeError:
+        pass
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
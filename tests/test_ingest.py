@@ -0,0 +1,98 @@
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_batch import ChunkBatch
+from src.ingest import BulkIngestor, IngestConfig
+from src.query_cache import QueryCache, QueryCacheConfig
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+TRANSCRIPT = str(Path(__file__).parent / "transcripts" /
+                 "How to Summarize a YouTube Video with ChatGPT_ _2024__20241119_040633.txt")
+
+
+class FakeVideoProcessor:
+    cache = None
+
+    def __init__(self):
+        self.transcribed = []
+
+    def process_video(self, url):
+        self.transcribed.append(url)
+        return {}, {}, TRANSCRIPT
+
+
+class FakeChunkProcessor:
+    def chunk_batch_file(self, path, video_id):
+        assert path is not None, "chunking needs a transcript path"
+        return ChunkBatch.from_texts(video_id, [0.0], [5.0], [path])
+
+    def embed_chunk_batch(self, batch):
+        return batch.with_embeddings(np.zeros((len(batch), 1)))
+
+
+class FlakyVectorStore:
+    """Fails to index the given videos once, like a crash halfway through a backfill."""
+
+    def __init__(self, fail_once):
+        self.fail_once = set(fail_once)
+        self.indexed = {}
+
+    def check_video_exists(self, video_id):
+        return video_id in self.indexed
+
+    def index_video_chunks(self, chunks, video_id):
+        if video_id in self.fail_once:
+            self.fail_once.discard(video_id)
+            raise RuntimeError("index unavailable")
+        self.indexed[video_id] = chunks
+
+
+def main():
+    """Test bulk ingestion and resuming from checkpoints with local fakes."""
+    video_ids = [f"video{i:06d}" for i in range(20)]
+    urls = [f"https://youtu.be/{video_id}" for video_id in video_ids]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url_list = os.path.join(tmp, "urls.txt")
+        with open(url_list, 'w') as f:
+            f.write("\n".join(urls + urls[:3]))  # duplicates are ignored
+
+        config = IngestConfig(job_db=os.path.join(tmp, "jobs.db"), max_in_flight=4)
+        video_processor = FakeVideoProcessor()
+        vector_store = FlakyVectorStore(fail_once=video_ids[:5])
+
+        counts = BulkIngestor(video_processor, FakeChunkProcessor(), vector_store, config).run([url_list])
+        print(f"First run: {counts}")
+        assert counts == {'indexed': 15, 'transcribed': 5}
+        assert len(video_processor.transcribed) == 20
+
+        # The rerun resumes the failed jobs from their transcripts instead of re-transcribing
+        query_cache = QueryCache(QueryCacheConfig())
+        query_cache.put_results(video_ids[0], "q", [{"id": "stale"}])
+        counts = BulkIngestor(video_processor, FakeChunkProcessor(), vector_store, config,
+                              query_cache=query_cache).run([url_list])
+        print(f"Second run: {counts}")
+        assert counts == {'indexed': 20}
+        assert len(video_processor.transcribed) == 20
+        assert sorted(vector_store.indexed) == video_ids
+        # Resumed jobs chunked the transcript recorded in their checkpoint
+        assert all(vector_store.indexed[video_id].texts() == [TRANSCRIPT] for video_id in video_ids[:5])
+        # Results cached before the video was indexed are dropped
+        assert query_cache.get_results(video_ids[0], "q") is None
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
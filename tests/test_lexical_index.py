@@ -0,0 +1,146 @@
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_batch import ChunkBatch
+from src.lexical_index import BM25Index, LexicalIndex, hybrid_search, reciprocal_rank_fusion
+from src.local_vector_store import LocalVectorStore
+from src.rag_engine import RAGEngine
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+WORDS = ["so", "the", "model", "learns", "from", "data", "and", "then", "we", "look", "at", "results"]
+
+
+def make_batch(video_id: str, count: int) -> ChunkBatch:
+    rng = np.random.default_rng(0)
+    starts = np.arange(count) * 25.0
+    texts = [" ".join(rng.choice(WORDS, size=60)) for _ in range(count)]
+    texts[123] += " the GPT-4 model scored 1729 points"
+    texts[200] += " we compare GPT-4 with others"
+    return ChunkBatch.from_texts(video_id, starts, starts + 30, texts).with_embeddings(
+        rng.normal(size=(count, 64)))
+
+
+class CountingLexicalIndex(LexicalIndex):
+    """Counts index builds."""
+
+    builds = 0
+
+    def _build(self, video_id, removed=()):
+        self.builds += 1
+        super()._build(video_id, removed)
+
+
+class SlowDenseEngine(RAGEngine):
+    """Embeds queries as random vectors, slowly, like a model call followed by a remote query."""
+
+    def generate_query_embedding(self, query):
+        time.sleep(0.05)
+        return np.random.default_rng(len(query)).normal(size=64).tolist()
+
+
+def main():
+    """Test the BM25 index and its fusion with dense retrieval."""
+    batch = make_batch("video", 400)
+
+    # Exact terms rank the chunks that contain them first
+    index = BM25Index(batch)
+    results = index.search("gpt-4 1729", top_k=5)
+    assert [r["id"] for r in results[:2]] == [batch.id_at(123), batch.id_at(200)]
+    assert results[0]["text"] == batch.text_at(123) and results[0]["start_time"] == 123 * 25.0
+    assert index.search("nonexistent") == []
+    assert index.positions.dtype == np.uint16 and index.frequencies.dtype == np.uint16
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Round trip through the compressed file
+        index.save(os.path.join(tmp, "index.npz"))
+        loaded = BM25Index.load(os.path.join(tmp, "index.npz"))
+        assert loaded.search("gpt-4 1729", top_k=5) == results
+        size = os.path.getsize(os.path.join(tmp, "index.npz"))
+        print(f"\nBM25 index of {len(batch)} chunks: {size / 1e3:.0f} KB on disk "
+              f"({len(batch.text) / 1e3:.0f} KB of text)")
+
+        # The store keeps the index in step with its chunks
+        store = LocalVectorStore(os.path.join(tmp, "store"), lexical_index=LexicalIndex(os.path.join(tmp, "lex")))
+        store.index_video_chunks(batch.slice(0, 150), "video", complete=False)
+        store.index_video_chunks(batch.slice(150, 400), "video")
+        assert sorted(r["id"] for r in store.lexical_index.search("gpt-4", "video")) == [batch.id_at(123),
+                                                                                      batch.id_at(200)]
+        store.delete_chunks("video", [batch.id_at(123)])
+        assert [r["id"] for r in store.lexical_index.search("gpt-4", "video")] == [batch.id_at(200)]
+        store.index_video_chunks(batch.slice(123, 124), "video")
+        assert len(store.lexical_index.get("video")) == 400
+
+        # A video streamed in small batches is built once, when it completes
+        streamed = CountingLexicalIndex(os.path.join(tmp, "streamed"))
+        started = time.perf_counter()
+        for start in range(0, 400, 16):
+            streamed.index_video_chunks(batch.slice(start, start + 16), "video", complete=False)
+            assert streamed.get("video") is None and streamed.builds == 0
+        streamed.complete_video("video")
+        print(f"Streamed 400 chunks in 16-chunk batches: {streamed.builds} build, "
+              f"{(time.perf_counter() - started) * 1000:.0f} ms")
+        assert streamed.builds == 1 and len(streamed.get("video")) == 400
+        assert streamed.search("gpt-4 1729", "video", top_k=5) == results
+
+        # Pending batches replace earlier chunks with the same id, and deletions apply to them
+        streamed.index_video_chunks(batch.slice(0, 10), "video", complete=False)
+        streamed.index_video_chunks(batch.slice(5, 15), "video", complete=False)
+        streamed.delete_chunks("video", [batch.id_at(200)])
+        streamed.complete_video("video")
+        assert streamed.builds == 2 and len(streamed.get("video")) == 399
+        assert [r["id"] for r in streamed.search("gpt-4", "video")] == [batch.id_at(123)]
+        streamed.index_video_chunks(batch.slice(0, 16), "other", complete=False)
+        streamed.delete_video("other")
+        streamed.complete_video("other")
+        assert streamed.get("other") is None and streamed.builds == 2
+
+        # Stores build the lexical index in complete_video
+        streamed_store = LocalVectorStore(os.path.join(tmp, "streamed_store"), lexical_index=streamed)
+        for start in range(0, 400, 16):
+            streamed_store.index_video_chunks(batch.slice(start, start + 16), "store_video", complete=False)
+        streamed_store.complete_video("store_video")
+        assert streamed.builds == 3 and len(streamed.get("store_video")) == 400
+
+        # Fusion ranks results found by both retrievers first
+        fused = reciprocal_rank_fusion([[{"id": "a"}, {"id": "b"}, {"id": "c"}], [{"id": "c"}, {"id": "d"}]])
+        assert [r["id"] for r in fused] == ["c", "a", "b", "d"]
+
+        # Both lookups run concurrently: latency is the slower one, not the sum
+        def slow(results):
+            def lookup():
+                time.sleep(0.1)
+                return results
+            return lookup
+        started = time.perf_counter()
+        hybrid_search(slow([{"id": "a"}]), slow([{"id": "b"}]), top_k=2)
+        assert time.perf_counter() - started < 0.18
+
+        # Hybrid chat retrieval finds the exact term the random dense ranking misses
+        os.environ.setdefault("OPENAI_API_KEY", "unused")
+        engine = SlowDenseEngine("https://youtu.be/video", vector_store=store)
+        engine.video_id = "video"
+        chunks = engine.get_relevant_chunks("did GPT-4 get 1729 points", top_k=3)
+        assert batch.text_at(123) in [c["text"] for c in chunks]
+        dense_only = SlowDenseEngine("https://youtu.be/video", vector_store=store, hybrid=False)
+        dense_only.video_id = "video"
+        assert batch.text_at(123) not in [c["text"] for c in dense_only.get_relevant_chunks("did GPT-4 get 1729 points")]
+        store.delete_video("video")
+        assert store.lexical_index.get("video") is None
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_batch import ChunkBatch
+from src.local_vector_store import LocalVectorStore
+from src.vector_store import create_vector_store
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+def make_batch(video_id: str, count: int, dimension: int = 384, seed: int = 0) -> ChunkBatch:
+    rng = np.random.default_rng(seed)
+    starts = np.arange(count) * 25.0
+    texts = [f"chunk {i} of {video_id}" for i in range(count)]
+    return ChunkBatch.from_texts(video_id, starts, starts + 30, texts).with_embeddings(
+        rng.normal(size=(count, dimension)))
+
+
+class CountingStore(LocalVectorStore):
+    """Counts rewrites of a video's files."""
+
+    writes = 0
+
+    def _replace(self, video_id, vectors, ids, metadata):
+        self.writes += 1
+        super()._replace(video_id, vectors, ids, metadata)
+
+
+def main():
+    """Test the local vector store against brute-force cosine search."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVectorStore(os.path.join(tmp, "store"), dimension=384)
+        batch = make_batch("video_a", 400)
+        assert not store.check_video_exists("video_a")
+        store.index_video_chunks(batch, "video_a")
+        store.index_video_chunks(make_batch("video_b", 50, seed=1).to_chunks(), "video_b")
+        assert store.check_video_exists("video_a") and store.check_video_exists("video_b")
+
+        # Same results as exact cosine similarity, restricted to the video
+        rng = np.random.default_rng(2)
+        normalized = batch.embeddings / np.linalg.norm(batch.embeddings, axis=1, keepdims=True)
+        for _ in range(20):
+            query = rng.normal(size=384)
+            results = store.search_video(query.tolist(), "video_a", top_k=5)
+            expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+            assert [r['text'] for r in results] == [batch.text_at(i) for i in expected]
+            assert results[0]['score'] >= results[-1]['score']
+        assert results[0]['youtube_url'].startswith("https://youtube.com/watch?v=video_a")
+        assert all("video_b" in r['text'] for r in store.search_video(query, "video_b", top_k=50))
+        assert store.search_video(query, "missing") == []
+
+        queries = rng.normal(size=(1000, 384)).astype(np.float32)
+        started = time.perf_counter()
+        for query in queries:
+            store.search_video(query, "video_a")
+        per_query = (time.perf_counter() - started) / len(queries) * 1e6
+        print(f"\nLocal search over {len(batch)} chunks: {per_query:.0f} µs per query")
+
+        # Upserts replace chunks by id; another store instance sees the new files
+        reader = LocalVectorStore(os.path.join(tmp, "store"))
+        reader.search_video(queries[0], "video_a")
+        updated = batch.slice(0, 10)
+        updated.embeddings = np.tile(queries[0], (10, 1))
+        store.index_video_chunks(updated, "video_a")
+        results = reader.search_video(queries[0], "video_a", top_k=10)
+        assert len(reader._load("video_a")[1]) == 400
+        assert sorted(r['text'] for r in results) == sorted(batch.text_at(i) for i in range(10))
+        assert abs(results[0]['score'] - 1.0) < 1e-5
+
+        try:
+            store.index_video_chunks(make_batch("video_c", 5, dimension=128), "video_c")
+            raise AssertionError("dimension mismatch was accepted")
+        except ValueError:
+            pass
+
+        store.delete_video("video_b")
+        assert not reader.check_video_exists("video_b")
+
+        # A video streamed in small batches is written once, when it completes
+        streamed = CountingStore(os.path.join(tmp, "streamed"), dimension=384)
+        started = time.perf_counter()
+        for start in range(0, 400, 16):
+            streamed.index_video_chunks(batch.slice(start, start + 16), "video_a", complete=False)
+            assert streamed.search_video(queries[0], "video_a") == [] and streamed.writes == 0
+        streamed.complete_video("video_a")
+        print(f"Streamed 400 chunks in 16-chunk batches: {streamed.writes} write, "
+              f"{(time.perf_counter() - started) * 1000:.0f} ms")
+        assert streamed.writes == 1 and streamed.list_video_chunk_ids("video_a") == batch.ids()
+        one_shot = LocalVectorStore(os.path.join(tmp, "one_shot"), dimension=384)
+        one_shot.index_video_chunks(batch, "video_a")
+        assert streamed.search_video(queries[1], "video_a", top_k=5) == one_shot.search_video(queries[1], "video_a",
+                                                                                             top_k=5)
+
+        # Re-upserted batches replace stored and pending chunks by id; deletions apply to pending batches
+        streamed.index_video_chunks(updated, "video_a", complete=False)
+        streamed.index_video_chunks(make_batch("video_a", 500).slice(400, 500), "video_a", complete=False)
+        streamed.delete_chunks("video_a", [batch.id_at(399)])
+        streamed.complete_video("video_a")
+        assert streamed.writes == 2 and streamed.count_video_chunks("video_a") == 499
+        assert sorted(r['text'] for r in streamed.search_video(queries[0], "video_a", top_k=10)) == sorted(updated.texts())
+        streamed.index_video_chunks(make_batch("video_d", 16), "video_d", complete=False)
+        streamed.delete_video("video_d")
+        streamed.complete_video("video_d")
+        assert not streamed.check_video_exists("video_d") and streamed.writes == 2
+
+        # The configured backend is picked by the factory
+        os.chdir(tmp)
+        assert isinstance(create_vector_store(backend="local"), LocalVectorStore)
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
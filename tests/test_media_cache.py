@@ -0,0 +1,87 @@
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.media_cache import MediaCache, settings_key
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+def fake_audio(tmp: str, name: str, size: int) -> str:
+    path = os.path.join(tmp, name)
+    with open(path, 'wb') as f:
+        f.write(b"\0" * size)
+    return path
+
+
+def fake_transcript(tmp: str, text: str) -> str:
+    path = os.path.join(tmp, f"{text}.txt")
+    with open(path, 'w') as f:
+        f.write(f"[00:00:00] {text}\n")
+    return path
+
+
+def main():
+    """Test media cache hits, transcript settings keys and LRU eviction."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = MediaCache(os.path.join(tmp, "cache"), max_bytes=10_000)
+
+        # Audio and transcripts are served after being put
+        assert cache.get_audio("a") is None
+        cached_audio = cache.put_audio("a", fake_audio(tmp, "a.mp3", 1000), {"title": "A"})
+        audio_path, info = cache.get_audio("a")
+        assert audio_path == cached_audio and info == {"title": "A"}
+        assert os.path.getsize(audio_path) == 1000
+
+        # Transcripts are kept per settings key
+        whisper, segmented = settings_key({"model": "whisper-1"}), settings_key({"model": "whisper-1", "segment": 600})
+        assert whisper == settings_key({"model": "whisper-1"}) and whisper != segmented
+        transcription = {"text": "hello", "segments": [{"start": 0.0, "end": 1.0, "text": "hello"}]}
+        cache.put_transcript("a", whisper, transcription, fake_transcript(tmp, "hello"), {"title": "A"})
+        cached = cache.get_transcript("a", whisper)
+        assert cached is not None and cached[0] == transcription and cached[1] == {"title": "A"}
+        with open(cached[2]) as f:
+            assert f.read() == "[00:00:00] hello\n"
+        assert cache.get_transcript("a", segmented) is None
+
+        # The least recently used videos are evicted once the cache is over budget
+        cache.put_audio("b", fake_audio(tmp, "b.mp3", 4000), {"title": "B"})
+        time.sleep(0.01)
+        cache.put_audio("c", fake_audio(tmp, "c.mp3", 4000), {"title": "C"})
+        time.sleep(0.01)
+        assert cache.get_audio("a") is not None  # now more recently used than b
+        time.sleep(0.01)
+        cache.put_audio("d", fake_audio(tmp, "d.mp3", 4000), {"title": "D"})
+        assert cache.get_audio("b") is None
+        assert all(cache.get_audio(video_id) is not None for video_id in "acd")
+        assert cache.size() <= cache.max_bytes
+
+        # A video pinned by a running job survives eviction, until its pin is released
+        with cache.pin("c"):
+            for video_id in "efg":
+                time.sleep(0.01)
+                cache.put_audio(video_id, fake_audio(tmp, f"{video_id}.mp3", 4000), {"title": video_id})
+            assert cache.get_audio("c") is not None
+        cache.put_audio("h", fake_audio(tmp, "h.mp3", 4000), {"title": "H"})
+        assert cache.get_audio("c") is None
+
+        # Pins left behind by a crashed job stop protecting the video after pin_timeout
+        stale = MediaCache(os.path.join(tmp, "cache"), max_bytes=10_000, pin_timeout=0.0)
+        with stale.pin("h"):
+            stale.put_audio("i", fake_audio(tmp, "i.mp3", 4000), {"title": "I"})
+            stale.put_audio("j", fake_audio(tmp, "j.mp3", 4000), {"title": "J"})
+            assert stale.get_audio("h") is None
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
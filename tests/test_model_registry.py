@@ -0,0 +1,50 @@
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.model_registry import ModelRegistry
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+def main():
+    """Test that concurrent users of a model share one lazily loaded instance."""
+    registry = ModelRegistry()
+    loads = []
+    lock = threading.Lock()
+
+    def loader(name):
+        def load():
+            with lock:
+                loads.append(name)
+            time.sleep(0.2)  # a slow model load
+            return object()
+        return load
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        started = time.perf_counter()
+        models = list(executor.map(
+            lambda i: registry.get(f"model-{i % 2}", loader(f"model-{i % 2}")), range(32)
+        ))
+        elapsed = time.perf_counter() - started
+
+    assert sorted(loads) == ["model-0", "model-1"], f"Expected one load per model, got {loads}"
+    assert len({id(m) for m in models}) == 2
+    # The two models load in parallel
+    assert elapsed < 0.35, f"Loads were serialized ({elapsed:.2f}s)"
+    assert registry.get("model-0", loader("model-0")) is models[0]
+
+    print(f"\n32 requests, {len(loads)} loads in {elapsed:.2f}s")
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import logging
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_processor import ChunkProcessor, ChunkConfig, EmbeddingType
+from src.onnx_embedder import OnnxEmbedder, compare_with_pytorch
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+class FakeTokenizer:
+    """Token id = word length; pads every batch to its longest text."""
+    def __call__(self, texts, padding, truncation, max_length, return_tensors):
+        tokens = [[len(w) for w in t.split()][:max_length] for t in texts]
+        width = max(len(t) for t in tokens)
+        ids = np.zeros((len(texts), width), dtype=np.int64)
+        mask = np.zeros((len(texts), width), dtype=np.int64)
+        for row, t in enumerate(tokens):
+            ids[row, :len(t)] = t
+            mask[row, :len(t)] = 1
+        return {"input_ids": ids, "attention_mask": mask}
+
+
+class FakeSession:
+    """Token embedding = (id, 1, 0); padding positions get garbage the pooling must ignore."""
+    def run(self, _, feeds):
+        ids = feeds["input_ids"].astype(np.float32)
+        out = np.stack([ids, np.ones_like(ids), np.full_like(ids, 99.0)], axis=-1)
+        out[..., 2] *= feeds["attention_mask"] == 0
+        return [out]
+
+
+class FakeSentenceTransformer:
+    def __init__(self, embedder):
+        self.embedder = embedder
+
+    def encode(self, texts, normalize_embeddings=False):
+        # Full precision reference: the same pooling with a little noise
+        noise = np.random.default_rng(0).normal(0, 1e-3, (len(texts), 3))
+        return self.embedder.encode(texts) + noise.astype(np.float32)
+
+
+def make_embedder():
+    embedder = OnnxEmbedder.__new__(OnnxEmbedder)
+    embedder.model_name = "fake"
+    embedder.max_length = 256
+    embedder.session = FakeSession()
+    embedder.tokenizer = FakeTokenizer()
+    embedder.input_names = {"input_ids", "attention_mask"}
+    return embedder
+
+
+def main():
+    """Test ONNX pooling and ordering, the accuracy report and the ONNX embedding type."""
+    embedder = make_embedder()
+    texts = ["a bb ccc", "dddd", "ee f gg hhh iiii jj", "k"]
+    vectors = embedder.encode(texts, batch_size=2)
+
+    # Mean over real tokens only, L2-normalized, rows in input order
+    for text, vector in zip(texts, vectors):
+        lengths = [len(w) for w in text.split()]
+        expected = np.array([np.mean(lengths), 1.0, 0.0])
+        assert np.allclose(vector, expected / np.linalg.norm(expected), atol=1e-6)
+    assert vectors.dtype == np.float32
+
+    report = compare_with_pytorch(texts, "fake", onnx_model=embedder,
+                                  torch_model=FakeSentenceTransformer(embedder))
+    print(f"\nAccuracy report: {report}")
+    assert report['texts'] == len(texts)
+    assert report['min_cosine'] > 0.99
+    assert report['nearest_neighbour_agreement'] == 1.0
+
+    # ONNX vectors are cached apart from full-precision ones
+    processor = ChunkProcessor(ChunkConfig(embedding_type=EmbeddingType.ONNX, embedding_cache_path=None))
+    assert processor.embedding_model_name == f"onnx-int8/{processor.config.hf_model_name}"
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
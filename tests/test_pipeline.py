@@ -0,0 +1,85 @@
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_processor import ChunkProcessor, ChunkConfig, EmbeddingType
+from src.pipeline import StreamingIngestPipeline
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+class SlowVideoProcessor:
+    """Yields one 4-second segment every few milliseconds, like a long transcription."""
+
+    def __init__(self, count=300, delay=0.002):
+        self.count = count
+        self.delay = delay
+        self.finished_at = None
+
+    def segments(self):
+        return [{'start': i * 4.2, 'end': i * 4.2 + 4, 'text': f"sentence {i}"} for i in range(self.count)]
+
+    def process_video_stream(self, url):
+        for segment in self.segments():
+            time.sleep(self.delay)
+            yield segment
+        self.finished_at = time.perf_counter()
+
+
+class FakeEmbeddingChunkProcessor(ChunkProcessor):
+    def embed_texts(self, texts):
+        return np.array([[float(len(text))] for text in texts])
+
+
+class RecordingVectorStore:
+    def __init__(self):
+        self.chunks = []
+        self.first_upsert_at = None
+
+    def index_video_chunks(self, chunks, video_id, complete=True):
+        if self.first_upsert_at is None:
+            self.first_upsert_at = time.perf_counter()
+        self.chunks.extend(chunks.to_chunks())
+
+    def complete_video(self, video_id, chunk_count=None):
+        self.completed = video_id
+
+
+def main():
+    """Test that the streaming pipeline indexes chunks while transcription is still running."""
+    os.environ.setdefault("OPENAI_API_KEY", "unused")
+    chunk_processor = FakeEmbeddingChunkProcessor(ChunkConfig(embedding_type=EmbeddingType.OPENAI, embedding_cache_path=None))
+    video_processor = SlowVideoProcessor()
+    vector_store = RecordingVectorStore()
+
+    stats = StreamingIngestPipeline(video_processor, chunk_processor, vector_store).run("url", "video")
+    print(f"Pipeline stats: {stats}")
+
+    expected = chunk_processor.create_chunks(video_processor.segments(), "video")
+    assert [c['id'] for c in vector_store.chunks] == [c['id'] for c in expected]
+    assert vector_store.completed == "video"
+    assert vector_store.first_upsert_at < video_processor.finished_at, \
+        "first chunks should be indexed before transcription finishes"
+
+    # Chunks starting within the same second keep distinct ids, and link to that whole second
+    chunk_processor.config = ChunkConfig(embedding_type=EmbeddingType.OPENAI, chunk_size=0.3, overlap=0)
+    close = [{'start': 12.2, 'end': 12.6, 'text': "first"}, {'start': 12.7, 'end': 13.4, 'text': "second"}]
+    chunks = chunk_processor.create_chunks(close, "video")
+    assert [c['id'] for c in chunks] == ["video_000012200", "video_000012700"]
+    assert [c['id'] for c in chunk_processor.iter_chunks(iter(close), "video")] == [c['id'] for c in chunks]
+    assert [c['metadata']['youtube_url'][-5:] for c in chunks] == ["&t=12", "&t=12"]
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_processor import ChunkProcessor, ChunkConfig, EmbeddingType
+from src.embeddings import LocalEmbeddingClient
+from src.projection import EmbeddingProjection, recall_report
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+def corpus_embeddings(count: int, dimension: int = 384, rank: int = 48, seed: int = 0) -> np.ndarray:
+    """Normalized vectors near a low-rank subspace, like sentence embeddings of one corpus."""
+    rng = np.random.default_rng(seed)
+    basis = rng.normal(size=(rank, dimension))
+    vectors = rng.normal(size=(count, rank)) @ basis + rng.normal(scale=0.5, size=(count, dimension))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def main():
+    """Test PCA/truncation projections, the recall report and projection at embedding time."""
+    vectors = corpus_embeddings(3000)
+    corpus, queries = vectors[:2800], vectors[2800:]
+
+    report = recall_report(corpus, queries, [16, 64, 128], k=10)
+    for row in report:
+        print(f"dimension {row['dimension']:>4}: recall@10 {row['recall']:.3f}, "
+              f"{row['bytes_per_vector']} bytes/vector, {row['search_ms']:.1f} ms")
+    recall = {row['dimension']: row['recall'] for row in report}
+    assert recall[384] == 1.0
+    assert recall[128] >= recall[16]
+    assert recall[64] > 0.6
+
+    # Save/load round trip gives identical projections
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "projection.npz")
+        projection = EmbeddingProjection.fit_pca(corpus, 64)
+        projection.save(path)
+        loaded = EmbeddingProjection.load(path)
+        projected = loaded.apply(queries)
+        assert projected.shape == (len(queries), 64) and projected.dtype == np.float32
+        assert np.allclose(projected, projection.apply(queries))
+        assert np.allclose(np.linalg.norm(projected, axis=1), 1.0, atol=1e-5)
+        assert np.allclose(loaded.apply(queries[0]), projected[0], atol=1e-6)
+
+        truncated = EmbeddingProjection.truncation(384, 32)
+        truncated.save(path)
+        assert EmbeddingProjection.load(path).apply(queries).shape == (len(queries), 32)
+
+        # Chunk embeddings come out projected; the cache keeps the full vectors
+        client = LocalEmbeddingClient()
+        texts = [f"chunk about topic {i % 7} number {i}" for i in range(200)]
+        EmbeddingProjection.fit_pca(np.asarray(client.embed(texts)), 48).save(path)
+        processor = ChunkProcessor(ChunkConfig(
+            embedding_type=EmbeddingType.OPENAI,
+            embedding_cache_path=os.path.join(tmp, "cache.db"),
+            projection_path=path
+        ), embedding_client=client)
+        embedded = processor.embed_texts(texts[:10])
+        assert embedded.shape == (10, 48)
+        assert len(processor.embedding_cache.get_many(processor.embedding_model_name, texts[:1])[0]) == 1536
+        assert np.allclose(processor.embed_texts(texts[:10]), embedded)
+        processor.embedding_cache.close()
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
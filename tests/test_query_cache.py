@@ -0,0 +1,158 @@
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_batch import ChunkBatch
+from src.chunk_processor import ChunkConfig, ChunkProcessor
+from src.local_vector_store import LocalVectorStore
+from src.query_cache import QueryCache, QueryCacheConfig
+from src.rag_engine import RAGEngine
+from src.reindex import DeltaReindexer, VideoDelta
+from src.video_registry import VideoRegistry
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+class CountingEngine(RAGEngine):
+    """Embeds queries as random vectors and counts model calls and searches."""
+
+    embeddings = 0
+    searches = 0
+
+    @property
+    def model(self):
+        engine = self
+
+        class Model:
+            def encode(self, texts):
+                engine.embeddings += 1
+                time.sleep(0.02)
+                return np.random.default_rng(len(texts[0])).normal(size=(1, 64))
+        return Model()
+
+
+class CountingStore(LocalVectorStore):
+    def search_video(self, *args, **kwargs):
+        self.searches = getattr(self, "searches", 0) + 1
+        return super().search_video(*args, **kwargs)
+
+
+def make_batch(video_id: str, count: int) -> ChunkBatch:
+    rng = np.random.default_rng(0)
+    starts = np.arange(count) * 25.0
+    return ChunkBatch.from_texts(video_id, starts, starts + 30, [f"part {i} about topic {i % 7}" for i in range(count)]
+                                 ).with_embeddings(rng.normal(size=(count, 64)))
+
+
+def main():
+    """Test the query cache's eviction, file backend and use by RAGEngine."""
+    os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+    # Least recently used entries are evicted first
+    cache = QueryCache(QueryCacheConfig(max_entries=2))
+    cache.put_embedding("m", "a", [1.0])
+    cache.put_embedding("m", "b", [2.0])
+    assert cache.get_embedding("m", "  A ") == [1.0]
+    cache.put_embedding("m", "c", [3.0])
+    assert cache.get_embedding("m", "b") is None
+    assert cache.get_embedding("m", "a") == [1.0] and cache.get_embedding("m", "c") == [3.0]
+    stats = cache.stats()["embedding"]
+    assert stats["hits"] == 3 and stats["misses"] == 1 and stats["evictions"] == 1 and stats["entries"] == 2
+
+    # Expired entries are not served
+    cache = QueryCache(QueryCacheConfig(ttl_seconds=0.05))
+    cache.put_results("video", "q", [{"id": "video_000000"}], top_k=3)
+    assert cache.get_results("video", "q", top_k=3) == [{"id": "video_000000"}]
+    assert cache.get_results("video", "q", top_k=5) is None
+    time.sleep(0.06)
+    assert cache.get_results("video", "q", top_k=3) is None
+    assert cache.stats()["results"]["expirations"] == 1
+
+    # Served results are copies, so callers cannot alter the cached ones
+    cache.put_results("video", "q", [{"id": "video_000000"}])
+    cache.get_results("video", "q")[0]["id"] = "changed"
+    assert cache.get_results("video", "q") == [{"id": "video_000000"}]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A second process sees entries through the file, until the video is invalidated
+        path = os.path.join(tmp, "query_cache.db")
+        first, second = QueryCache(QueryCacheConfig(path=path)), QueryCache(QueryCacheConfig(path=path))
+        first.put_results("video", "q", [{"id": "video_000000", "score": 0.5}], version=1.0, top_k=3)
+        first.put_embedding("m", "q", [0.25, 0.5])
+        assert second.get_results("video", "q", version=1.0, top_k=3) == [{"id": "video_000000", "score": 0.5}]
+        assert second.get_results("video", "q", version=2.0, top_k=3) is None
+        assert second.get_embedding("m", "q") == [0.25, 0.5]
+        first.invalidate_video("video")
+        third = QueryCache(QueryCacheConfig(path=path))
+        assert third.get_results("video", "q", version=1.0, top_k=3) is None
+        assert third.get_embedding("m", "q") == [0.25, 0.5]
+        for c in (first, second, third):
+            c.close()
+
+        # Repeated questions skip both the embedding model and the vector store
+        registry = VideoRegistry(os.path.join(tmp, "registry.db"))
+        store = CountingStore(os.path.join(tmp, "vectors"), dimension=64, registry=registry)
+        store.index_video_chunks(make_batch("video", 400), "video")
+        engine = CountingEngine("https://youtu.be/video", vector_store=store,
+                                query_cache=QueryCache(QueryCacheConfig()))
+        engine.video_id = "video"
+
+        started = time.perf_counter()
+        cold = engine.get_relevant_chunks("What is topic 3 about?", top_k=3)
+        cold_time = time.perf_counter() - started
+        started = time.perf_counter()
+        warm = engine.get_relevant_chunks("what is topic 3   about?", top_k=3)
+        warm_time = time.perf_counter() - started
+        assert warm == cold
+        assert engine.embeddings == 1 and store.searches == 1
+        print(f"\nRepeated query: {cold_time * 1000:.1f} ms cold, {warm_time * 1000:.2f} ms cached")
+
+        # Other settings are separate entries, but reuse the query embedding
+        engine.get_relevant_chunks("what is topic 3 about?", top_k=3, start_time=0, end_time=500)
+        assert engine.embeddings == 1 and store.searches == 2
+
+        # Re-indexing the video bumps its registry version, so the cached results are not used
+        time.sleep(0.01)
+        store.index_video_chunks(make_batch("video", 400), "video")
+        engine.get_relevant_chunks("what is topic 3 about?", top_k=3)
+        assert engine.embeddings == 1 and store.searches == 3
+        print(f"Cache stats: {engine.query_cache.stats()}")
+
+        # Re-indexing drops the video's cached results, whatever their version
+        version = engine._video_version()
+        params = dict(top_k=3, start_time=None, end_time=None, hybrid=False, candidates=None)
+        assert engine.query_cache.get_results("video", "what is topic 3 about?", version, **params) is not None
+        reindexer = DeltaReindexer(ChunkProcessor(ChunkConfig(embedding_cache_path=None)), store,
+                                   lambda video_id: "", query_cache=engine.query_cache)
+        reindexer.apply([VideoDelta("video", make_batch("video", 400), [], [], [])])
+        assert engine.query_cache.get_results("video", "what is topic 3 about?", version, **params) is None
+        store.close()
+        registry.close()
+
+        # Without a registry there is no version, so results are never cached and a re-index is always seen
+        unversioned = CountingStore(os.path.join(tmp, "unversioned"), dimension=64)
+        unversioned.index_video_chunks(make_batch("video", 400), "video")
+        engine = CountingEngine("https://youtu.be/video", vector_store=unversioned,
+                                query_cache=QueryCache(QueryCacheConfig()))
+        engine.video_id = "video"
+        before = engine.get_relevant_chunks("what is topic 3 about?", top_k=3)
+        unversioned.delete_chunks("video", [chunk["id"] for chunk in before])
+        after = engine.get_relevant_chunks("what is topic 3 about?", top_k=3)
+        assert not {chunk["id"] for chunk in before} & {chunk["id"] for chunk in after}
+        assert engine.embeddings == 1 and unversioned.searches == 2
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
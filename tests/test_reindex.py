@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_processor import ChunkConfig, ChunkProcessor, EmbeddingType
+from src.local_vector_store import LocalVectorStore
+from src.reindex import DeltaReindexer
+from src.video_registry import VideoRegistry
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+class FakeEmbeddingClient:
+    def __init__(self, name):
+        self.name = name
+
+
+class CountingChunkProcessor(ChunkProcessor):
+    """Embeds each text as a deterministic pseudo-random vector and counts the texts embedded."""
+
+    def __init__(self, config, model_name="fake-model"):
+        super().__init__(config, embedding_client=FakeEmbeddingClient(model_name))
+        self.embedded = 0
+
+    def embed_texts(self, texts):
+        self.embedded += len(texts)
+        seeds = [int.from_bytes(hashlib.md5(text.encode()).digest()[:4], 'little') for text in texts]
+        return np.array([np.random.default_rng(seed).normal(size=16) for seed in seeds], dtype=np.float32)
+
+
+def write_transcript(path: str, lines: int, edited_line: int = -1):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(lines):
+            seconds = i * 6
+            text = f"edited words {i}" if i == edited_line else f"sentence number {i} of the talk"
+            f.write(f"[{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}] {text}\n")
+
+
+def processor(chunk_size=30, overlap=5, model_name="fake-model") -> CountingChunkProcessor:
+    return CountingChunkProcessor(ChunkConfig(chunk_size=chunk_size, overlap=overlap,
+                                              embedding_type=EmbeddingType.OPENAI, embedding_cache_path=None),
+                                  model_name)
+
+
+def main():
+    """Test that re-indexing only embeds changed chunks and deletes orphaned ones."""
+    with tempfile.TemporaryDirectory() as tmp:
+        videos = ["video_a", "video_b", "video_c"]
+        transcripts = {video_id: os.path.join(tmp, f"{video_id}.txt") for video_id in videos}
+        for video_id in videos:
+            write_transcript(transcripts[video_id], 200)
+        store = LocalVectorStore(os.path.join(tmp, "store"), registry=VideoRegistry(os.path.join(tmp, "reg.db")))
+
+        def reindex(chunk_processor, video_ids=None):
+            summaries = DeltaReindexer(chunk_processor, store, transcripts.get).run(video_ids)
+            return {s["video_id"]: s for s in summaries}
+
+        def check_stored(chunk_processor):
+            for video_id in videos:
+                expected = chunk_processor.chunk_batch_file(transcripts[video_id], video_id).ids()
+                assert sorted(store.list_video_chunk_ids(video_id)) == sorted(expected)
+                assert store.registry.get(video_id)['chunk_count'] == len(expected)
+                assert sorted(store.registry.chunk_hashes(video_id)) == sorted(expected)
+                assert store.check_video_exists(video_id)
+
+        # First run indexes everything
+        first = processor()
+        report = reindex(first, videos)
+        total = sum(s["chunks"] for s in report.values())
+        assert first.embedded == total and all(s["deleted"] == 0 for s in report.values())
+        check_stored(first)
+
+        # Unchanged settings: nothing is embedded or written
+        again = processor()
+        report = reindex(again)
+        assert again.embedded == 0 and all(s["changed"] == 0 for s in report.values())
+
+        # An edited transcript line only touches the chunks that contain it
+        write_transcript(transcripts["video_b"], 200, edited_line=100)
+        edited = processor()
+        report = reindex(edited)
+        assert 1 <= report["video_b"]["changed"] <= 2 and edited.embedded == report["video_b"]["changed"]
+        assert report["video_a"]["changed"] == 0 and report["video_c"]["changed"] == 0
+        check_stored(edited)
+
+        # New overlap: chunk starts move, stale chunks are deleted rather than mixed in
+        overlap = processor(overlap=10)
+        report = reindex(overlap)
+        print(f"\nOverlap change: {sum(s['changed'] for s in report.values())} of "
+              f"{sum(s['chunks'] for s in report.values())} chunks re-embedded, "
+              f"{sum(s['deleted'] for s in report.values())} deleted")
+        assert all(s["deleted"] > 0 for s in report.values())
+        assert overlap.embedded < sum(s["chunks"] for s in report.values())
+        check_stored(overlap)
+
+        # A different embedding model re-embeds every chunk but deletes nothing
+        model = processor(overlap=10, model_name="other-model")
+        report = reindex(model)
+        assert all(s["changed"] == s["chunks"] and s["deleted"] == 0 for s in report.values())
+        check_stored(model)
+
+        # Videos indexed before hashes were recorded are diffed against the stored ids
+        legacy = processor(chunk_size=60, overlap=0).chunk_batch_file(transcripts["video_a"], "video_a")
+        store.delete_video("video_a")
+        store.index_video_chunks(legacy.with_embeddings(np.ones((len(legacy), 16))), "video_a")
+        assert not store.registry.chunk_hashes("video_a")
+        report = reindex(model, ["video_a"])
+        assert report["video_a"]["deleted"] == len(set(legacy.ids()) - set(
+            model.chunk_batch_file(transcripts["video_a"], "video_a").ids()))
+        check_stored(model)
+
+        # Dry runs report without writing
+        dry = DeltaReindexer(processor(), store, transcripts.get)
+        dry.config.dry_run = True
+        assert all(s["deleted"] > 0 for s in dry.run())
+        check_stored(model)
+        store.close()
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
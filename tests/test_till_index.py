@@ -11,7 +11,7 @@ src_path = str(Path(__file__).parent.parent / 'src')
 sys.path.append(src_path)
 
 from src import VideoProcessor
-from src import ChunkProcessor
+from src import ChunkProcessor, ChunkConfig
 from src import PineconeManager
 from src import extract_video_id
 
@@ -35,7 +35,7 @@ def main():
 
         # Initialize components
         video_processor = VideoProcessor()
-        chunk_processor = ChunkProcessor()
+        chunk_processor = ChunkProcessor(ChunkConfig(embedding_cache_path=None))
         pinecone = PineconeManager("video-rag-test")
 
         # Extract video ID
@@ -0,0 +1,113 @@
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_batch import ChunkBatch
+from src.document_store import DocumentStore
+from src.lexical_index import BM25Index
+from src.local_vector_store import LocalVectorStore
+from src.time_index import TimeIndex
+from src.vector_store import PineconeManager
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+def make_batch(video_id: str, count: int, dimension: int = 64) -> ChunkBatch:
+    """Chunks every 25s lasting 30s, with a few longer ones, in shuffled order."""
+    rng = np.random.default_rng(0)
+    starts = np.arange(count) * 25.0
+    ends = starts + 30 + (rng.random(count) < 0.05) * 90
+    order = rng.permutation(count)
+    texts = [f"part {i} about topic {i % 7}" for i in range(count)]
+    return ChunkBatch.from_texts(video_id, starts[order], ends[order], [texts[i] for i in order]).with_embeddings(
+        rng.normal(size=(count, dimension)))
+
+
+def main():
+    """Test time-window search and point-in-time lookups against brute force."""
+    batch = make_batch("video", 20000)
+    starts, ends = batch.starts, batch.ends
+    index = TimeIndex(starts, ends)
+    rng = np.random.default_rng(1)
+
+    # Same chunks as a linear scan, for windows and open-ended bounds
+    for _ in range(200):
+        t0, t1 = np.sort(rng.uniform(-50, ends.max() + 50, size=2))
+        expected = np.flatnonzero((starts <= t1) & (ends >= t0))
+        assert sorted(index.overlapping(t0, t1).tolist()) == expected.tolist()
+    assert sorted(index.overlapping(end_time=100).tolist()) == np.flatnonzero(starts <= 100).tolist()
+    assert sorted(index.overlapping(start_time=ends.max()).tolist()) == np.flatnonzero(ends >= ends.max()).tolist()
+
+    # The chunk playing at t is the last-started one that contains t
+    for t in rng.uniform(0, ends.max(), size=500).tolist() + [0.0, 25.0, -1.0, float(ends.max())]:
+        covering = np.flatnonzero((starts <= t) & (ends > t))
+        expected = covering[np.argmax(starts[covering])] if len(covering) else None
+        assert index.at(t) == expected
+
+    started = time.perf_counter()
+    for t in rng.uniform(0, ends.max(), size=10000):
+        index.at(t)
+    print(f"\nchunk_at over {len(batch)} chunks: {(time.perf_counter() - started) / 10000 * 1e6:.1f} µs")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVectorStore(os.path.join(tmp, "store"))
+        store.index_video_chunks(batch, "video")
+        normalized = batch.embeddings / np.linalg.norm(batch.embeddings, axis=1, keepdims=True)
+
+        # Window search equals exact search restricted to the window, and reads only the window
+        query = rng.normal(size=64)
+        scores = normalized @ (query / np.linalg.norm(query))
+        inside = np.flatnonzero((starts <= 1260) & (ends >= 1140))
+        expected = inside[np.argsort(-scores[inside])][:3]
+        results = store.search_video(query, "video", top_k=3, start_time=1140, end_time=1260)
+        assert [r["id"] for r in results] == [batch.id_at(i) for i in expected]
+        assert all(r["start_time"] <= 1260 and r["end_time"] >= 1140 for r in results)
+        assert store.search_video(query, "video", start_time=1e9) == []
+
+        timings = {}
+        for name, window in (("whole video", {}), ("2-minute window", {"start_time": 1140, "end_time": 1260})):
+            started = time.perf_counter()
+            for _ in range(200):
+                store.search_video(query, "video", **window)
+            timings[name] = (time.perf_counter() - started) / 200 * 1e6
+        print("Local search: " + ", ".join(f"{name} {us:.0f} µs" for name, us in timings.items()))
+        assert timings["2-minute window"] < timings["whole video"]
+
+        chunk = store.chunk_at("video", 1203)
+        assert chunk["id"] == batch.id_at(int(index.at(1203))) and chunk["start_time"] <= 1203 < chunk["end_time"]
+        assert store.chunk_at("video", -5) is None and store.chunk_at("missing", 10) is None
+
+        # The Pinecone backend answers chunk_at from its document store and filters searches by time
+        documents = DocumentStore(os.path.join(tmp, "documents.db"))
+        documents.put_chunk_batch(batch)
+        manager = PineconeManager.__new__(PineconeManager)
+        manager.document_store = documents
+        assert manager.chunk_at("video", 1203) == chunk
+        assert manager._video_filter("video", 1140, 1260) == {
+            "video_id": "video", "end_time": {"$gte": 1140}, "start_time": {"$lte": 1260}}
+        documents.put_chunk_batch(ChunkBatch.from_texts("video", [1200.5], [1210.0], ["inserted"]))
+        assert manager.chunk_at("video", 1203)["text"] == "inserted"
+
+        # BM25 search honours the same windows
+        bm25 = BM25Index(batch)
+        hits = bm25.search("topic 3", top_k=50, start_time=1140, end_time=1260)
+        assert hits and all(h["start_time"] <= 1260 and h["end_time"] >= 1140 for h in hits)
+        in_window = [h["id"] for h in bm25.search("topic 3", top_k=len(batch))
+                     if h["start_time"] <= 1260 and h["end_time"] >= 1140]
+        assert sorted(h["id"] for h in hits) == sorted(in_window)
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.transcript_format import TRANSCRIPT_SUFFIX, Transcript, is_binary_transcript, write_transcript
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+def main():
+    """Round-trip segments through the binary transcript format."""
+    logger = logging.getLogger('TestTranscriptFormat')
+
+    segments = [
+        {'id': 0, 'start': 0.0, 'end': 2.48, 'text': " Hello and welcome.",
+         'words': [{'word': " Hello", 'start': 0.0, 'end': 0.6}, {'word': " welcome.", 'start': 1.1, 'end': 2.48}]},
+        {'id': 1, 'start': 2.48, 'end': 7.125, 'text': " Today: café ☕ and ünïcode.", 'words': []},
+    ]
+    segments += [
+        {'id': i, 'start': i * 3.5, 'end': i * 3.5 + 3.25, 'text': f" sentence {i}"}
+        for i in range(2, 20000)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"transcript{TRANSCRIPT_SUFFIX}")
+        write_transcript(path, segments)
+        assert is_binary_transcript(path)
+
+        started = time.perf_counter()
+        with Transcript(path) as transcript:
+            loaded = list(transcript)
+            assert len(transcript) == len(segments)
+            assert transcript.starts.dtype.kind == 'f'
+        logger.info(f"Read {len(loaded)} segments in {time.perf_counter() - started:.3f}s")
+
+        for original, segment in zip(segments, loaded):
+            assert segment['id'] == original['id']
+            assert segment['start'] == original['start'] and segment['end'] == original['end']
+            assert segment['text'] == original['text'].strip()
+        assert loaded[0]['words'] == [{'word': "Hello", 'start': 0.0, 'end': 0.6},
+                                      {'word': "welcome.", 'start': 1.1, 'end': 2.48}]
+        assert loaded[1]['words'] == []
+
+        # Empty transcripts are valid files
+        empty = os.path.join(tmp, f"empty{TRANSCRIPT_SUFFIX}")
+        write_transcript(empty, [])
+        with Transcript(empty) as transcript:
+            assert len(transcript) == 0 and list(transcript) == []
+
+        # Legacy transcripts are not mistaken for binary ones
+        legacy = os.path.join(tmp, "legacy.txt")
+        with open(legacy, 'w', encoding='utf-8') as f:
+            f.write("[00:00:00] Hello\n")
+        assert not is_binary_transcript(legacy)
+
+    print("\nBinary transcript round trip OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import logging
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_processor import LEGACY_SEGMENT_SECONDS, ChunkConfig, ChunkProcessor
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+TRANSCRIPTS = Path(__file__).parent / "transcripts"
+
+
+def reference_read(path):
+    """The original reader: all lines in memory, each timestamp line looking at the next line."""
+    def seconds(timestamp):
+        hours, minutes, secs = map(int, re.match(r'\[(\d{2}):(\d{2}):(\d{2})\]', timestamp).groups())
+        return hours * 3600 + minutes * 60 + secs
+
+    segments = []
+    with open(path, encoding='utf-8') as f:
+        lines = f.readlines()
+    for i, line in enumerate(lines):
+        match = re.match(r'(\[\d{2}:\d{2}:\d{2}\])(.*)', line.strip())
+        if match:
+            timestamp, text = match.groups()
+            start = seconds(timestamp)
+            end = start + 5
+            if i < len(lines) - 1:
+                next_match = re.match(r'(\[\d{2}:\d{2}:\d{2}\])', lines[i + 1].strip())
+                if next_match:
+                    end = seconds(next_match.group(1))
+            segments.append({'start': start, 'end': end, 'text': text.strip()})
+    return segments
+
+
+def main():
+    """Test the single-pass legacy transcript reader."""
+    processor = ChunkProcessor(ChunkConfig(embedding_cache_path=None))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transcript.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(
+                "[00:00:00] Hello there\n"
+                "[00:00:04]   General Kenobi  \n"
+                "\n"  # blank line: the segment before it gets the default length
+                "[00:00:10] after a blank line\n"
+                "not a timestamp line\n"  # malformed lines are skipped
+                "[0:00:20] single digit hours\n"
+                "[00:00:xx] letters\n"
+                "   [00:00:30] indented\n"
+                "[00:01:00]\n"  # timestamp with no text
+                "[01:02:03] last line without newline"
+            )
+
+        segments = list(processor.iter_transcript(path))
+        assert segments == [
+            {'start': 0, 'end': 4, 'text': "Hello there"},
+            {'start': 4, 'end': 4 + LEGACY_SEGMENT_SECONDS, 'text': "General Kenobi"},
+            {'start': 10, 'end': 10 + LEGACY_SEGMENT_SECONDS, 'text': "after a blank line"},
+            {'start': 30, 'end': 60, 'text': "indented"},
+            {'start': 60, 'end': 3723, 'text': ""},
+            # The last segment ends LEGACY_SEGMENT_SECONDS after its start
+            {'start': 3723, 'end': 3723 + LEGACY_SEGMENT_SECONDS, 'text': "last line without newline"},
+        ], segments
+        assert segments == reference_read(path)
+        assert processor.read_transcript(path) == segments
+
+        # Files without any timestamped line yield nothing
+        empty = os.path.join(tmp, "empty.txt")
+        with open(empty, 'w', encoding='utf-8') as f:
+            f.write("\n\nno timestamps here\n")
+        assert list(processor.iter_transcript(empty)) == []
+
+        # A trailing newline or blank line after the last segment does not change its end
+        for suffix in ("\n", "\n\n"):
+            trailing = os.path.join(tmp, "trailing.txt")
+            with open(trailing, 'w', encoding='utf-8') as f:
+                f.write("[00:00:00] first\n[00:00:07] last" + suffix)
+            assert list(processor.iter_transcript(trailing))[-1] == {'start': 7, 'end': 12, 'text': "last"}
+
+    # Real transcripts read the same as with the original reader
+    for path in sorted(TRANSCRIPTS.glob("*.txt")):
+        segments = list(processor.iter_transcript(str(path)))
+        assert segments and segments == reference_read(path)
+        print(f"\n{path.name}: {len(segments)} segments")
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.transcription import TranscriptionBackend, SegmentedTranscriber, plan_windows
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+SPOKEN_EVERY = 3.0  # the fake speaker says one sentence every 3 seconds
+
+
+def fake_splitter(audio_path, windows, output_dir):
+    """Write each window's time range to a file instead of cutting real audio."""
+    for window in windows:
+        window.path = os.path.join(output_dir, f"segment_{window.index:04d}.txt")
+        with open(window.path, 'w') as f:
+            f.write(f"{window.start} {window.end}")
+    return windows
+
+
+class FakeBackend(TranscriptionBackend):
+    """Returns one segment per sentence heard in the window, relative to the window start."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def transcribe(self, audio_path):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+
+        with open(audio_path) as f:
+            start, end = map(float, f.read().split())
+        segments = []
+        t = (start // SPOKEN_EVERY) * SPOKEN_EVERY
+        while t < end:
+            if t >= start and t + SPOKEN_EVERY <= end + SPOKEN_EVERY / 2:
+                segments.append({'start': t - start, 'end': t + SPOKEN_EVERY - start, 'text': f" sentence {int(t)}"})
+            t += SPOKEN_EVERY
+
+        with self.lock:
+            self.active -= 1
+        return {'language': 'english', 'segments': segments}
+
+
+def main():
+    """Test segmented transcription with a local fake backend."""
+    duration = 600.0
+    windows = plan_windows(duration, 100, 2)
+    print(f"Planned {len(windows)} windows")
+    assert len(windows) == 6
+    assert windows[0].start == 0 and windows[-1].end == duration
+
+    backend = FakeBackend()
+    transcriber = SegmentedTranscriber(backend, segment_duration=100, overlap=2,
+                                       max_workers=3, splitter=fake_splitter)
+    with tempfile.TemporaryDirectory() as work_dir:
+        started = time.perf_counter()
+        transcript = transcriber.transcribe("audio.mp3", work_dir, duration)
+        elapsed = time.perf_counter() - started
+
+    starts = [s['start'] for s in transcript['segments']]
+    expected = [t * SPOKEN_EVERY for t in range(int(duration // SPOKEN_EVERY))]
+    print(f"Stitched {len(starts)} segments in {elapsed:.2f}s (max {backend.max_active} concurrent)")
+
+    assert starts == expected, "segments must be continuous with no duplicates or gaps"
+    assert [s['id'] for s in transcript['segments']] == list(range(len(starts)))
+    assert 1 < backend.max_active <= 3
+    assert transcript['text'].startswith("sentence 0 sentence 3")
+
+    # A backend without transcribe fails when it is created, not halfway through a job
+    class IncompleteBackend(TranscriptionBackend):
+        pass
+
+    try:
+        IncompleteBackend()
+        raise AssertionError("backends must implement transcribe")
+    except TypeError:
+        pass
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
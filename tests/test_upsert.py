@@ -0,0 +1,118 @@
+import json
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_batch import ChunkBatch
+from src.upsert import UpsertConfig, UpsertError
+from src.vector_store import PineconeManager
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+class RateLimited(Exception):
+    status = 429
+    headers = {'retry-after': '0.01'}
+
+
+class BadRequest(Exception):
+    status = 400
+
+
+class SlowIndex:
+    """Pinecone stand-in: fixed latency per request, fails chosen requests the first time."""
+
+    def __init__(self, latency: float = 0.02, fail_first=(), reject=()):
+        self.latency = latency
+        self.fail_first = set(fail_first)  # ids whose first request is rate limited
+        self.reject = set(reject)  # ids whose requests always fail
+        self.vectors = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def upsert(self, vectors):
+        time.sleep(self.latency)
+        ids = {v['id'] for v in vectors}
+        with self.lock:
+            self.requests.append((len(vectors), len(json.dumps(vectors))))
+            if ids & self.reject:
+                raise BadRequest("vector rejected")
+            if ids & self.fail_first:
+                self.fail_first -= ids
+                raise RateLimited("too many requests")
+            self.vectors.update((v['id'], v) for v in vectors)
+
+
+def make_manager(index, **config) -> PineconeManager:
+    manager = PineconeManager.__new__(PineconeManager)
+    manager.logger = logging.getLogger('PineconeManager')
+    manager.dimension = 384
+    manager.index = index
+    manager.registry = None
+    manager.document_store = None
+    manager.lexical_index = None
+    manager.upsert_config = UpsertConfig(initial_backoff=0.01, **config)
+    return manager
+
+
+def make_batch(count: int) -> ChunkBatch:
+    rng = np.random.default_rng(0)
+    starts = np.arange(count) * 25.0
+    texts = [" ".join(["word"] * int(rng.integers(20, 400))) for _ in range(count)]
+    return ChunkBatch.from_texts("video", starts, starts + 30, texts).with_embeddings(
+        rng.normal(size=(count, 384)).astype(np.float32))
+
+
+def main():
+    """Test size-bounded concurrent upserts that retry only the failed batches."""
+    batch = make_batch(600)
+    ids = batch.ids()
+
+    sequential = make_manager(SlowIndex(), max_in_flight=1, max_request_bytes=200_000)
+    sequential.index_video_chunks(batch, "video")
+    concurrent_index = SlowIndex(fail_first=[ids[5], ids[300]])
+    concurrent = make_manager(concurrent_index, max_in_flight=8, max_request_bytes=200_000)
+    concurrent.index_video_chunks(batch, "video")
+
+    stats = concurrent.last_upsert_stats
+    print(f"\nSequential: {sequential.last_upsert_stats['vectors_per_second']:.0f} vectors/s, "
+          f"concurrent: {stats['vectors_per_second']:.0f} vectors/s in {stats['batches']} batches")
+    assert stats['vectors_per_second'] > 2 * sequential.last_upsert_stats['vectors_per_second']
+
+    # Every vector arrives, requests stay under the byte budget, and only the two
+    # rate-limited batches were sent twice
+    assert sorted(concurrent_index.vectors) == sorted(ids)
+    assert all(size <= 200_000 for _, size in concurrent_index.requests)
+    assert len(concurrent_index.requests) == stats['batches'] + 2
+    assert sorted(b['attempts'] for b in stats['per_batch'])[-2:] == [2, 2]
+    assert sum(b['vectors'] for b in stats['per_batch']) == len(batch)
+
+    # A batch that cannot be written is reported; the other batches are written
+    rejecting = SlowIndex(reject=[ids[10]])
+    try:
+        make_manager(rejecting, max_request_bytes=200_000).index_video_chunks(batch, "video")
+        raise AssertionError("rejected batch was not reported")
+    except UpsertError as e:
+        (start, stop), = e.failed
+        assert start <= 10 < stop
+        assert len(rejecting.vectors) == len(batch) - (stop - start)
+
+    # The list-of-dicts path is batched the same way
+    chunks_index = SlowIndex()
+    make_manager(chunks_index, max_request_bytes=200_000).index_video_chunks(batch.to_chunks(), "video")
+    assert sorted(chunks_index.vectors) == sorted(ids)
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
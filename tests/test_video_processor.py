@@ -39,7 +39,7 @@ def main():
         print(f"ID: {video_info.get('id')}")
 
         print("\nTranscription Sample:")
-        print(transcription.text)
+        print(transcription["text"])
 
         print(f"\nTranscript saved to: {transcript_path}")
 
@@ -0,0 +1,157 @@
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.chunk_batch import ChunkBatch
+from src.local_vector_store import LocalVectorStore
+from src.upsert import UpsertConfig
+from src.vector_store import PineconeManager
+from src.video_registry import COMPLETE, INDEXING, PARTIAL, VideoRegistry
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+class CountingIndex:
+    """Stands in for a Pinecone index and counts the requests made to it."""
+
+    def __init__(self):
+        self.vectors = {}
+        self.requests = 0
+
+    def query(self, vector, filter, top_k, **_):
+        self.requests += 1
+        matches = [v for v in self.vectors.values() if v['metadata']['video_id'] == filter['video_id']]
+        return {'matches': matches[:top_k]}
+
+    def upsert(self, vectors):
+        self.requests += 1
+        self.vectors.update((v['id'], v) for v in vectors)
+
+    def list(self, prefix):
+        self.requests += 1
+        yield [i for i in self.vectors if i.startswith(prefix)]
+
+
+class PodIndex(CountingIndex):
+    """A pod-based index: ids cannot be listed, but stats can be filtered (unless `filtered_stats` is False)."""
+
+    def __init__(self, filtered_stats=True):
+        super().__init__()
+        self.filtered_stats = filtered_stats
+
+    def list(self, prefix):
+        raise RuntimeError("listing ids is only supported on serverless indexes")
+
+    def describe_index_stats(self, filter):
+        if not self.filtered_stats:
+            raise RuntimeError("describe_index_stats failed")
+        return {'total_vector_count': sum(v['metadata']['video_id'] == filter['video_id']
+                                          for v in self.vectors.values())}
+
+
+def make_batch(video_id: str, count: int) -> ChunkBatch:
+    starts = np.arange(count) * 25.0
+    return ChunkBatch.from_texts(video_id, starts, starts + 30, [f"chunk {i}" for i in range(count)]) \
+        .with_embeddings(np.ones((count, 384)))
+
+
+def main():
+    """Test that existence checks come from the registry and partial indexes are detected."""
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = VideoRegistry(os.path.join(tmp, "registry.db"))
+        manager = PineconeManager.__new__(PineconeManager)
+        manager.logger = logging.getLogger('PineconeManager')
+        manager.dimension = 384
+        manager.index = CountingIndex()
+        manager.registry = registry
+        manager.document_store = None
+        manager.lexical_index = None
+        manager.upsert_config = UpsertConfig()
+
+        # A video indexed in batches is not "existing" until its last batch is in
+        batch = make_batch("video_a", 50)
+        registry.begin("video_a", {"chunk_size": 30, "overlap": 5}, "huggingface/all-MiniLM-L6-v2")
+        manager.index_video_chunks(batch.slice(0, 20), "video_a", complete=False)
+        manager.index_video_chunks(batch.slice(20, 40), "video_a", complete=False)
+        assert not manager.check_video_exists("video_a")
+        assert registry.get("video_a")['status'] == INDEXING
+        manager.index_video_chunks(batch.slice(40, 50), "video_a", complete=False)
+        registry.complete("video_a")
+        requests = manager.index.requests
+        for _ in range(100):
+            assert manager.check_video_exists("video_a")
+        assert manager.index.requests == requests, "existence checks must not query the index"
+
+        entry = registry.get("video_a")
+        assert entry['chunk_count'] == 50 and entry['status'] == COMPLETE
+        assert entry['chunk_config'] == {"chunk_size": 30, "overlap": 5}
+        assert entry['embedding_model'] == "huggingface/all-MiniLM-L6-v2"
+
+        # Videos indexed before the registry existed are adopted after one query
+        manager.index.upsert(list(make_batch("video_b", 7).upsert_payloads()))
+        assert manager.check_video_exists("video_b")
+        assert registry.get("video_b")['chunk_count'] == 7
+        requests = manager.index.requests
+        assert manager.check_video_exists("video_b") and manager.index.requests == requests
+
+        # On pod-based indexes, which cannot list ids, the count comes from filtered stats,
+        # and a failed count never turns a found video into an error
+        for filtered_stats, count in ((True, 9), (False, 0)):
+            pods = PineconeManager.__new__(PineconeManager)
+            pods.__dict__.update(manager.__dict__, index=PodIndex(filtered_stats),
+                                 registry=VideoRegistry(os.path.join(tmp, f"pods_{filtered_stats}.db")))
+            pods.index.upsert(list(make_batch("video_p", 9).upsert_payloads()))
+            assert pods.check_video_exists("video_p")
+            assert pods.registry.get("video_p")['status'] == COMPLETE
+            assert pods.registry.get("video_p")['chunk_count'] == count
+
+        # Reconcile flags complete videos whose vectors went missing
+        for chunk_id in make_batch("video_a", 50).ids()[45:]:
+            del manager.index.vectors[chunk_id]
+        report = registry.reconcile(manager)
+        assert report == [{"video_id": "video_a", "status": PARTIAL, "registered": 50, "stored": 45}]
+        assert not manager.check_video_exists("video_a")
+
+        # A second registry on the same file (another process) sees completed videos
+        other = VideoRegistry(os.path.join(tmp, "registry.db"))
+        assert other.is_indexed("video_b") and other.is_indexed("video_a") is False
+        assert other.is_indexed("never_seen") is None
+
+        # The local store uses the registry the same way
+        store = LocalVectorStore(os.path.join(tmp, "store"), registry=VideoRegistry(os.path.join(tmp, "local.db")))
+        store.index_video_chunks(make_batch("video_c", 30), "video_c", complete=False)
+        assert not store.check_video_exists("video_c")
+        store.index_video_chunks(make_batch("video_c", 30).slice(0, 5), "video_c")
+        assert store.check_video_exists("video_c")
+        assert store.registry.get("video_c")['chunk_count'] == 30
+        assert store.registry.reconcile(store) == []
+        store.delete_video("video_c")
+        assert store.registry.get("video_c") is None and not store.check_video_exists("video_c")
+
+        # Videos indexed through the store directly record the settings they were indexed with
+        settings = {"chunk_size": 30, "overlap": 5, "projection_path": None}
+        store.index_video_chunks(make_batch("video_d", 10), "video_d", chunk_config=settings,
+                                 embedding_model="huggingface/all-MiniLM-L6-v2")
+        entry = store.registry.get("video_d")
+        assert entry['chunk_config'] == settings and entry['embedding_model'] == "huggingface/all-MiniLM-L6-v2"
+        store.index_video_chunks(make_batch("video_e", 10), "video_e", complete=False)
+        store.complete_video("video_e", chunk_config=settings, embedding_model="openai/text-embedding-ada-002")
+        assert store.registry.get("video_e")['embedding_model'] == "openai/text-embedding-ada-002"
+        # Completing again without settings keeps the recorded ones
+        store.registry.complete("video_e")
+        assert store.registry.get("video_e")['chunk_config'] == settings
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()
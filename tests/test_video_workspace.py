@@ -0,0 +1,87 @@
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.transcription import TranscriptionBackend
+from src.video_processor import VideoProcessor, VideoProcessorConfig
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+
+
+class FakeBackend(TranscriptionBackend):
+    """Reads the fake audio back as one segment; fails for audio containing "fail"."""
+
+    def __init__(self):
+        self.barrier = threading.Barrier(2, timeout=5)
+
+    def transcribe(self, audio_path):
+        with open(audio_path) as f:
+            text = f.read()
+        if "fail" in text:
+            raise RuntimeError("transcription failed")
+        # Both jobs are mid-transcription at once
+        self.barrier.wait()
+        return {'text': text, 'segments': [{'start': 0.0, 'end': 5.0, 'text': text}]}
+
+
+class FakeDownloadProcessor(VideoProcessor):
+    """Writes the URL as the audio file and records the workspace it was written to."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.workspaces = []
+
+    def download_youtube_audio(self, url, audio_path):
+        self.workspaces.append(os.path.dirname(audio_path))
+        with open(audio_path, 'w') as f:
+            f.write(url)
+        time.sleep(0.05)
+        return {'title': 'Same Title', 'duration': 5.0}
+
+
+def main():
+    """Test that concurrent process_video calls get private workspaces that are always removed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        workspace_dir = os.path.join(tmp, "workspaces")
+        config = VideoProcessorConfig(workspace_dir=workspace_dir, output_dir=os.path.join(tmp, "transcripts"),
+                                      segment_duration=0, cache_dir=None, transcript_format="txt")
+        processor = FakeDownloadProcessor(config, backend=FakeBackend())
+
+        urls = ["https://example.com/a.mp4", "https://example.com/b.mp4"]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(processor.process_video, urls))
+
+        # Separate workspaces and transcript files, each holding its own video's text
+        assert len(set(processor.workspaces)) == 2
+        transcript_paths = [path for _, _, path in results]
+        assert len(set(transcript_paths)) == 2
+        for url, (transcription, _, path) in zip(urls, results):
+            assert transcription['text'] == url
+            with open(path) as f:
+                assert url in f.read()
+        assert os.listdir(workspace_dir) == []
+
+        # A failed job still removes its workspace
+        try:
+            processor.process_video("https://example.com/fail.mp4")
+            raise AssertionError("the backend error must propagate")
+        except RuntimeError as e:
+            assert str(e) == "transcription failed"
+        assert not os.path.exists(processor.workspaces[-1])
+        assert os.listdir(workspace_dir) == []
+
+    print("\nTest successful!")
+
+
+if __name__ == "__main__":
+    main()